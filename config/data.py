@@ -64,6 +64,7 @@ def _get_config_var(setting_str: str):
 
 # Set configuration values using defaults from settings_constants
 WALLPAPERS_DIR = _get_config_var("wallpapers_dir")
+WALLPAPER_THUMBNAIL_SIZE = _get_config_var("wallpaper_thumbnail_size")
 BAR_POSITION = _get_config_var("bar_position")
 VERTICAL = BAR_POSITION in ["Left", "Right"]
 CENTERED_BAR = _get_config_var("centered_bar")
@@ -82,6 +83,8 @@ DOCK_THEME = _get_config_var("dock_theme")
 PANEL_THEME = _get_config_var("panel_theme")
 PANEL_POSITION = _get_config_var("panel_position")
 NOTIF_POS = _get_config_var("notif_pos")
+NOTCH_PREWARM = _get_config_var("notch_prewarm")
+NOTIFICATION_HISTORY_LIMIT = _get_config_var("notification_history_limit")
 
 BAR_COMPONENTS_VISIBILITY = {
     "button_apps": _get_config_var("bar_button_apps_visible"),
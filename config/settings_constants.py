@@ -50,6 +50,7 @@ DEFAULTS = {
     "prefix_css": "SUPER SHIFT",
     "suffix_css": "B",
     "wallpapers_dir": get_relative_path("../assets/wallpapers_example"),
+    "wallpaper_thumbnail_size": 96,
     "prefix_restart_inspector": "SUPER CTRL ALT",
     "suffix_restart_inspector": "B",
     "bar_position": "Top",
@@ -69,6 +70,7 @@ DEFAULTS = {
     "panel_theme": "Notch",
     "panel_position": "Center",
     "notif_pos": "Top",
+    "notch_prewarm": False,
     "bar_button_apps_visible": True,
     "bar_systray_visible": True,
     "bar_control_visible": True,
@@ -99,5 +101,6 @@ DEFAULTS = {
     },
     "limited_apps_history": ["Spotify"],
     "history_ignored_apps": ["Hyprshot"],
+    "notification_history_limit": 500,
     "selected_monitors": [],
 }
@@ -1,5 +1,10 @@
 import os
 
+# Imported first so startup tracing also times the imports below
+from utils import startup_trace
+
+startup_trace.install()
+
 import gi
 
 gi.require_version("GLib", "2.0")
@@ -18,6 +23,8 @@ from modules.updater import run_updater
 
 fonts_updated_file = f"{CACHE_DIR}/fonts_updated"
 
+startup_trace.mark("imports-done")
+
 if __name__ == "__main__":
     setproctitle.setproctitle(APP_NAME)
 
@@ -32,10 +39,10 @@ if __name__ == "__main__":
         )
         os.symlink(example_wallpaper, current_wallpaper)
 
-    # Load configuration
-    from config.data import load_config
+    # Load configuration (cached and watched for the rest of the session)
+    from services.config_service import get_config_service
 
-    config = load_config()
+    config = get_config_service().config
 
     GLib.idle_add(run_updater)
     # Every hour
@@ -97,22 +104,24 @@ if __name__ == "__main__":
         
         # Create corners only for the first monitor (shared across all)
         if monitor_id == 0:
-            corners = Corners()
+            with startup_trace.span("Corners"):
+                corners = Corners()
             # Set corners visibility based on config
             corners_visible = config.get("corners_visible", True)
             corners.set_visible(corners_visible)
             app_components.append(corners)
         
         # Create monitor-specific components
-        if multi_monitor_enabled:
-            bar = Bar(monitor_id=monitor_id)
-            notch = Notch(monitor_id=monitor_id)
-            dock = Dock(monitor_id=monitor_id)
-        else:
-            # Single monitor fallback
-            bar = Bar()
-            notch = Notch()
-            dock = Dock()
+        # Single monitor fallback: components pick their default monitor
+        component_kwargs = {"monitor_id": monitor_id} if multi_monitor_enabled else {}
+        with startup_trace.span("Bar", monitor=monitor_id):
+            bar = Bar(**component_kwargs)
+        with startup_trace.span("Notch", monitor=monitor_id):
+            notch = Notch(**component_kwargs)
+        with startup_trace.span("Dock", monitor=monitor_id):
+            dock = Dock(**component_kwargs)
+        startup_trace.watch_first_frame(bar, f"Bar@{monitor_id}")
+        startup_trace.watch_first_frame(notch, f"Notch@{monitor_id}")
         
         # Connect bar and notch
         bar.notch = notch
@@ -120,7 +129,8 @@ if __name__ == "__main__":
         
         # Create notification popup for the first monitor only
         if monitor_id == 0:
-            notification = NotificationPopup(widgets=notch.dashboard.widgets)
+            with startup_trace.span("NotificationPopup"):
+                notification = NotificationPopup(widgets=notch.dashboard.widgets)
             app_components.append(notification)
         
         # Register instances in monitor manager if available
@@ -145,6 +155,8 @@ if __name__ == "__main__":
 
     app.set_css = set_css
 
-    app.set_css()
+    with startup_trace.span("Stylesheet"):
+        app.set_css()
 
+    startup_trace.start_main_loop()
     app.run()
@@ -1,20 +1,24 @@
 import os
-import re
 import subprocess
 import sys
 import tempfile
+from collections import OrderedDict
 
-from fabric.utils import idle_add, remove_handler
-from fabric.utils.helpers import get_relative_path
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.entry import Entry
 from fabric.widgets.image import Image
 from fabric.widgets.label import Label
-from fabric.widgets.scrolledwindow import ScrolledWindow
-from gi.repository import Gdk, GdkPixbuf, GLib
+from gi.repository import Gdk, GLib
 
 import modules.icons as icons
+from services.clipboard import get_clipboard_service
+from services.clipboard_history import get_clipboard_history
+from utils.clip_previews import get_clip_preview_cache, get_clip_preview_loader, preview_key
+from widgets.virtual_list import VirtualList
+
+# Decoded previews kept in memory; the rest are reloaded from the disk cache
+MEMORY_PREVIEWS = 64
 
 
 class ClipHistory(Box):
@@ -27,16 +31,21 @@ class ClipHistory(Box):
         )
 
         self.tmp_dir = tempfile.mkdtemp(prefix="cliphist-")
-        self.image_cache = {}
-        
+        self.image_cache = OrderedDict()  # preview key -> pixbuf
+        # Shared by the panels of every monitor; each panel retains its own rows
+        self.preview_cache = get_clip_preview_cache()
+        self.preview_loader = get_clip_preview_loader()
+        self.preview_loader.add_listener(self._update_image_button)
+        self._retain_previews_pending = False
+
         self.notch = kwargs["notch"]
         self.selected_index = -1
-        self._arranger_handler = 0
-        self.clipboard_items = []
-        self._loading = False
-        self._pending_updates = False
+        # Entries shared with the other monitors' panels
+        self.history = get_clipboard_history()
+        self.history.connect("changed", self._on_history_changed)
+        self._is_open = False
+        self.clipboard = get_clipboard_service()
 
-        self.viewport = Box(name="viewport", spacing=4, orientation="v")
         self.search_entry = Entry(
             name="search-entry",
             placeholder="Search Clipboard History...",
@@ -48,17 +57,32 @@ class ClipHistory(Box):
         )
         self.search_entry.props.xalign = 0.5
         
-        self.scrolled_window = ScrolledWindow(
+        # Only the rows that fit on screen exist; they are rebound on scroll
+        self.viewport = VirtualList(
             name="scrolled-window",
-            spacing=10,
+            spacing=4,
             h_expand=True,
             v_expand=True,
             h_align="fill",
             v_align="fill",
-            child=self.viewport,
-            propagate_width=False,
-            propagate_height=False,
+            placeholder=Box(
+                name="no-clip-container",
+                orientation="v",
+                h_align="center",
+                v_align="center",
+                h_expand=True,
+                v_expand=True,
+                children=[
+                    Label(
+                        name="no-clip",
+                        markup=icons.clipboard,
+                        h_align="center",
+                        v_align="center",
+                    ),
+                ],
+            ),
         )
+        self.viewport.register_kind("clip", self.create_clipboard_item, self.bind_clipboard_item)
 
         self.header_box = Box(
             name="header_box",
@@ -87,232 +111,64 @@ class ClipHistory(Box):
             orientation="v",
             children=[
                 self.header_box,
-                self.scrolled_window,
+                self.viewport,
             ],
         )
 
         self.add(self.history_box)
         self.show_all()
+        # The notch can switch away from the panel without calling close()
+        self.connect("unmap", lambda *_: self._set_open(False))
 
     def close(self):
         """Close the clipboard history panel"""
-        self.viewport.children = []
+        self._set_open(False)
+        self.viewport.clear()
+        self.preview_loader.retain((), self)
         self.selected_index = -1
         self.notch.close_notch()
 
     def open(self):
-        """Open the clipboard history panel and load items"""
-        if self._loading:
-            return
-        self._loading = True
+        """Open the clipboard history panel with the known items and sync in the background"""
         self.search_entry.set_text("")
         self.search_entry.grab_focus()
-
-        # Use GLib.Thread for proper async execution
-        GLib.Thread.new("cliphist-loader", self._load_clipboard_items_thread, None)
-
-    def _load_clipboard_items_thread(self, user_data):
-        """Background thread worker for loading clipboard items"""
-        try:
-            result = subprocess.run(
-                ["cliphist", "list"], 
-                capture_output=True, 
-                check=True
-            )
-            # Decode stdout with error handling
-            stdout_str = result.stdout.decode('utf-8', errors='replace')
-            lines = stdout_str.strip().split('\n')
-            new_items = []
-            for line in lines:
-                if not line or "<meta http-equiv" in line:
-                    continue
-                new_items.append(line)
-            # Update UI from main thread
-            GLib.idle_add(self._update_items, new_items)
-        except subprocess.CalledProcessError as e:
-            print(f"Error loading clipboard history: {e}", file=sys.stderr)
-        except Exception as e:
-            print(f"Unexpected error: {e}", file=sys.stderr)
-        finally:
-            GLib.idle_add(self._loading_finished)
-    
-    def _loading_finished(self):
-        """Handle loading completion on main thread"""
-        self._loading = False
-        if self._pending_updates:
-            self._pending_updates = False
-            GLib.Thread.new("cliphist-loader", self._load_clipboard_items_thread, None)
-        return False
-
-    def _update_items(self, new_items):
-        """Update the items list from main thread"""
-        self.clipboard_items = new_items
+        self._set_open(True)
         self.display_clipboard_items()
 
-    def display_clipboard_items(self, filter_text=""):
-        """Display clipboard items in the viewport"""
-        remove_handler(self._arranger_handler) if self._arranger_handler else None
-        self.viewport.children = []
-        self.selected_index = -1
-        
-
-        filtered_items = []
-        for item in self.clipboard_items:
-
-            content = item.split('\t', 1)[1] if '\t' in item else item
-            if filter_text.lower() in content.lower():
-                filtered_items.append(item)
-        
-
-        if not filtered_items:
-
-            container = Box(
-                name="no-clip-container",
-                orientation="v",
-                h_align="center",
-                v_align="center",
-                h_expand=True,
-                v_expand=True
-            )
-            
-
-            label = Label(
-                name="no-clip",
-                markup=icons.clipboard,
-                h_align="center",
-                v_align="center",
-            )
-            
-            container.add(label)
-            self.viewport.add(container)
+    def _set_open(self, is_open):
+        if is_open == self._is_open:
             return
-            
-
-        self._display_items_batch(filtered_items, 0, 10)
-
-    def _display_items_batch(self, items, start, batch_size):
-        """Display items in batches to keep UI responsive"""
-        end = min(start + batch_size, len(items))
-        
-        for i in range(start, end):
-            item = items[i]
-            self.viewport.add(self.create_clipboard_item(item))
-        
-
-        if end < len(items):
-            GLib.idle_add(self._display_items_batch, items, end, batch_size)
+        self._is_open = is_open
+        if is_open:
+            self.history.view_opened()
         else:
+            self.history.view_closed()
 
-            if self.search_entry.get_text() and self.viewport.get_children():
-                self.update_selection(0)
-
-    def create_clipboard_item(self, item):
-        """Create a button for a clipboard item"""
-
-        parts = item.split('\t', 1)
-        item_id = parts[0] if len(parts) > 1 else "0"
-        content = parts[1] if len(parts) > 1 else item
-        
+    def _on_history_changed(self, _history):
+        if self._is_open:
+            self.display_clipboard_items(self.search_entry.get_text())
 
-        display_text = content.strip()
-        if len(display_text) > 100:
-            display_text = display_text[:97] + "..."
-        
-
-        is_image = self.is_image_data(content)
-        
-        if is_image:
-
-            button = Button(
-                name="slot-button",
-                child=Box(
-                    name="slot-box",
-                    orientation="h",
-                    spacing=10,
-                    children=[
-                        Image(name="clip-icon", h_align="start"),
-                        Label(
-                            name="clip-label",
-                            label="[Image]",
-                            ellipsization="end",
-                            v_align="center",
-                            h_align="start",
-                            h_expand=True,
-                        ),
-                    ],
-                ),
-                tooltip_text="Image in clipboard",
-                on_clicked=lambda *_, id=item_id: self.paste_item(id),
-            )
-
-            self._load_image_preview_async(item_id, button)
-        else:
-
-            button = self.create_text_item_button(item_id, display_text)
-        
-
-        button.connect("key-press-event", lambda widget, event, id=item_id: self.on_item_key_press(widget, event, id))
-        
+    def display_clipboard_items(self, filter_text=""):
+        """Display clipboard items in the viewport"""
+        self.selected_index = -1
 
-        button.set_can_focus(True)
-        button.add_events(Gdk.EventMask.KEY_PRESS_MASK)
-            
-        return button
+        filtered_items = self.history.search(filter_text)
 
-    def _load_image_preview_async(self, item_id, button):
-        """Load image preview asynchronously using background thread"""
-        GLib.Thread.new("image-preview", self._load_image_preview_thread, (item_id, button))
+        self.viewport.set_items(filtered_items, "clip")
+        self._retain_visible_previews()
+        if self.search_entry.get_text() and filtered_items:
+            self.update_selection(0)
 
-    def _load_image_preview_thread(self, data):
-        """Background thread worker for loading image preview"""
-        item_id, button = data
-        try:
-            if item_id in self.image_cache:
-                pixbuf = self.image_cache[item_id]
-                GLib.idle_add(self._update_image_button, button, pixbuf)
-                return
-            
-            result = subprocess.run(
-                ["cliphist", "decode", item_id],
-                capture_output=True,
-                check=True
-            )
-            loader = GdkPixbuf.PixbufLoader()
-            loader.write(result.stdout)
-            loader.close()
-            pixbuf = loader.get_pixbuf()
-            width, height = pixbuf.get_width(), pixbuf.get_height()
-            max_size = 72
-            if width > height:
-                new_width = max_size
-                new_height = int(height * (max_size / width))
-            else:
-                new_height = max_size
-                new_width = int(width * (max_size / height))
-            pixbuf = pixbuf.scale_simple(new_width, new_height, GdkPixbuf.InterpType.BILINEAR)
-            self.image_cache[item_id] = pixbuf
-            
-            GLib.idle_add(self._update_image_button, button, pixbuf)
-        except Exception as e:
-            print(f"Error loading image preview: {e}", file=sys.stderr)
-
-    def _update_image_button(self, button, pixbuf):
-        """Update the button with the loaded image preview"""
-        box = button.get_child()
-        if box and len(box.get_children()) > 0:
-            image_widget = box.get_children()[0]
-            if isinstance(image_widget, Image):
-                image_widget.set_from_pixbuf(pixbuf)
-
-    def create_text_item_button(self, item_id, display_text):
-        """Create a button for a text clipboard item"""
-        return Button(
+    def create_clipboard_item(self):
+        """Create a reusable row for clipboard items"""
+        button = Button(
             name="slot-button",
             child=Box(
                 name="slot-box",
                 orientation="h",
                 spacing=10,
                 children=[
+                    Image(name="clip-icon", h_align="start"),
                     Label(
                         name="clip-icon",
                         markup=icons.clip_text,
@@ -320,7 +176,6 @@ class ClipHistory(Box):
                     ),
                     Label(
                         name="clip-label",
-                        label=display_text,
                         ellipsization="end",
                         v_align="center",
                         h_align="start",
@@ -328,42 +183,98 @@ class ClipHistory(Box):
                     ),
                 ],
             ),
-            tooltip_text=display_text,
-            on_clicked=lambda *_: self.paste_item(item_id),
+            on_clicked=lambda button, *_: self.paste_item(button.item_id),
         )
+        button.item_id = None
+        button.entry = None
+        button.preview_key = None
+        button.preview_shown = False
 
-    def is_image_data(self, content):
-        """Determine if clipboard content is likely an image"""
+        button.connect("key-press-event", self.on_item_key_press)
 
-        return (
-            content.startswith("data:image/") or
-            content.startswith("\x89PNG") or
-            content.startswith("GIF8") or
-            content.startswith("\xff\xd8\xff") or
-            re.match(r'^\s*<img\s+', content) is not None or
-            "binary" in content.lower() and any(ext in content.lower() for ext in ["jpg", "jpeg", "png", "bmp", "gif"])
-        )
+        button.set_can_focus(True)
+        button.add_events(Gdk.EventMask.KEY_PRESS_MASK)
+
+        return button
+
+    def bind_clipboard_item(self, button, entry, index):
+        """Show a clipboard history entry in a recycled row"""
+        item_id = entry.id
+        content = entry.content
+        # Not the id alone: cliphist numbers entries again after a wipe
+        if button.entry is entry:
+            # The request may have been dropped while the panel was closed
+            if button.preview_key is not None and not button.preview_shown:
+                self.preview_loader.request(item_id, button.preview_key, self)
+            return
+        button.item_id = item_id
+        button.entry = entry
+
+        button.preview_key = None
+        button.preview_shown = False
+        self._retain_visible_previews()
+
+        image, text_icon, label = button.get_child().get_children()
+        if entry.is_image:
+            image.set_visible(True)
+            text_icon.set_visible(False)
+            label.set_label("[Image]")
+            button.set_tooltip_text("Image in clipboard")
+            key = preview_key(item_id, content)
+            button.preview_key = key
+            if key in self.image_cache:
+                self.image_cache.move_to_end(key)
+                image.set_from_pixbuf(self.image_cache[key])
+                button.preview_shown = True
+            else:
+                image.clear()
+                self.preview_loader.request(item_id, key, self)
+        else:
+            display_text = content.strip()
+            if len(display_text) > 100:
+                display_text = display_text[:97] + "..."
+            image.set_visible(False)
+            text_icon.set_visible(True)
+            label.set_label(display_text)
+            button.set_tooltip_text(display_text)
+
+    def _retain_visible_previews(self):
+        """Once binding settles, drop preview requests for rows that are no longer shown"""
+        if not self._retain_previews_pending:
+            self._retain_previews_pending = True
+            GLib.idle_add(self._do_retain_visible_previews)
+
+    def _do_retain_visible_previews(self):
+        self._retain_previews_pending = False
+        visible_keys = [
+            row.preview_key for row in self.viewport.visible_rows()
+            if getattr(row, "preview_key", None)
+        ]
+        self.preview_loader.retain(visible_keys, self)
+        return False
+
+    def _update_image_button(self, item_id, key, pixbuf):
+        """Show a loaded image preview if its item is still on screen"""
+        if pixbuf is None:
+            return False
+        self.image_cache[key] = pixbuf
+        self.image_cache.move_to_end(key)
+        while len(self.image_cache) > MEMORY_PREVIEWS:
+            self.image_cache.popitem(last=False)
+        # Rows are recycled, so the row may show another item by now
+        for button in self.viewport.visible_rows():
+            if getattr(button, "preview_key", None) == key:
+                button.get_child().get_children()[0].set_from_pixbuf(pixbuf)
+                button.preview_shown = True
+        return False
 
     def paste_item(self, item_id):
         """Copy the selected item to the clipboard and close (async)"""
-        GLib.Thread.new("paste-item", self._paste_item_thread, item_id)
+        self.clipboard.copy_history_item(item_id, on_done=self._on_item_pasted)
 
-    def _paste_item_thread(self, item_id):
-        """Background thread worker for pasting clipboard item"""
-        try:
-            result = subprocess.run(
-                ["cliphist", "decode", item_id],
-                capture_output=True,
-                check=True
-            )
-            subprocess.run(
-                ["wl-copy"],
-                input=result.stdout,
-                check=True
-            )
-            GLib.idle_add(self.close)
-        except subprocess.CalledProcessError as e:
-            print(f"Error pasting clipboard item: {e}", file=sys.stderr)
+    def _on_item_pasted(self, ok):
+        if ok:
+            self.close()
 
     def delete_item(self, item_id):
         """Delete the selected clipboard item (async)"""
@@ -376,9 +287,8 @@ class ClipHistory(Box):
                 ["cliphist", "delete", item_id],
                 check=True
             )
-            self._pending_updates = True
-            if not self._loading:
-                GLib.Thread.new("cliphist-loader", self._load_clipboard_items_thread, None)
+            self.preview_cache.discard_item(item_id)
+            GLib.idle_add(self.history.remove, item_id)
         except subprocess.CalledProcessError as e:
             print(f"Error deleting clipboard item: {e}", file=sys.stderr)
 
@@ -390,9 +300,8 @@ class ClipHistory(Box):
         """Background thread worker for clearing clipboard history"""
         try:
             subprocess.run(["cliphist", "wipe"], check=True)
-            self._pending_updates = True
-            if not self._loading:
-                GLib.Thread.new("cliphist-loader", self._load_clipboard_items_thread, None)
+            self.preview_cache.clear()
+            GLib.idle_add(self.history.clear)
         except subprocess.CalledProcessError as e:
             print(f"Error clearing clipboard history: {e}", file=sys.stderr)
 
@@ -421,26 +330,13 @@ class ClipHistory(Box):
 
     def update_selection(self, new_index):
         """Update the selected item in the viewport"""
-        children = self.viewport.get_children()
-        
-
-        if self.selected_index != -1 and self.selected_index < len(children):
-            current_button = children[self.selected_index]
-            current_button.get_style_context().remove_class("selected")
-            
-
-        if new_index != -1 and new_index < len(children):
-            new_button = children[new_index]
-            new_button.get_style_context().add_class("selected")
-            self.selected_index = new_index
-            self.scroll_to_selected(new_button)
-        else:
-            self.selected_index = -1
+        self.viewport.select(new_index)
+        self.selected_index = self.viewport.selected_index
 
     def move_selection(self, delta):
         """Move the selection up or down"""
-        children = self.viewport.get_children()
-        if not children:
+        items = self.viewport.items
+        if not items:
             return
             
 
@@ -449,62 +345,32 @@ class ClipHistory(Box):
         else:
             new_index = self.selected_index + delta
             
-        new_index = max(0, min(new_index, len(children) - 1))
+        new_index = max(0, min(new_index, len(items) - 1))
         self.update_selection(new_index)
 
-    def scroll_to_selected(self, button):
-        """Scroll to ensure the selected item is visible"""
-        def scroll():
-            adj = self.scrolled_window.get_vadjustment()
-            alloc = button.get_allocation()
-            if alloc.height == 0:
-                return False
-
-            y = alloc.y
-            height = alloc.height
-            page_size = adj.get_page_size()
-            current_value = adj.get_value()
-
-            visible_top = current_value
-            visible_bottom = current_value + page_size
-
-            if y < visible_top:
-
-                adj.set_value(y)
-            elif y + height > visible_bottom:
-
-                new_value = y + height - page_size
-                adj.set_value(new_value)
-            return False
-        GLib.idle_add(scroll)
-
     def use_selected_item(self):
         """Use (paste) the selected clipboard item"""
-        children = self.viewport.get_children()
-        if not children or self.selected_index == -1 or self.selected_index >= len(self.clipboard_items):
+        entry = self.viewport.get_item(self.selected_index)
+        if entry is None:
             return
-            
 
-        item_line = self.clipboard_items[self.selected_index]
-        item_id = item_line.split('\t', 1)[0]
+        item_id = entry.id
         self.paste_item(item_id)
 
     def delete_selected_item(self):
         """Delete the selected clipboard item"""
-        children = self.viewport.get_children()
-        if not children or self.selected_index == -1:
+        entry = self.viewport.get_item(self.selected_index)
+        if entry is None:
             return
-            
 
-        item_line = self.clipboard_items[self.selected_index]
-        item_id = item_line.split('\t', 1)[0]
+        item_id = entry.id
         self.delete_item(item_id)
 
-    def on_item_key_press(self, widget, event, item_id):
+    def on_item_key_press(self, widget, event):
         """Handle key press events on clipboard items"""
         if event.keyval in (Gdk.KEY_Return, Gdk.KEY_KP_Enter):
 
-            self.paste_item(item_id)
+            self.paste_item(widget.item_id)
             return True
         return False
 
@@ -1,11 +1,9 @@
-import json
+import copy
 import logging
 
 import cairo
-from fabric.hyprland.widgets import get_hyprland_connection
-from fabric.utils import (exec_shell_command, exec_shell_command_async,
-                          get_relative_path, idle_add, remove_handler)
-from fabric.utils.helpers import get_desktop_applications
+from fabric.utils import (exec_shell_command_async,
+                          idle_add, remove_handler)
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.eventbox import EventBox
@@ -15,40 +13,40 @@ from gi.repository import Gdk, GLib, Gtk
 
 import config.data as data
 from modules.corners import MyCorner
+from services.app_catalog import get_app_catalog
+from services.config_service import DOCK_CONFIG_FILE, get_config_service
+from services.hyprland_state import get_hyprland_state
+from utils.occlusion import get_occlusion_engine
+from utils.icon_cache import get_icon_cache
 from utils.icon_resolver import IconResolver
 from widgets.wayland import WaylandWindow as Window
 
 
 def read_config():
-    """Read and return the full configuration from the JSON file, handling missing file."""
-    config_path = get_relative_path("../config/dock.json")
-    try:
-        with open(config_path, "r") as file:
-            config_data = json.load(file)
-            
-        if "pinned_apps" in config_data and config_data["pinned_apps"] and isinstance(config_data["pinned_apps"][0], str):
-            all_apps = get_desktop_applications()
-            app_map = {app.name: app for app in all_apps if app.name}
-            
-            old_pinned = config_data["pinned_apps"]
-            config_data["pinned_apps"] = []
-            
-            for app_id in old_pinned:
-                app = app_map.get(app_id)
-                if app:
-                    app_data_obj = {
-                        "name": app.name,
-                        "display_name": app.display_name,
-                        "window_class": app.window_class,
-                        "executable": app.executable,
-                        "command_line": app.command_line
-                    }
-                    config_data["pinned_apps"].append(app_data_obj)
-                else:
-                    config_data["pinned_apps"].append({"name": app_id})
-                
-    except (FileNotFoundError, json.JSONDecodeError):
-        config_data = {"pinned_apps": []}
+    """Return a copy of the dock configuration, migrating pinned apps stored as plain names."""
+    config_data = copy.deepcopy(get_config_service().load(DOCK_CONFIG_FILE)) or {"pinned_apps": []}
+
+    if "pinned_apps" in config_data and config_data["pinned_apps"] and isinstance(config_data["pinned_apps"][0], str):
+        all_apps = get_app_catalog().apps
+        app_map = {app.name: app for app in all_apps if app.name}
+        
+        old_pinned = config_data["pinned_apps"]
+        config_data["pinned_apps"] = []
+        
+        for app_id in old_pinned:
+            app = app_map.get(app_id)
+            if app:
+                app_data_obj = {
+                    "name": app.name,
+                    "display_name": app.display_name,
+                    "window_class": app.window_class,
+                    "executable": app.executable,
+                    "command_line": app.command_line
+                }
+                config_data["pinned_apps"].append(app_data_obj)
+            else:
+                config_data["pinned_apps"].append({"name": app_id})
+
     return config_data
 
 def createSurfaceFromWidget(widget: Gtk.Widget) -> cairo.ImageSurface:
@@ -143,15 +141,18 @@ class Dock(Window):
                     self.set_margin("0px 0px 0px 0px")
 
         self.config = read_config()
-        self.conn = get_hyprland_connection()
+        self.hyprland_state = get_hyprland_state()
         self.icon_resolver = IconResolver() 
         self.pinned = self.config.get("pinned_apps", [])
-        self.config_path = get_relative_path("../config/dock.json")
+        self.config_path = DOCK_CONFIG_FILE
         self.app_map = {}
-        self._all_apps = get_desktop_applications()
-        self.app_identifiers = self._build_app_identifiers_map()
+        # Shared by the docks of all monitors
+        self.app_catalog = get_app_catalog()
+        self._all_apps = self.app_catalog.apps
+        self.app_identifiers = self.app_catalog.identifiers
         
         self.hide_id = None
+        self._update_dock_pending = False
         self._arranger_handler = None
         self._drag_in_progress = False
         self.is_mouse_over_dock_area = False
@@ -285,32 +286,28 @@ class Dock(Window):
         self.view.connect("drag-begin", self.on_drag_begin)
         self.view.connect("drag-end", self.on_drag_end)
 
-        if self.conn.ready:
-            self.update_dock()
-            if not self.integrated_mode: GLib.timeout_add(500, self.check_occlusion_state)
-        else:
-            self.conn.connect("event::ready", self.update_dock)
-            if not self.integrated_mode: self.conn.connect("event::ready", lambda *args: GLib.timeout_add(250, self.check_occlusion_state))
+        self.update_dock()
+        if not self.integrated_mode:
+            occlusion_side = "bottom" if self.actual_dock_is_horizontal else anchor_to_set
+            self._occlusion_watch = get_occlusion_engine().watch(
+                monitor_id, occlusion_side, self.effective_occlusion_size,
+                lambda _is_occluded: self.check_occlusion_state(),
+            )
 
         # Listen to window events to update dock when apps open/close
-        self.conn.connect("event::openwindow", self.update_dock)
-        self.conn.connect("event::closewindow", self.update_dock)
+        self.hyprland_state.connect("client-added", self._schedule_update_dock)
+        self.hyprland_state.connect("client-removed", self._schedule_update_dock)
+        self.app_catalog.connect("changed", self._schedule_update_dock)
         
         if not self.integrated_mode:
-            self.conn.connect("event::workspace", self.check_hide)
+            self.hyprland_state.connect("active-workspace-changed", self.check_hide)
         
-        GLib.timeout_add_seconds(2, self.check_config_change)
+        # Pinned apps and dock_always_show apply as soon as their files change
+        config_service = get_config_service()
+        config_service.subscribe(self._on_dock_config_changed, path=DOCK_CONFIG_FILE)
+        if not self.integrated_mode:
+            config_service.subscribe(self._on_always_show_changed, keys=["dock_always_show"])
             
-    def _build_app_identifiers_map(self):
-        identifiers = {}
-        for app in self._all_apps:
-            if app.name: identifiers[app.name.lower()] = app
-            if app.display_name: identifiers[app.display_name.lower()] = app
-            if app.window_class: identifiers[app.window_class.lower()] = app
-            if app.executable: identifiers[app.executable.split('/')[-1].lower()] = app
-            if app.command_line: identifiers[app.command_line.split()[0].split('/')[-1].lower()] = app
-        return identifiers
-
     def _normalize_window_class(self, class_name):
         if not class_name: return ""
         normalized = class_name.lower()
@@ -399,9 +396,11 @@ class Dock(Window):
         return None
 
     def update_app_map(self):
-        self._all_apps = get_desktop_applications()
+        if self.app_map and self._all_apps is self.app_catalog.apps:
+            return
+        self._all_apps = self.app_catalog.apps
         self.app_map = {app.name: app for app in self._all_apps if app.name}
-        self.app_identifiers = self._build_app_identifiers_map()
+        self.app_identifiers = self.app_catalog.identifiers
 
     def create_button(self, app_identifier, instances):
         desktop_app = self.find_app(app_identifier)
@@ -409,7 +408,7 @@ class Dock(Window):
         display_name = None
         
         if desktop_app:
-            icon_img = desktop_app.get_icon_pixbuf(size=self.icon_size) 
+            icon_img = get_icon_cache().app_icon(desktop_app, self.icon_size)
             display_name = desktop_app.display_name or desktop_app.name
         
         id_value = app_identifier["name"] if isinstance(app_identifier, dict) else app_identifier
@@ -474,7 +473,7 @@ class Dock(Window):
             focused = self.get_focused()
             idx = next((i for i, inst in enumerate(instances) if inst["address"] == focused), -1)
             next_inst = instances[(idx + 1) % len(instances)]
-            exec_shell_command(f"hyprctl dispatch focuswindow address:{next_inst['address']}")
+            self.hyprland_state.dispatch(f"focuswindow address:{next_inst['address']}")
 
     def _on_child_enter(self, widget, event):
         if self.integrated_mode: return False 
@@ -518,7 +517,15 @@ class Dock(Window):
                 self.dock_revealer.set_reveal_child(False)
             self.dock_full.add_style_class("occluded")
 
+    def _schedule_update_dock(self, *args):
+        # Several windows usually open/close together, rebuild once for the burst
+        if self._update_dock_pending:
+            return
+        self._update_dock_pending = True
+        GLib.idle_add(self.update_dock)
+
     def update_dock(self, *args):
+        self._update_dock_pending = False
         self.update_app_map()
         arranger_handler = getattr(self, "_arranger_handler", None)
         if arranger_handler: remove_handler(arranger_handler)
@@ -626,16 +633,13 @@ class Dock(Window):
         return False
 
     def get_clients(self):
-        try: return json.loads(self.conn.send_command("j/clients").reply.decode())
-        except json.JSONDecodeError: return []
+        return self.hyprland_state.get_clients()
 
     def get_focused(self):
-        try: return json.loads(self.conn.send_command("j/activewindow").reply.decode()).get("address", "")
-        except json.JSONDecodeError: return ""
+        return self.hyprland_state.get_active_window_address()
 
     def get_workspace(self):
-        try: return json.loads(self.conn.send_command("j/activeworkspace").reply.decode()).get("id", 0)
-        except json.JSONDecodeError: return 0
+        return self.hyprland_state.get_active_workspace_id()
 
     def check_occlusion_state(self):
         if self.integrated_mode:
@@ -651,14 +655,14 @@ class Dock(Window):
                 if self.dock_revealer.get_reveal_child():
                     self.dock_revealer.set_reveal_child(False)
                 self.dock_full.add_style_class("occluded")
-            return True
+            return False
 
         if self.is_mouse_over_dock_area or self._drag_in_progress or self._prevent_occlusion:
             if not self.dock_revealer.get_reveal_child():
                 self.dock_revealer.set_reveal_child(True)
             if not self.always_show:
                  self.dock_full.remove_style_class("occluded")
-            return True
+            return False
 
         if self.always_show:
             if not self.dock_revealer.get_reveal_child():
@@ -669,7 +673,7 @@ class Dock(Window):
                 self.dock_revealer.set_reveal_child(False)
             self.dock_full.add_style_class("occluded")
 
-        return True
+        return False
 
     def _find_drag_target(self, widget):
         children = self.view.get_children()
@@ -747,37 +751,28 @@ class Dock(Window):
                 elif instances_dragged:
                     address = instances_dragged[0].get("address")
                     if address:
-                        exec_shell_command(f"hyprctl dispatch focuswindow address:{address}")
+                        self.hyprland_state.dispatch(f"focuswindow address:{address}")
 
             self._drag_in_progress = False
             if not self.integrated_mode:
                 self.check_occlusion_state()
 
         GLib.idle_add(process_drag_end)
-    def check_config_change(self):
-        new_config = read_config()
-        if not self.integrated_mode:
-            new_always_show = data.DOCK_ALWAYS_SHOW 
-            if self.always_show != new_always_show:
-                self.always_show = new_always_show
-                self.check_occlusion_state() 
+    def _on_dock_config_changed(self, _changed_keys):
+        self.check_config_change_immediate()
 
-        if new_config.get("pinned_apps", []) != self.config.get("pinned_apps", []):
-            self.config = new_config
-            self.pinned = self.config.get("pinned_apps", [])
-            self.update_app_map()
-            self.update_dock()
-        return True 
+    def _on_always_show_changed(self, _changed_keys):
+        always_show = get_config_service().get("dock_always_show", data.DOCK_ALWAYS_SHOW)
+        if self.always_show != always_show:
+            self.always_show = always_show
+            self.check_occlusion_state()
 
     def update_pinned_apps_file(self):
-        config_path = get_relative_path("../config/dock.json")
-        try:
-            with open(config_path, "w") as file:
-                json.dump(self.config, file, indent=4)
+        # Also updates the docks of the other monitors
+        if get_config_service().write(self.config_path, self.config):
             return True
-        except Exception as e:
-            logging.error(f"Failed to write dock config: {e}")
-            return False
+        logging.error("Failed to write dock config")
+        return False
 
     def update_pinned_apps(self, skip_update=False):
         pinned_children_data = [] 
@@ -809,13 +804,6 @@ class Dock(Window):
     def check_config_change_immediate(self): 
         new_config = read_config()
         
-        if not self.integrated_mode:
-            previous_always_show = self.always_show
-            self.always_show = data.DOCK_ALWAYS_SHOW 
-            
-            if previous_always_show != self.always_show:
-                self.check_occlusion_state() 
-        
         if new_config.get("pinned_apps", []) != self.config.get("pinned_apps", []):
             self.config = new_config
             self.pinned = self.config.get("pinned_apps", [])
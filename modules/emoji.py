@@ -1,9 +1,3 @@
-import os
-import subprocess
-
-import ijson
-from fabric.utils import remove_handler
-from fabric.utils.helpers import get_relative_path
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.entry import Entry
@@ -13,12 +7,15 @@ from gi.repository import Gdk
 
 import config.data as data
 import modules.icons as icons
+from services.clipboard import get_clipboard_service
+from utils.emoji_index import get_emoji_index
 
 vertical_mode = data.PANEL_THEME == "Panel" and (data.BAR_POSITION in ["Left", "Right"] or data.PANEL_POSITION in ["Start", "End"])
 
 emoji_rows = 3 if not vertical_mode else 9
 emoji_columns = 9 if not vertical_mode else 5
 
+
 class EmojiPicker(Box):
     def __init__(self, **kwargs):
         super().__init__(
@@ -35,8 +32,8 @@ class EmojiPicker(Box):
         self.filtered_emojis = []
         self.total_pages = 0
 
-        self._arranger_handler: int = 0
-        self._all_emojis = self._load_emoji_data()
+        # Memory-mapped index shared by the pickers of every monitor
+        self._index = get_emoji_index()
 
         self.stack = Stack(
             name="viewport",
@@ -45,6 +42,11 @@ class EmojiPicker(Box):
             transition_type="slide-up-down",
             transition_duration=200,
         )
+        # Two recycled pages, so page changes still slide between children
+        self._pages = [self._build_page(name) for name in ("page-a", "page-b")]
+        for page in self._pages:
+            self.stack.add_named(page, page.get_name())
+        self._page_slot = 0
         self.search_entry = Entry(
             name="search-entry",
             placeholder="Search Emojis...",
@@ -85,21 +87,8 @@ class EmojiPicker(Box):
         self.add(self.picker_box)
         self.show_all()
 
-    def _load_emoji_data(self):
-        emoji_data = {}
-        emoji_file_path = get_relative_path("../assets/emoji.json")
-        if not os.path.exists(emoji_file_path):
-            print(f"Emoji JSON file not found at: {emoji_file_path}")
-            return {}
-
-        with open(emoji_file_path, 'r') as f:
-            for emoji_char, emoji_info in ijson.kvitems(f, ''):
-                emoji_data[emoji_char] = emoji_info
-        return emoji_data
-
     def close_picker(self):
-        self.stack.children = []
-        self.selected_index = -1
+        self.update_selection(-1)
         self.notch.close_notch()
 
     def open_picker(self):
@@ -109,16 +98,12 @@ class EmojiPicker(Box):
         self.search_entry.grab_focus()
 
     def arrange_viewport(self, query: str = ""):
-        remove_handler(self._arranger_handler) if self._arranger_handler else None
-        self.stack.children = []
-        self.selected_index = -1
+        self.update_selection(-1)
         self.current_page_index = 0
 
-        self.filtered_emojis = [
-            (emoji_char, emoji_info)
-            for emoji_char, emoji_info in self._all_emojis.items()
-            if query.casefold() in (emoji_info.get("name", "") + " " + emoji_info.get("group", "")).casefold()
-        ]
+        query = query.casefold()
+        # Emoji numbers in the index
+        self.filtered_emojis = self._index.search(query) if self._index is not None else []
         self.total_pages = (len(self.filtered_emojis) + self.emojis_per_page - 1) // self.emojis_per_page if self.filtered_emojis else 0
 
         self.load_page(self.current_page_index)
@@ -130,26 +115,45 @@ class EmojiPicker(Box):
         if query.strip() != "" and self.get_all_emoji_buttons():
             self.update_selection(0)
 
+    def _build_page(self, name: str) -> Box:
+        grid_box = Box(name="emoji-grid-box", orientation="v", spacing=2)
+        for _ in range(emoji_rows):
+            grid_box.add(Box(
+                name="emoji-row-box",
+                orientation="h",
+                spacing=2,
+                children=[self.bake_emoji_slot() for _ in range(emoji_columns)],
+            ))
+        page_box = Box(name=name, orientation="v", spacing=4, children=[grid_box])
+        page_box.show_all()
+        # Unused slots stay hidden even if an ancestor calls show_all()
+        for row_box in grid_box.get_children():
+            row_box.set_no_show_all(True)
+        for button in self._page_buttons(page_box):
+            button.set_no_show_all(True)
+        return page_box
+
     def load_page(self, page_index):
         self.update_selection(-1)
-        page_box = Box(name=f"page-box-{page_index}", orientation="v", spacing=4)
         start_index = page_index * self.emojis_per_page
         end_index = min((page_index + 1) * self.emojis_per_page, len(self.filtered_emojis))
         page_emojis = self.filtered_emojis[start_index:end_index]
 
-        grid_box = Box(name="emoji-grid-box", orientation="v", spacing=2)
-
-        row_box = None
-        for i, (emoji_char, emoji_info) in enumerate(page_emojis):
-            if i % emoji_columns == 0:
-                row_box = Box(name="emoji-row-box", orientation="h", spacing=2)
-                grid_box.add(row_box)
-            if row_box is not None:
-                row_box.add(self.bake_emoji_slot(emoji_char, emoji_info))
-        page_box.add(grid_box)
-        self.stack.add_named(page_box, f"page-{page_index}")
-        self.stack.set_visible_child_name(f"page-{page_index}")
-        page_box.show_all()
+        # Fill the page that is not on screen and slide to it
+        self._page_slot = 1 - self._page_slot
+        page_box = self._pages[self._page_slot]
+        for row_box in page_box.get_children()[0].get_children():
+            row_box.show()
+        for i, button in enumerate(self._page_buttons(page_box)):
+            if i < len(page_emojis):
+                self.bind_emoji_slot(button, self._index.char(page_emojis[i]), self._index.name(page_emojis[i]))
+                button.show()
+            else:
+                button.hide()
+        for row_box in page_box.get_children()[0].get_children():
+            if not any(button.get_visible() for button in row_box.get_children()):
+                row_box.hide()
+        self.stack.set_visible_child(page_box)
 
 
         buttons = self.get_all_emoji_buttons()
@@ -164,7 +168,7 @@ class EmojiPicker(Box):
     def resize_viewport(self):
         return False
 
-    def bake_emoji_slot(self, emoji_char: str, emoji_info: dict, **kwargs) -> Button:
+    def bake_emoji_slot(self, **kwargs) -> Button:
         button = Button(
             name="emoji-slot-button",
             child=Box(
@@ -175,7 +179,6 @@ class EmojiPicker(Box):
                 children=[
                     Label(
                         name="emoji-char-label",
-                        label=emoji_char,
                         use_markup=True,
                         v_align="center",
                         h_align="center",
@@ -183,12 +186,17 @@ class EmojiPicker(Box):
                     ),
                 ],
             ),
-            tooltip_text=emoji_info.get("name", "Unknown"),
-            on_clicked=lambda *_: (self.copy_emoji_to_clipboard(emoji_char), self.close_picker()),
+            on_clicked=lambda button, *_: (self.copy_emoji_to_clipboard(button.emoji_char), self.close_picker()),
             **kwargs,
         )
+        button.emoji_char = ""
         return button
 
+    def bind_emoji_slot(self, button: Button, emoji_char: str, name: str):
+        button.emoji_char = emoji_char
+        button.get_child().get_children()[0].set_label(emoji_char)
+        button.set_tooltip_text(name or "Unknown")
+
     def update_selection(self, new_index: int):
         buttons = self.get_all_emoji_buttons()
         if not buttons:
@@ -209,15 +217,19 @@ class EmojiPicker(Box):
              self.selected_index = -1
 
 
-    def get_all_emoji_buttons(self):
+    def _page_buttons(self, page_box):
         buttons = []
-        current_page = self.stack.get_visible_child()
-        if current_page and current_page.get_children():
-            if current_page.get_children()[0].get_children():
-                for row_box in current_page.get_children()[0].get_children():
-                    buttons.extend(row_box.get_children())
+        for row_box in page_box.get_children()[0].get_children():
+            buttons.extend(row_box.get_children())
         return buttons
 
+    def get_all_emoji_buttons(self):
+        return [
+            button
+            for button in self._page_buttons(self._pages[self._page_slot])
+            if button.get_visible()
+        ]
+
 
     def on_search_entry_activate(self, text):
         buttons = self.get_all_emoji_buttons()
@@ -315,7 +327,4 @@ class EmojiPicker(Box):
         self.update_selection(new_index)
 
     def copy_emoji_to_clipboard(self, emoji_char: str):
-        try:
-            subprocess.run(["wl-copy"], input=emoji_char.encode('utf-8'), check=True)
-        except subprocess.CalledProcessError as e:
-            print(f"Clipboard copy failed: {e}")
+        get_clipboard_service().copy_text(emoji_char)
@@ -1,32 +1,40 @@
+import copy
 import json
 import math
-import operator
 import os
 import re
-import subprocess
-from collections.abc import Iterator
 
-import numpy as np
-from fabric.utils import (DesktopApp, exec_shell_command_async,
-                          get_desktop_applications, idle_add, remove_handler)
+from fabric.utils import DesktopApp, exec_shell_command_async
 from fabric.utils.helpers import get_relative_path
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.entry import Entry
 from fabric.widgets.image import Image
 from fabric.widgets.label import Label
-from fabric.widgets.scrolledwindow import ScrolledWindow
 from gi.repository import Gdk, GLib
 
 import config.data as data
 import modules.icons as icons
-from modules.dock import Dock
 from modules.updater import run_updater
+from services.app_catalog import get_app_catalog
+from services.clipboard import get_clipboard_service
+from services.config_service import DOCK_CONFIG_FILE, get_config_service
+from utils.app_index import app_key
 from utils.conversion import Conversion
+from utils.frecency import get_frecency_store
+from utils.icon_cache import get_icon_cache
+from utils.lazy_import import lazy_import
+from widgets.virtual_list import VirtualList
+
+# Only needed by the calculator
+np = lazy_import("numpy")
 
 tooltip_settings = f"<b>Open {data.APP_NAME_CAP} Settings</b>"
 tooltip_close = "<b>Close</b>"
 
+# Weight of launch frecency relative to text match quality in search ranking
+FRECENCY_WEIGHT = 10.0
+
 class AppLauncher(Box):
     def __init__(self, **kwargs):
         super().__init__(
@@ -39,8 +47,11 @@ class AppLauncher(Box):
         self.notch = kwargs["notch"]
         self.selected_index = -1
 
-        self._arranger_handler: int = 0
-        self._all_apps = get_desktop_applications()
+        # Apps and their search index are shared by the launchers of all monitors
+        self._app_catalog = get_app_catalog()
+        self._all_apps = self._app_catalog.apps
+        self._search_index = self._app_catalog.search_index
+        self._frecency = get_frecency_store()
 
 
         self.converter = Conversion()
@@ -58,7 +69,6 @@ class AppLauncher(Box):
         else:
             self.conversion_history = []
 
-        self.viewport = Box(name="viewport", spacing=4, orientation="v")
         self.search_entry = Entry(
             name="search-entry",
             placeholder="Search Applications...",
@@ -69,17 +79,17 @@ class AppLauncher(Box):
             on_key_press_event=self.on_search_entry_key_press,
         )
         self.search_entry.props.xalign = 0.5
-        self.scrolled_window = ScrolledWindow(
+        # Only the rows that fit on screen exist; they are rebound on scroll
+        self.viewport = VirtualList(
             name="scrolled-window",
-            spacing=10,
+            spacing=4,
             h_expand=True,
             v_expand=True,
             h_align="fill",
             v_align="fill",
-            child=self.viewport,
-            propagate_width=False,
-            propagate_height=False,
         )
+        self.viewport.register_kind("app", self.create_app_slot, self.bind_app_slot)
+        self.viewport.register_kind("history", self.create_history_slot, self.bind_history_slot)
 
         self.header_box = Box(
             name="header_box",
@@ -110,7 +120,7 @@ class AppLauncher(Box):
             orientation="v",
             children=[
                 self.header_box,
-                self.scrolled_window,
+                self.viewport,
             ],
         )
 
@@ -120,12 +130,12 @@ class AppLauncher(Box):
         self.show_all()
 
     def close_launcher(self):
-        self.viewport.children = []
+        self.viewport.clear()
         self.selected_index = -1
         self.notch.close_notch()
 
     def open_launcher(self):
-        self._all_apps = get_desktop_applications()
+        self._all_apps = self._app_catalog.apps
         self.arrange_viewport()
         
 
@@ -145,7 +155,7 @@ class AppLauncher(Box):
         """Make sure the launcher is initialized with apps list before opening"""
         if not hasattr(self, '_initialized'):
 
-            self._all_apps = get_desktop_applications()
+            self._all_apps = self._app_catalog.apps
             self._initialized = True
             return True
         return False
@@ -159,68 +169,27 @@ class AppLauncher(Box):
             # In conversion mode, update history view once (not per keystroke)
             self.update_conversion_viewport()
             return
-        remove_handler(self._arranger_handler) if self._arranger_handler else None
-        self.viewport.children = []
         self.selected_index = -1
 
-        def extract_command_name(command_line):
-            """Extract base command name from command line, removing paths and arguments"""
-            if not command_line:
-                return ""
-            # Remove common shell wrappers
-            if command_line.startswith("/bin/sh -c"):
-                # Handle wrapped commands like "/bin/sh -c "\$SHELL -i -c scrcpy""
-                return ""
-            # Split by spaces and take first part (the command)
-            cmd = command_line.split()[0] if command_line.split() else ""
-            # Extract just the command name from full paths
-            if "/" in cmd:
-                cmd = cmd.split("/")[-1]
-            return cmd
-
-        filtered_apps_iter = iter(
-            sorted(
-                [
-                    app
-                    for app in self._all_apps
-                    if query.casefold()
-                    in (
-                        (app.display_name or "")
-                        + (" " + app.name + " ")
-                        + (app.generic_name or "")
-                        + (" " + (app.command_line or "") + " ")
-                        + (" " + (app.executable or "") + " ")
-                        + (" " + extract_command_name(app.command_line) + " ")
-                    ).casefold()
-                ],
-                key=lambda app: (app.display_name or "").casefold(),
-            )
-        )
-        should_resize = operator.length_hint(filtered_apps_iter) == len(self._all_apps)
-
-        self._arranger_handler = idle_add(
-            lambda apps_iter: self.add_next_application(apps_iter) or self.handle_arrange_complete(should_resize, query),
-            filtered_apps_iter,
-            pin=True,
-        )
-
-    def handle_arrange_complete(self, should_resize, query):
-        if query.strip() != "" and self.viewport.get_children():
+        filtered_apps = self._search_index.search(query, boost=self._frecency_boost)
+        self.viewport.set_items(filtered_apps, "app")
+        if query.strip() != "" and filtered_apps:
             self.update_selection(0)
-        return False
 
-    def add_next_application(self, apps_iter: Iterator[DesktopApp]):
-        if not (app := next(apps_iter, None)):
-            return False
-        self.viewport.add(self.bake_application_slot(app))
-        return True
+    def _frecency_boost(self, app: DesktopApp) -> float:
+        return FRECENCY_WEIGHT * math.log1p(self._frecency.score(app_key(app)))
+
+    def launch_app(self, app: DesktopApp):
+        self._frecency.record(app_key(app))
+        app.launch()
+        self.close_launcher()
 
     def resize_viewport(self):
         # Removed set_min_content_width to prevent size retention issues
         # when switching between modules in the notch stack
         pass
 
-    def bake_application_slot(self, app: DesktopApp, **kwargs) -> Button:
+    def create_app_slot(self) -> Button:
         button = Button(
             name="slot-button",
             child=Box(
@@ -228,17 +197,15 @@ class AppLauncher(Box):
                 orientation="h",
                 spacing=10,
                 children=[
-                    Image(name="app-icon", pixbuf=app.get_icon_pixbuf(size=24), h_align="start"),
+                    Image(name="app-icon", h_align="start"),
                     Label(
                         name="app-label",
-                        label=app.display_name or "Unknown",
                         ellipsization="end",
                         v_align="center",
                         h_align="center",
                     ),
                     Label(
                         name="app-desc",
-                        label=app.description or "",
                         ellipsization="end",
                         v_align="center",
                         h_align="start",
@@ -246,51 +213,58 @@ class AppLauncher(Box):
                     ),
                 ],
             ),
-            tooltip_text=app.description,
-            on_clicked=lambda *_: (app.launch(), self.close_launcher()),
-            **kwargs,
+            on_clicked=lambda button, *_: self.launch_app(button.app),
         )
+        button.app = None
         return button
 
-    def update_selection(self, new_index: int):
-
-        if self.selected_index != -1 and self.selected_index < len(self.viewport.get_children()):
-            current_button = self.viewport.get_children()[self.selected_index]
-            current_button.get_style_context().remove_class("selected")
-
-        if new_index != -1 and new_index < len(self.viewport.get_children()):
-            new_button = self.viewport.get_children()[new_index]
-            new_button.get_style_context().add_class("selected")
-            self.selected_index = new_index
-            self.scroll_to_selected(new_button)
-        else:
-            self.selected_index = -1
-
-    def scroll_to_selected(self, button):
-        def scroll():
-            adj = self.scrolled_window.get_vadjustment()
-            alloc = button.get_allocation()
-            if alloc.height == 0:
-                return False
-
-            y = alloc.y
-            height = alloc.height
-            page_size = adj.get_page_size()
-            current_value = adj.get_value()
-
-            visible_top = current_value
-            visible_bottom = current_value + page_size
-
-            if y < visible_top:
-
-                adj.set_value(y)
-            elif y + height > visible_bottom:
+    def bind_app_slot(self, button: Button, app: DesktopApp, index: int):
+        if button.app is app:
+            return
+        button.app = app
+        icon, label, desc = button.get_child().get_children()
+        icon.set_from_pixbuf(get_icon_cache().app_icon(app, 24))
+        label.set_label(app.display_name or "Unknown")
+        desc.set_label(app.description or "")
+        button.set_tooltip_text(app.description)
+
+    def create_history_slot(self) -> Button:
+        button = Button(
+            name="slot-button",
+            child=Box(
+                name="calc-slot-box",
+                orientation="h",
+                spacing=10,
+                children=[
+                    Label(
+                        name="calc-label",
+                        ellipsization="end",
+                        v_align="center",
+                        h_align="center",
+                    ),
+                ],
+            ),
+            on_clicked=lambda button, *_: self.copy_text_to_clipboard(button.text),
+        )
+        button.text = ""
+        return button
 
-                new_value = y + height - page_size
-                adj.set_value(new_value)
+    def bind_history_slot(self, button: Button, text: str, index: int):
+        button.text = text
+        display_text = text
+        if "=>" in text:
+            parts = text.split("=>")
+            expression = parts[0].strip()
+            result = parts[1].strip()
+            # For very long results, truncate for display but keep full in tooltip
+            if len(result) > 50:
+                display_text = f"{expression} => {result[:47]}..."
+        button.get_child().get_children()[0].set_label(display_text)
+        button.set_tooltip_text(text)
 
-            return False
-        GLib.idle_add(scroll)
+    def update_selection(self, new_index: int):
+        self.viewport.select(new_index)
+        self.selected_index = self.viewport.selected_index
 
     def on_search_entry_activate(self, text):
         if text.startswith("="):
@@ -319,14 +293,14 @@ class AppLauncher(Box):
                 exec_shell_command_async(f"python {get_relative_path('../config/config.py')}")
                 self.close_launcher()
             case _:
-                children = self.viewport.get_children()
-                if children:
+                if self.viewport.items:
 
                     if text.strip() == "" and self.selected_index == -1:
                         return
                     selected_index = self.selected_index if self.selected_index != -1 else 0
-                    if 0 <= selected_index < len(children):
-                        children[selected_index].clicked()
+                    app = self.viewport.get_item(selected_index)
+                    if app is not None:
+                        self.launch_app(app)
 
     def on_search_entry_key_press(self, widget, event):
         text = widget.get_text()
@@ -423,13 +397,9 @@ class AppLauncher(Box):
 
     def add_selected_app_to_dock(self):
         """Adds the currently selected application to the dock.json file with comprehensive metadata."""
-        children = self.viewport.get_children()
-        if not children or self.selected_index == -1 or self.selected_index >= len(children):
+        if self.viewport.kind != "app":
             return
-
-        selected_button = children[self.selected_index]
-
-        selected_app = next((app for app in self._all_apps if app.display_name == selected_button.get_child().get_children()[1].props.label), None)
+        selected_app = self.viewport.get_item(self.selected_index)
         if not selected_app:
             return
 
@@ -442,12 +412,8 @@ class AppLauncher(Box):
             "icon_name": selected_app.icon_name
         }.items() if v is not None}
 
-        config_path = get_relative_path("../config/dock.json")
-        try:
-            with open(config_path, "r") as file:
-                data = json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
-            data = {"pinned_apps": []}
+        config_service = get_config_service()
+        data = copy.deepcopy(config_service.load(DOCK_CONFIG_FILE)) or {"pinned_apps": []}
 
         already_pinned = False
         for pinned_app in data.get("pinned_apps", []):
@@ -467,22 +433,19 @@ class AppLauncher(Box):
             data.setdefault("pinned_apps", []).append(app_data)
         
 
-        with open(config_path, "w") as file:
-            json.dump(data, file, indent=4)
-            
-
-        Dock.notify_config_change()
+        # Docks follow dock.json through the config service
+        config_service.write(DOCK_CONFIG_FILE, data)
 
     def move_selection(self, delta: int):
-        children = self.viewport.get_children()
-        if not children:
+        items = self.viewport.items
+        if not items:
             return
 
         if self.selected_index == -1 and delta == 1:
             new_index = 0
         else:
             new_index = self.selected_index + delta
-        new_index = max(0, min(new_index, len(children) - 1))
+        new_index = max(0, min(new_index, len(items) - 1))
         self.update_selection(new_index)
 
     def save_calc_history(self):
@@ -605,140 +568,27 @@ class AppLauncher(Box):
         self.update_conversion_viewport()
         
     def update_calculator_viewport(self):
-        self.viewport.children = []
-        for item in self.calc_history:
-            btn = self.create_calc_history_button(item)
-            self.viewport.add(btn)
+        self.viewport.set_items(self.calc_history, "history")
 
         if self.selected_index >= len(self.calc_history):
             self.selected_index = -1
+        elif self.selected_index != -1:
+            self.viewport.select(self.selected_index)
     
     def update_conversion_viewport(self):
-        self.viewport.children = []
-        for item in self.conversion_history:
-            btn = self.create_conversion_history_button(item)
-            self.viewport.add(btn)
+        self.viewport.set_items(self.conversion_history, "history")
         # Don't reset selection index here automatically
         # Ensure selection state stays valid
         if self.selected_index >= len(self.conversion_history):
             self.selected_index = -1
+        elif self.selected_index != -1:
+            self.viewport.select(self.selected_index)
 
-    def create_calc_history_button(self, text: str) -> Button:
-
-        if "=>" in text:
-            parts = text.split("=>")
-            expression = parts[0].strip()
-            result = parts[1].strip()
-            
-
-            display_text = text
-            if len(result) > 50:
-                display_text = f"{expression} => {result[:47]}..."
-                
-            btn = Button(
-                name="slot-button",
-                child=Box(
-                    name="calc-slot-box",
-                    orientation="h",
-                    spacing=10,
-                    children=[
-                        Label(
-                            name="calc-label",
-                            label=display_text,
-                            ellipsization="end",
-                            v_align="center",
-                            h_align="center",
-                        ),
-                    ],
-                ),
-                tooltip_text=text,
-                on_clicked=lambda *_: self.copy_text_to_clipboard(text),
-            )
-        else:
-
-            btn = Button(
-                name="slot-button",
-                child=Box(
-                    name="calc-slot-box",
-                    orientation="h",
-                    spacing=10,
-                    children=[
-                        Label(
-                            name="calc-label",
-                            label=text,
-                            ellipsization="end",
-                            v_align="center",
-                            h_align="center",
-                        ),
-                    ],
-                ),
-                tooltip_text=text,
-                on_clicked=lambda *_: self.copy_text_to_clipboard(text),
-            )
-        return btn
-
-    def create_conversion_history_button(self, text: str) -> Button:
-        # Parse the result to create a more readable display
-        if "=>" in text:
-            parts = text.split("=>")
-            expression = parts[0].strip()
-            result = parts[1].strip()
-            
-            # For very long results, truncate for display but keep full in tooltip
-            display_text = text
-            if len(result) > 50:  # Truncate long results
-                display_text = f"{expression} => {result[:47]}..."
-                
-            btn = Button(
-                name="slot-button",  # reuse existing CSS styling
-                child=Box(
-                    name="calc-slot-box",
-                    orientation="h",
-                    spacing=10,
-                    children=[
-                        Label(
-                            name="calc-label",
-                            label=display_text,
-                            ellipsization="end",
-                            v_align="center",
-                            h_align="center",
-                        ),
-                    ],
-                ),
-                tooltip_text=text,
-                on_clicked=lambda *_: self.copy_text_to_clipboard(text),
-            )
-        else:
-            # Fallback for non-calculation entries
-            btn = Button(
-                name="slot-button",
-                child=Box(
-                    name="calc-slot-box",
-                    orientation="h",
-                    spacing=10,
-                    children=[
-                        Label(
-                            name="calc-label",
-                            label=text,
-                            ellipsization="end",
-                            v_align="center",
-                            h_align="center",
-                        ),
-                    ],
-                ),
-                tooltip_text=text,
-                on_clicked=lambda *_: self.copy_text_to_clipboard(text),
-            )
-        return btn
-    
     def copy_text_to_clipboard(self, text: str):
 
         parts = text.split("=>", 1)
         copy_text = parts[1].strip() if len(parts) > 1 else text
-        try:
-            subprocess.run(["wl-copy"], input=copy_text.encode(), check=True)
-        except subprocess.CalledProcessError as e:
-            print(f"Clipboard copy failed: {e}")
+        get_clipboard_service().copy_text(copy_text)
 
     def delete_selected_calc_history(self):
         if self.selected_index != -1 and self.selected_index < len(self.calc_history):
@@ -3,8 +3,6 @@ import logging
 import subprocess
 import time
 
-import psutil
-from fabric.core.fabricator import Fabricator
 from fabric.utils.helpers import invoke_repeater
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
@@ -20,6 +18,10 @@ import config.data as data
 from modules.upower.upower import UPowerManager
 import modules.icons as icons
 from services.network import NetworkClient
+from utils.lazy_import import lazy_import
+
+# Loaded by the first metrics update, after startup
+psutil = lazy_import("psutil")
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +29,8 @@ class MetricsProvider:
     """
     Class responsible for obtaining centralized CPU, memory, disk usage, and battery metrics.
     It updates periodically so that all widgets querying it display the same values.
+    Widgets subscribe to it instead of running their own timers, so the number
+    of timers does not grow with the number of monitors.
     """
     def __init__(self):
         self.gpu = []
@@ -42,9 +46,28 @@ class MetricsProvider:
 
         self._gpu_update_running = False
         self._gpu_update_counter = 0
+        self._gpu_info = None
+        self._listeners = {}  # handle -> callback
+        self._next_handle = 0
 
         GLib.timeout_add_seconds(2, self._update)
 
+    def subscribe(self, callback, owner=None) -> int:
+        """
+        Call callback() on the main loop after every update. With owner (a
+        widget), the callback is dropped when the owner is destroyed.
+        Returns a handle for unsubscribe().
+        """
+        self._next_handle += 1
+        handle = self._next_handle
+        self._listeners[handle] = callback
+        if owner is not None:
+            owner.connect("destroy", lambda *_: self.unsubscribe(handle))
+        return handle
+
+    def unsubscribe(self, handle: int):
+        self._listeners.pop(handle, None)
+
     def _update(self):
         self.cpu = psutil.cpu_percent(interval=0)
         self.mem = psutil.virtual_memory().percent
@@ -66,6 +89,13 @@ class MetricsProvider:
             self.bat_charging = battery['State'] == 1
             self.bat_time = battery['TimeToFull'] if self.bat_charging else battery['TimeToEmpty']
 
+        # Copied: a callback may unsubscribe
+        for callback in list(self._listeners.values()):
+            try:
+                callback()
+            except Exception:
+                # One broken widget must not stop the timer for the others
+                logger.exception("Metrics listener failed")
         return True
 
     def _start_gpu_update_async(self):
@@ -136,6 +166,12 @@ class MetricsProvider:
         return (self.bat_percent, self.bat_charging, self.bat_time)
 
     def get_gpu_info(self):
+        # The GPU list is fixed, so every widget on every monitor shares one nvtop run
+        if self._gpu_info is None:
+            self._gpu_info = self._query_gpu_info()
+        return self._gpu_info
+
+    def _query_gpu_info(self):
         try:
             result = subprocess.check_output(["nvtop", "-s"], text=True, timeout=5)
             return json.loads(result)
@@ -225,7 +261,7 @@ class Metrics(Box):
         for x in self.scales:
             self.add(x)
 
-        GLib.timeout_add_seconds(2, self.update_status)
+        shared_provider.subscribe(self.update_status, owner=self)
 
     def update_status(self):
         cpu, mem, disks, gpus = shared_provider.get_metrics()
@@ -322,7 +358,7 @@ class MetricsSmall(Button):
         self.connect("enter-notify-event", self.on_mouse_enter)
         self.connect("leave-notify-event", self.on_mouse_leave)
 
-        GLib.timeout_add_seconds(2, self.update_metrics)
+        shared_provider.subscribe(self.update_metrics, owner=self)
 
         self.hide_timer = None
         self.hover_counter = 0
@@ -441,14 +477,9 @@ class Battery(Button):
         self.connect("enter-notify-event", self.on_mouse_enter)
         self.connect("leave-notify-event", self.on_mouse_leave)
 
-        self.batt_fabricator = Fabricator(
-            poll_from=lambda v: shared_provider.get_battery(),
-            on_changed=lambda f, v: self.update_battery,
-            interval=1000,
-            stream=False,
-            default_value=0
+        shared_provider.subscribe(
+            lambda: self.update_battery(None, shared_provider.get_battery()), owner=self
         )
-        self.batt_fabricator.changed.connect(self.update_battery)
         GLib.idle_add(self.update_battery, None, shared_provider.get_battery())
 
         self.hide_timer = None
@@ -533,7 +564,8 @@ class NetworkApplet(Button):
     def __init__(self, **kwargs):
         super().__init__(name="button-bar", **kwargs)
         self.download_label = Label(name="download-label", markup="Download: 0 B/s")
-        self.network_client = NetworkClient()
+        # Created once the applet is shown, so NM is not loaded while it is hidden
+        self.network_client = None
         self.upload_label = Label(name="upload-label", markup="Upload: 0 B/s")
         self.wifi_label = Label(name="network-icon-label", markup="WiFi: Unknown")
 
@@ -566,7 +598,7 @@ class NetworkApplet(Button):
             self.upload_icon.set_margin_top(4)
             self.download_icon.set_margin_bottom(4)
 
-        self.last_counters = psutil.net_io_counters()
+        self.last_counters = None
         self.last_time = time.time()
         invoke_repeater(1000, self.update_network)
 
@@ -574,9 +606,18 @@ class NetworkApplet(Button):
         self.connect("leave-notify-event", self.on_mouse_leave)
 
     def update_network(self):
+        if not self.get_visible():
+            self.last_counters = None
+            return True
+        if self.network_client is None:
+            self.network_client = NetworkClient()
         current_time = time.time()
         elapsed = current_time - self.last_time
         current_counters = psutil.net_io_counters()
+        if self.last_counters is None:
+            self.last_counters = current_counters
+            self.last_time = current_time
+            return True
         download_speed = (current_counters.bytes_recv - self.last_counters.bytes_recv) / elapsed
         upload_speed = (current_counters.bytes_sent - self.last_counters.bytes_sent) / elapsed
         download_str = self.format_speed(download_speed)
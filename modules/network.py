@@ -1,7 +1,6 @@
 import gi
 
 gi.require_version('Gtk', '3.0')
-gi.require_version('NM', '1.0')
 from fabric.utils import bulk_connect
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
@@ -9,7 +8,7 @@ from fabric.widgets.centerbox import CenterBox
 from fabric.widgets.image import Image
 from fabric.widgets.label import Label
 from fabric.widgets.scrolledwindow import ScrolledWindow
-from gi.repository import NM, GLib, Gtk
+from gi.repository import GLib, Gtk
 
 import modules.icons as icons
 from services.network import NetworkClient
@@ -1,5 +1,5 @@
 from fabric.hyprland.widgets import HyprlandActiveWindow as ActiveWindow
-from fabric.utils.helpers import FormattedString, get_desktop_applications
+from fabric.utils.helpers import FormattedString
 from fabric.widgets.box import Box
 from fabric.widgets.centerbox import CenterBox
 from fabric.widgets.image import Image
@@ -20,15 +20,32 @@ from modules.player import PlayerSmall
 from modules.power import PowerMenu
 from modules.tmux import TmuxManager
 from modules.tools import Toolbox
+from services.app_catalog import get_app_catalog
+from services.hyprland_state import get_hyprland_state
+from utils.icon_cache import get_icon_cache
 from utils.icon_resolver import IconResolver
-from utils.occlusion import check_occlusion
+from utils.occlusion import get_occlusion_engine
 from widgets.wayland import WaylandWindow as Window
 
 
+def _notch_module(name: str):
+    """Notch page that is built the first time it is accessed."""
+    return property(lambda self: self._get_module(name))
+
+
 class Notch(Window):
+    launcher = _notch_module("launcher")
+    overview = _notch_module("overview")
+    emoji = _notch_module("emoji")
+    power = _notch_module("power")
+    tmux = _notch_module("tmux")
+    cliphist = _notch_module("cliphist")
+    tools = _notch_module("tools")
+
     def __init__(self, monitor_id: int = 0, **kwargs):
         self.monitor_id = monitor_id
         self.monitor_manager = None
+        self.hyprland_state = get_hyprland_state()
         
         # Get monitor manager
         try:
@@ -157,8 +174,7 @@ class Notch(Window):
         self._forced_occlusion = False
 
         self.icon_resolver = IconResolver()
-        self._all_apps = get_desktop_applications()
-        self.app_identifiers = self._build_app_identifiers_map()
+        self.app_catalog = get_app_catalog()
 
         self.dashboard = Dashboard(notch=self)
         self.nhistory = self.dashboard.widgets.notification_history
@@ -170,12 +186,18 @@ class Notch(Window):
         self.btdevices.set_visible(False)
         self.nwconnections.set_visible(False)
 
-        self.launcher = AppLauncher(notch=self)
-        self.overview = Overview(monitor_id=monitor_id)
-        self.emoji = EmojiPicker(notch=self)
-        self.power = PowerMenu(notch=self)
-        self.tmux = TmuxManager(notch=self)
-        self.cliphist = ClipHistory(notch=self)
+        # Every page but the dashboard is built on first open (or prewarmed
+        # when idle), so startup does not pay for pages that are never used
+        self._modules = {}
+        self._module_factories = {
+            "launcher": lambda: AppLauncher(notch=self),
+            "overview": lambda: Overview(monitor_id=monitor_id),
+            "emoji": lambda: EmojiPicker(notch=self),
+            "power": lambda: PowerMenu(notch=self),
+            "tmux": lambda: TmuxManager(notch=self),
+            "cliphist": lambda: ClipHistory(notch=self),
+            "tools": lambda: Toolbox(notch=self),
+        }
 
         # Audio service initialization
         self.audio = Audio()
@@ -283,9 +305,12 @@ class Notch(Window):
         )
 
         self.active_window.connect("notify::label", self.update_window_icon)
+        # The label comes from fabric's own connection, the window data from the
+        # shared state; refresh again once the state has seen the focus change.
+        self.hyprland_state.connect("active-window-changed", self.update_window_icon)
 
         if data.PANEL_THEME == "Notch":
-            self.active_window.connect("notify::label", self.on_active_window_changed)
+            self.hyprland_state.connect("active-window-changed", self.on_active_window_changed)
 
         self.active_window.get_children()[0].set_hexpand(True)
         self.active_window.get_children()[0].set_halign(Gtk.Align.FILL)
@@ -341,7 +366,6 @@ class Notch(Window):
         self.compact.connect("enter-notify-event", self.on_button_enter)
         self.compact.connect("leave-notify-event", self.on_button_leave)
 
-        self.tools = Toolbox(notch=self)
         self.stack = Stack(
             name="notch-content",
             v_expand=True,
@@ -354,14 +378,7 @@ class Notch(Window):
             transition_duration=250,
             children=[
                 self.compact,
-                self.launcher,
                 self.dashboard,
-                self.overview,
-                self.emoji,
-                self.power,
-                self.tools,
-                self.tmux,
-                self.cliphist,
             ],
         )
 
@@ -375,16 +392,20 @@ class Notch(Window):
             data.PANEL_POSITION in ["Start", "End"] and data.PANEL_THEME == "Panel"
         ):
             self.compact.set_size_request(260, 40)
-            self.launcher.set_size_request(320, 635)
-            self.tmux.set_size_request(320, 635)
-            self.cliphist.set_size_request(320, 635)
+            self._module_sizes = {
+                "launcher": (320, 635),
+                "tmux": (320, 635),
+                "cliphist": (320, 635),
+            }
             self.dashboard.set_size_request(410, 900)
 
         else:
             self.compact.set_size_request(260, 40)
-            self.launcher.set_size_request(480, 244)
-            self.tmux.set_size_request(480, 244)
-            self.cliphist.set_size_request(480, 244)
+            self._module_sizes = {
+                "launcher": (480, 244),
+                "tmux": (480, 244),
+                "cliphist": (480, 244),
+            }
             self.dashboard.set_size_request(1093, 472)
 
         self.stack.set_interpolate_size(True)
@@ -509,16 +530,47 @@ class Notch(Window):
 
         self._current_window_class = self._get_current_window_class()
 
-        # Always enable occlusion detection for fullscreen windows
-        GLib.timeout_add(500, self._check_occlusion)
-
         if data.PANEL_THEME == "Notch":
             self.notch_revealer.set_reveal_child(True)
         else:
             self.notch_revealer.set_reveal_child(False)
 
+        # Always enable occlusion detection for fullscreen windows
+        self._is_occluded = False
+        self._occlusion_watch = get_occlusion_engine().watch(
+            self.monitor_id, "top", 40, self._on_occlusion_changed
+        )
+
         self.connect("key-press-event", self.on_key_press)
 
+        if data.NOTCH_PREWARM:
+            GLib.timeout_add_seconds(3, self._start_prewarm)
+
+    def _get_module(self, name: str):
+        """Return the named notch page, building and adding it to the stack on first use."""
+        module = self._modules.get(name)
+        if module is None:
+            module = self._module_factories[name]()
+            self._modules[name] = module
+            size = self._module_sizes.get(name)
+            if size:
+                module.set_size_request(*size)
+            self.stack.add(module)
+            module.show_all()
+        return module
+
+    def _start_prewarm(self):
+        GLib.idle_add(self._prewarm_next_module, priority=GLib.PRIORITY_LOW)
+        return False
+
+    def _prewarm_next_module(self):
+        """Build one pending page per idle slot so input is never blocked for long."""
+        for name in self._module_factories:
+            if name not in self._modules:
+                self._get_module(name)
+                return True
+        return False
+
     # Audio-related methods
     def _connect_audio_signals(self, retry_count=0):
         max_retries = 5
@@ -818,6 +870,7 @@ class Notch(Window):
             return False
 
         self.is_hovered = False
+        self._check_occlusion()
 
         return False
 
@@ -845,6 +898,8 @@ class Notch(Window):
             else:
                 self.set_margin("-40px 8px 8px 8px")
 
+        self._check_occlusion()
+
     def open_notch(self, widget_name: str):
         # Debug info for troubleshooting
         if hasattr(self, '_debug_monitor_focus') and self._debug_monitor_focus:
@@ -874,42 +929,8 @@ class Notch(Window):
                 self.monitor_manager.set_notch_state(focused_monitor_id, True, widget_name)
 
     def _get_real_focused_monitor_id(self):
-        """Get the real focused monitor ID directly from Hyprland."""
-        # Use thread to avoid blocking UI
-        self._focused_monitor_result = None
-        GLib.Thread.new("get-focused-monitor", self._get_focused_monitor_thread, None)
-        # Wait for result (not ideal, but for compatibility)
-        import time
-        start = time.time()
-        while self._focused_monitor_result is None and time.time() - start < 2.0:
-            time.sleep(0.01)
-        return self._focused_monitor_result
-
-    def _get_focused_monitor_thread(self, user_data):
-        try:
-            import json
-            import subprocess
-
-            # Get focused monitor from Hyprland
-            result = subprocess.run(
-                ["hyprctl", "monitors", "-j"],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=2.0
-            )
-
-            monitors = json.loads(result.stdout)
-            for i, monitor in enumerate(monitors):
-                if monitor.get('focused', False):
-                    self._focused_monitor_result = i
-                    return
-
-        except (subprocess.CalledProcessError, json.JSONDecodeError,
-                FileNotFoundError, subprocess.TimeoutExpired) as e:
-            print(f"Warning: Could not get focused monitor from Hyprland: {e}")
-
-        self._focused_monitor_result = None
+        """Get the real focused monitor ID from the shared Hyprland state."""
+        return self.hyprland_state.get_focused_monitor_index()
     
     def _open_notch_internal(self, widget_name: str):
         
@@ -983,13 +1004,14 @@ class Notch(Window):
 
         hide_bar_revealers = False
 
+        # Built on demand: looking up a page's instance constructs it
         widget_configs = {
-            "tmux": {"instance": self.tmux, "action": self.tmux.open_manager},
-            "cliphist": {
+            "tmux": lambda: {"instance": self.tmux, "action": self.tmux.open_manager},
+            "cliphist": lambda: {
                 "instance": self.cliphist,
                 "action": lambda: GLib.idle_add(self.cliphist.open),
             },
-            "launcher": {
+            "launcher": lambda: {
                 "instance": self.launcher,
                 "action": self.launcher.open_launcher,
                 "focus": lambda: (
@@ -997,7 +1019,7 @@ class Notch(Window):
                     self.launcher.search_entry.grab_focus(),
                 ),
             },
-            "emoji": {
+            "emoji": lambda: {
                 "instance": self.emoji,
                 "action": self.emoji.open_picker,
                 "focus": lambda: (
@@ -1005,13 +1027,13 @@ class Notch(Window):
                     self.emoji.search_entry.grab_focus(),
                 ),
             },
-            "overview": {"instance": self.overview, "hide_revealers": True},
-            "power": {"instance": self.power},
-            "tools": {"instance": self.tools},
+            "overview": lambda: {"instance": self.overview, "hide_revealers": True},
+            "power": lambda: {"instance": self.power},
+            "tools": lambda: {"instance": self.tools},
         }
 
         if widget_name in widget_configs:
-            config = widget_configs[widget_name]
+            config = widget_configs[widget_name]()
             target_widget_on_stack = config["instance"]
             action_on_open = config.get("action")
             focus_action = config.get("focus")
@@ -1111,33 +1133,10 @@ class Notch(Window):
 
             self.update_window_icon()
 
-    def _build_app_identifiers_map(self):
-        """Build a mapping of app identifiers (class names, executables, names) to DesktopApp objects"""
-        identifiers = {}
-        for app in self._all_apps:
-            if app.name:
-                identifiers[app.name.lower()] = app
-
-            if app.display_name:
-                identifiers[app.display_name.lower()] = app
-
-            if app.window_class:
-                identifiers[app.window_class.lower()] = app
-
-            if app.executable:
-                exe_basename = app.executable.split("/")[-1].lower()
-                identifiers[exe_basename] = app
-
-            if app.command_line:
-                cmd_base = app.command_line.split()[0].split("/")[-1].lower()
-                identifiers[cmd_base] = app
-
-        return identifiers
-
     def find_app(self, app_id: str):
         """Find a DesktopApp object by various identifiers using the pre-built map."""
         normalized_id = app_id.lower()
-        return self.app_identifiers.get(normalized_id)
+        return self.app_catalog.identifiers.get(normalized_id)
 
     def update_window_icon(self, *args):
         """Update the window icon based on the current active window title"""
@@ -1153,55 +1152,41 @@ class Notch(Window):
 
         self.window_icon.set_visible(True)
 
-        from fabric.hyprland.widgets import get_hyprland_connection
-
-        conn = get_hyprland_connection()
-        if conn:
-            try:
-                import json
-
-                active_window_json = conn.send_command("j/activewindow").reply.decode()
-                active_window_data = json.loads(active_window_json)
-                app_id = active_window_data.get(
-                    "initialClass", ""
-                ) or active_window_data.get("class", "")
+        try:
+            active_window_data = self.hyprland_state.get_active_window()
+            app_id = active_window_data.get(
+                "initialClass", ""
+            ) or active_window_data.get("class", "")
 
-                icon_size = 20
-                desktop_app = self.find_app(app_id)
+            icon_size = 20
+            desktop_app = self.find_app(app_id)
 
-                icon_pixbuf = None
-                if desktop_app:
-                    icon_pixbuf = desktop_app.get_icon_pixbuf(size=icon_size)
+            icon_pixbuf = None
+            if desktop_app:
+                icon_pixbuf = get_icon_cache().app_icon(desktop_app, icon_size)
 
-                if not icon_pixbuf:
-                    icon_pixbuf = self.icon_resolver.get_icon_pixbuf(app_id, icon_size)
+            if not icon_pixbuf:
+                icon_pixbuf = self.icon_resolver.get_icon_pixbuf(app_id, icon_size)
 
-                if not icon_pixbuf and "-" in app_id:
-                    base_app_id = app_id.split("-")[0]
-                    icon_pixbuf = self.icon_resolver.get_icon_pixbuf(
-                        base_app_id, icon_size
-                    )
+            if not icon_pixbuf and "-" in app_id:
+                base_app_id = app_id.split("-")[0]
+                icon_pixbuf = self.icon_resolver.get_icon_pixbuf(
+                    base_app_id, icon_size
+                )
 
-                if icon_pixbuf:
-                    self.window_icon.set_from_pixbuf(icon_pixbuf)
-                else:
-                    try:
-                        self.window_icon.set_from_icon_name(
-                            "application-x-executable", 20
-                        )
-                    except:
-                        self.window_icon.set_from_icon_name(
-                            "application-x-executable-symbolic", 20
-                        )
-            except Exception as e:
-                print(f"Error updating window icon: {e}")
+            if icon_pixbuf:
+                self.window_icon.set_from_pixbuf(icon_pixbuf)
+            else:
                 try:
-                    self.window_icon.set_from_icon_name("application-x-executable", 20)
+                    self.window_icon.set_from_icon_name(
+                        "application-x-executable", 20
+                    )
                 except:
                     self.window_icon.set_from_icon_name(
                         "application-x-executable-symbolic", 20
                     )
-        else:
+        except Exception as e:
+            print(f"Error updating window icon: {e}")
             try:
                 self.window_icon.set_from_icon_name("application-x-executable", 20)
             except:
@@ -1209,32 +1194,29 @@ class Notch(Window):
                     "application-x-executable-symbolic", 20
                 )
 
+    def _on_occlusion_changed(self, is_occluded):
+        self._is_occluded = is_occluded
+        self._check_occlusion()
+
     def _check_occlusion(self):
         """
-        Check if top 40px of the screen is occluded by any window
-        and update the notch_revealer accordingly.
+        Update the notch_revealer from the last known occlusion state of the
+        top 40px of this monitor, pushed by the occlusion engine.
         """
 
-        occlusion_edge = "top"
-        occlusion_size = 40
-
         if self._forced_occlusion:
             # When forced occlusion is active, show only on hover
             self.notch_revealer.set_reveal_child(self.is_hovered)
         elif not (self.is_hovered or self._is_notch_open or self._prevent_occlusion):
-            is_occluded = check_occlusion((occlusion_edge, occlusion_size))
-            self.notch_revealer.set_reveal_child(not is_occluded)
+            self.notch_revealer.set_reveal_child(not self._is_occluded)
 
-        return True
+        return False
     
     def force_occlusion(self):
         """Force notch to occlusion mode (hidden)."""
         self._forced_occlusion = True
         self._prevent_occlusion = False
         self.notch_revealer.set_reveal_child(False)
-        # Start occlusion check timer if in vertical mode (left/right)
-        if data.BAR_POSITION in ["Left", "Right"]:
-            GLib.timeout_add(100, self._check_occlusion)
     
     def restore_from_occlusion(self):
         """Restore notch from occlusion mode."""
@@ -1248,21 +1230,10 @@ class Notch(Window):
 
     def _get_current_window_class(self):
         """Get the class of the currently active window"""
-        try:
-            from fabric.hyprland.widgets import get_hyprland_connection
-
-            conn = get_hyprland_connection()
-            if conn:
-                import json
-
-                active_window_json = conn.send_command("j/activewindow").reply.decode()
-                active_window_data = json.loads(active_window_json)
-                return active_window_data.get(
-                    "initialClass", ""
-                ) or active_window_data.get("class", "")
-        except Exception as e:
-            print(f"Error getting window class: {e}")
-        return ""
+        active_window_data = self.hyprland_state.get_active_window()
+        return active_window_data.get(
+            "initialClass", ""
+        ) or active_window_data.get("class", "")
 
     def on_active_window_changed(self, *args):
         """
@@ -1294,6 +1265,7 @@ class Notch(Window):
 
         self._prevent_occlusion = False
         self._occlusion_timer_id = None
+        self._check_occlusion()
 
         return False
 
@@ -1305,7 +1277,7 @@ class Notch(Window):
         if initial_text:
             self._typed_chars_buffer = initial_text
 
-        if self.stack.get_visible_child() == self.launcher:
+        if self.stack.get_visible_child() is self._modules.get("launcher"):
             current_text = self.launcher.search_entry.get_text()
             self.launcher.search_entry.set_text(current_text + initial_text)
 
@@ -1327,16 +1299,7 @@ class Notch(Window):
             "tmux",
         ]:
             self.stack.remove_style_class(style)
-        for w in [
-            self.launcher,
-            self.dashboard,
-            self.overview,
-            self.emoji,
-            self.power,
-            self.tools,
-            self.tmux,
-            self.cliphist,
-        ]:
+        for w in [self.dashboard, *self._modules.values()]:
             w.remove_style_class("open")
 
         self.stack.add_style_class("launcher")
@@ -1424,7 +1387,7 @@ class Notch(Window):
             self.stack.get_visible_child() == self.dashboard
             and self.dashboard.stack.get_visible_child() == self.dashboard.widgets
         ):
-            if self.stack.get_visible_child() == self.launcher:
+            if self.stack.get_visible_child() is self._modules.get("launcher"):
                 return False
 
             keyval = event.keyval
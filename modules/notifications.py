@@ -1,4 +1,3 @@
-import json
 import locale
 import os
 import uuid
@@ -17,22 +16,27 @@ from loguru import logger
 
 import config.data as data
 import modules.icons as icons
+from services.config_service import get_config_service
+from services.notification_history import (
+    PERSISTENT_DIR,
+    get_notification_history_store,
+)
 from widgets.image import CustomImage
 from widgets.wayland import WaylandWindow as Window
 
-PERSISTENT_DIR = f"/tmp/{data.APP_NAME}/notifications"
-PERSISTENT_HISTORY_FILE = os.path.join(PERSISTENT_DIR, "notification_history.json")
+# Historical notifications are built in pages as the history is scrolled
+HISTORY_PAGE_SIZE = 20
+# Distance from the bottom of the history, in pixels, that loads the next page
+HISTORY_LOAD_MORE_THRESHOLD = 200
 
 
-# Get configurable app lists from settings
+# Get configurable app lists from settings (cached, reloaded when config.json changes)
 def get_limited_apps_history():
-    config = data.load_config()
-    return config.get("limited_apps_history", ["Spotify"])
+    return get_config_service().get("limited_apps_history", ["Spotify"])
 
 
 def get_history_ignored_apps():
-    config = data.load_config()
-    return config.get("history_ignored_apps", ["Hyprshot"])
+    return get_config_service().get("history_ignored_apps", ["Hyprshot"])
 
 
 def cache_notification_pixbuf(notification_box):
@@ -459,6 +463,10 @@ class NotificationHistory(Box):
         super().__init__(name="notification-history", orientation="v", **kwargs)
 
         self.containers = []
+        # Stored notes without a widget yet, newest first
+        self._pending_notes = []
+        self._rebuild_pending = False
+        self._load_more_pending = False
         self.header_label = Label(
             name="nhh",
             label="Notifications",
@@ -526,10 +534,17 @@ class NotificationHistory(Box):
             children=[self.notifications_list, self.no_notifications_box],
         )
         self.scrolled_window.add_with_viewport(self.scrolled_window_viewport_box)
-        self.persistent_notifications = []
+        vadjustment = self.scrolled_window.get_vadjustment()
+        vadjustment.connect("value-changed", self._on_history_scrolled)
+        vadjustment.connect("changed", self._on_history_scrolled)
+        # History shared with the other monitors' views
+        self.history_store = get_notification_history_store()
+        self.history_store.connect("note-added", self._on_note_added)
+        self.history_store.connect("notes-removed", self._on_notes_removed)
+        self.history_store.connect("cleared", self._on_history_cleared)
         self.add(self.history_header)
         self.add(self.scrolled_window)
-        GLib.idle_add(self._load_persistent_history().__next__)
+        GLib.idle_add(self._load_persistent_history)
 
     def get_ordinal(self, n):
         if 11 <= (n % 100) <= 13:
@@ -590,9 +605,12 @@ class NotificationHistory(Box):
         )
 
     def rebuild_with_separators(self):
-        GLib.idle_add(self._do_rebuild_with_separators)
+        if not self._rebuild_pending:
+            self._rebuild_pending = True
+            GLib.idle_add(self._do_rebuild_with_separators)
 
     def _do_rebuild_with_separators(self):
+        self._rebuild_pending = False
         children = list(self.notifications_list.get_children())
         for child in children:
             self.notifications_list.remove(child)
@@ -618,6 +636,7 @@ class NotificationHistory(Box):
 
         self.notifications_list.show_all()
         self.update_no_notifications_label_visibility()
+        return False
 
     def on_do_not_disturb_changed(self, switch, pspec):
         self.do_not_disturb_enabled = switch.get_active()
@@ -638,38 +657,76 @@ class NotificationHistory(Box):
             self.notifications_list.remove(child)
             child.destroy()
 
-        if os.path.exists(PERSISTENT_HISTORY_FILE):
-            try:
-                os.remove(PERSISTENT_HISTORY_FILE)
-                logger.info("Notification history cleared and persistent file deleted.")
-            except Exception as e:
-                logger.error(f"Error deleting persistent history file: {e}")
-        self.persistent_notifications = []
         self.containers = []
+        self._pending_notes = []
+        self.history_store.clear()
         self.rebuild_with_separators()
 
     def _load_persistent_history(self):
-        if not os.path.exists(PERSISTENT_DIR):
-            os.makedirs(PERSISTENT_DIR, exist_ok=True)
-        if os.path.exists(PERSISTENT_HISTORY_FILE):
-            try:
-                with open(PERSISTENT_HISTORY_FILE, "r") as f:
-                    self.persistent_notifications = json.load(f)
-                for note in reversed(self.persistent_notifications):
-                    self._add_historical_notification(note)
-                    yield True
-            except Exception as e:
-                logger.error(f"Error loading persistent history: {e}")
-        GLib.idle_add(self.update_no_notifications_label_visibility)
+        self._pending_notes = [
+            note for note in self.history_store.notes
+            if self._find_container(note.get("id")) is None
+        ]
+        self._load_more_history()
+        self.update_no_notifications_label_visibility()
         self._cleanup_orphan_cached_images()
         self.schedule_midnight_update()
+        return False
 
-    def _save_persistent_history(self):
-        try:
-            with open(PERSISTENT_HISTORY_FILE, "w") as f:
-                json.dump(self.persistent_notifications, f)
-        except Exception as e:
-            logger.error(f"Error saving persistent history: {e}")
+    def _load_more_history(self):
+        self._load_more_pending = False
+        page = self._pending_notes[:HISTORY_PAGE_SIZE]
+        del self._pending_notes[:HISTORY_PAGE_SIZE]
+        for note in page:
+            self._add_historical_notification(note, older=True)
+        return False
+
+    def _on_history_scrolled(self, adjustment):
+        """Build the next page of history once the end of the list comes into view."""
+        if not self._pending_notes or self._load_more_pending:
+            return
+        bottom = adjustment.get_value() + adjustment.get_page_size()
+        if bottom >= adjustment.get_upper() - HISTORY_LOAD_MORE_THRESHOLD:
+            self._load_more_pending = True
+            GLib.idle_add(self._load_more_history)
+
+    def _find_container(self, note_id):
+        note_id = str(note_id)
+        for container in self.containers:
+            notif_box = getattr(container, "notification_box", None)
+            if notif_box is not None and str(getattr(notif_box, "uuid", None)) == note_id:
+                return container
+        return None
+
+    def _on_note_added(self, _store, note):
+        """Show a notification another monitor's view added to the history."""
+        if self._find_container(note.get("id")) is not None:
+            return
+        self._add_historical_notification(note)
+
+    def _on_notes_removed(self, _store, ids):
+        self._pending_notes = [
+            note for note in self._pending_notes if str(note.get("id")) not in ids
+        ]
+        removed = [
+            container for container in self.containers
+            if str(getattr(getattr(container, "notification_box", None), "uuid", None)) in ids
+        ]
+        if not removed:
+            return
+        for container in removed:
+            self.containers.remove(container)
+            container.destroy()
+        self.rebuild_with_separators()
+
+    def _on_history_cleared(self, _store):
+        self._pending_notes = []
+        if not self.containers:
+            return
+        for container in self.containers:
+            container.destroy()
+        self.containers = []
+        self.rebuild_with_separators()
 
     def delete_historical_notification(self, note_id, container):
         if hasattr(container, "notification_box"):
@@ -678,32 +735,19 @@ class NotificationHistory(Box):
 
         target_note_id_str = str(note_id)
 
-        new_persistent_notifications = []
-        removed_from_list = False
-        for note_in_list in self.persistent_notifications:
-            current_note_id_str = str(note_in_list.get("id"))
-            if current_note_id_str == target_note_id_str:
-                removed_from_list = True
-
-                continue
-            new_persistent_notifications.append(note_in_list)
-
-        if removed_from_list:
-            self.persistent_notifications = new_persistent_notifications
+        container.destroy()
+        self.containers = [c for c in self.containers if c != container]
+        if self.history_store.remove([target_note_id_str]):
             logger.info(
-                f"Notification with ID {target_note_id_str} was marked for removal from persistent_notifications list."
+                f"Notification with ID {target_note_id_str} was removed from the notification history."
             )
         else:
             logger.warning(
-                f"Notification with ID {target_note_id_str} was NOT found in persistent_notifications list. The list remains unchanged."
+                f"Notification with ID {target_note_id_str} was NOT found in the notification history. The history remains unchanged."
             )
-
-        self._save_persistent_history()
-        container.destroy()
-        self.containers = [c for c in self.containers if c != container]
         self.rebuild_with_separators()
 
-    def _add_historical_notification(self, note):
+    def _add_historical_notification(self, note, older=False):
         hist_notif = HistoricalNotification(
             id=note.get("id"),
             app_icon=note.get("app_icon"),
@@ -837,7 +881,10 @@ class NotificationHistory(Box):
             ],
         )
         container.add(content_box)
-        self.containers.insert(0, container)
+        if older:
+            self.containers.append(container)
+        else:
+            self.containers.insert(0, container)
         self.rebuild_with_separators()
         self.update_no_notifications_label_visibility()
 
@@ -853,25 +900,6 @@ class NotificationHistory(Box):
         if app_name in get_limited_apps_history():
             self.clear_history_for_app(app_name)
 
-        if len(self.containers) >= 50:
-            oldest_container = self.containers.pop()
-            if (
-                hasattr(oldest_container, "notification_box")
-                and hasattr(oldest_container.notification_box, "cached_image_path")
-                and oldest_container.notification_box.cached_image_path
-                and os.path.exists(oldest_container.notification_box.cached_image_path)
-            ):
-                try:
-                    os.remove(oldest_container.notification_box.cached_image_path)
-                    logger.info(
-                        f"Deleted cached image of oldest notification due to history limit: {oldest_container.notification_box.cached_image_path}"
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Error deleting cached image of oldest notification: {e}"
-                    )
-            oldest_container.destroy()
-
         def on_container_destroy(container):
             if (
                 hasattr(container, "_timestamp_timer_id")
@@ -1015,9 +1043,7 @@ class NotificationHistory(Box):
             "timestamp": arrival_time.isoformat(),
             "cached_image_path": notification_box.cached_image_path,
         }
-        self.persistent_notifications.insert(0, note)
-        self.persistent_notifications = self.persistent_notifications[:50]
-        self._save_persistent_history()
+        self.history_store.add(note)
 
     def _cleanup_orphan_cached_images(self):
         logger.debug("Starting orphan cached image cleanup.")
@@ -1035,7 +1061,7 @@ class NotificationHistory(Box):
             return
 
         history_uuids = {
-            note.get("id") for note in self.persistent_notifications if note.get("id")
+            note.get("id") for note in self.history_store.notes if note.get("id")
         }
         deleted_count = 0
         for cached_file in cached_files:
@@ -1079,6 +1105,20 @@ class NotificationHistory(Box):
                 containers_to_remove.append(container)
                 persistent_notes_to_remove_ids.add(container.notification_box.uuid)
 
+        # Notes further down the history that have no widget yet
+        for note in self._pending_notes:
+            if note.get("app_name") != app_name:
+                continue
+            persistent_notes_to_remove_ids.add(note.get("id"))
+            cached_image_path = note.get("cached_image_path")
+            if cached_image_path and os.path.exists(cached_image_path):
+                try:
+                    os.remove(cached_image_path)
+                except Exception as e:
+                    logger.error(
+                        f"Error deleting cached image of replaced history notification: {e}"
+                    )
+
         for container in containers_to_remove:
             if (
                 hasattr(container, "notification_box")
@@ -1100,12 +1140,7 @@ class NotificationHistory(Box):
             container.notification_box.destroy(from_history_delete=True)
             container.destroy()
 
-        self.persistent_notifications = [
-            note
-            for note in self.persistent_notifications
-            if note.get("id") not in persistent_notes_to_remove_ids
-        ]
-        self._save_persistent_history()
+        self.history_store.remove(persistent_notes_to_remove_ids)
         self.rebuild_with_separators()
         self.update_no_notifications_label_visibility()
 
@@ -1,10 +1,8 @@
 # Thanks to https://github.com/muhchaudhary for the original code. You are a legend.
-import json
+import time
 
 import cairo
 import gi
-from fabric.hyprland.service import Hyprland
-from fabric.utils.helpers import get_desktop_applications
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.eventbox import EventBox
@@ -15,18 +13,21 @@ from loguru import logger
 
 import config.data as data
 import modules.icons as icons
+from utils.icon_cache import get_icon_cache
 # WIP icon resolver (app_id to guessing the icon name)
 from utils.icon_resolver import IconResolver
+from services.app_catalog import get_app_catalog
+from services.hyprland_state import get_hyprland_state
 
 gi.require_version("Gtk", "3.0")
-from gi.repository import Gdk, Gtk
+from gi.repository import Gdk, GLib, Gtk
 
 screen = Gdk.Screen.get_default()
 CURRENT_WIDTH = screen.get_width()
 CURRENT_HEIGHT = screen.get_height()
 
 icon_resolver = IconResolver()
-connection = Hyprland()
+connection = get_hyprland_state()
 BASE_SCALE = 0.1  # Base scale factor for overview
 
 # Credit to Aylur for the drag and drop code
@@ -65,35 +66,13 @@ class HyprlandWindowButton(Button):
         self.title = title
         self.window: Box = window
 
-        # Compute dynamic icon sizes based on the button size.
-        # Using the minimum dimension of the button for scaling.
-        icon_size_main = int(min(self.size) * 0.5)  # adjust factor as needed
-
         # Enhanced icon resolution using desktop apps
         desktop_app = window.find_app(app_id)
-        
-        # Get icon using improved method with fallbacks
-        icon_pixbuf = None
-        if desktop_app:
-            icon_pixbuf = desktop_app.get_icon_pixbuf(size=icon_size_main)
-        
-        if not icon_pixbuf:
-            # Fallback to IconResolver
-            icon_pixbuf = icon_resolver.get_icon_pixbuf(app_id, icon_size_main)
-        
-        if not icon_pixbuf:
-            # Additional fallbacks for common apps
-            icon_pixbuf = icon_resolver.get_icon_pixbuf("application-x-executable-symbolic", icon_size_main)
-            if not icon_pixbuf:
-                icon_pixbuf = icon_resolver.get_icon_pixbuf("image-missing", icon_size_main)
-                
-        # Ensure icon is scaled to the correct size
-        if icon_pixbuf and (icon_pixbuf.get_width() != icon_size_main or icon_pixbuf.get_height() != icon_size_main):
-            icon_pixbuf = icon_pixbuf.scale_simple(
-                icon_size_main, 
-                icon_size_main, 
-                gi.repository.GdkPixbuf.InterpType.BILINEAR
-            )
+        self.desktop_app = desktop_app
+
+        # Compute dynamic icon sizes based on the button size.
+        # Using the minimum dimension of the button for scaling.
+        icon_pixbuf = self._load_icon_pixbuf(int(min(self.size) * 0.5))
 
         super().__init__(
             name="overview-client-box",
@@ -101,8 +80,8 @@ class HyprlandWindowButton(Button):
             tooltip_text=title,
             size=size,
             on_clicked=self.on_button_click,
-            on_button_press_event=lambda _, event: connection.send_command(
-                f"/dispatch closewindow address:{address}"
+            on_button_press_event=lambda _, event: connection.dispatch(
+                f"closewindow address:{address}"
             )
             if event.button == 3
             else None,
@@ -114,9 +93,6 @@ class HyprlandWindowButton(Button):
             ),
         )
 
-        # Store the desktop_app for later use
-        self.desktop_app = desktop_app
-
         self.drag_source_set(
             start_button_mask=Gdk.ModifierType.BUTTON1_MASK,
             targets=TARGET,
@@ -128,35 +104,46 @@ class HyprlandWindowButton(Button):
     def on_key_press_event(self, widget, event):
         if event.get_state() & Gdk.ModifierType.SHIFT_MASK:
             if event.keyval in (Gdk.KEY_Return, Gdk.KEY_KP_Enter, Gdk.KEY_space):
-                connection.send_command(f"/dispatch closewindow address:{self.address}")
+                connection.dispatch(f"closewindow address:{self.address}")
                 return True
         return False
 
-    def update_image(self, image):
-        # Compute overlay icon size dynamically.
-        icon_size_overlay = int(min(self.size) * 0.5)  # adjust factor as needed
-        
-        # Enhanced icon resolution for overlay
+    def _load_icon_pixbuf(self, icon_size: int):
+        """Window icon at icon_size, from the shared icon cache."""
+        return get_icon_cache().lookup(
+            ("window", self.app_id, icon_size),
+            lambda: self._resolve_icon_pixbuf(icon_size),
+        )
+
+    def _resolve_icon_pixbuf(self, icon_size: int):
+        """Resolve the window icon with fallbacks and scale it to icon_size."""
         icon_pixbuf = None
-        if hasattr(self, 'desktop_app') and self.desktop_app:
-            icon_pixbuf = self.desktop_app.get_icon_pixbuf(size=icon_size_overlay)
-            
+        if self.desktop_app:
+            icon_pixbuf = get_icon_cache().app_icon(self.desktop_app, icon_size)
+
         if not icon_pixbuf:
-            icon_pixbuf = icon_resolver.get_icon_pixbuf(self.app_id, icon_size_overlay)
-            
+            # Fallback to IconResolver
+            icon_pixbuf = icon_resolver.get_icon_pixbuf(self.app_id, icon_size)
+
         if not icon_pixbuf:
-            icon_pixbuf = icon_resolver.get_icon_pixbuf("application-x-executable-symbolic", icon_size_overlay)
+            # Additional fallbacks for common apps
+            icon_pixbuf = icon_resolver.get_icon_pixbuf("application-x-executable-symbolic", icon_size)
             if not icon_pixbuf:
-                icon_pixbuf = icon_resolver.get_icon_pixbuf("image-missing", icon_size_overlay)
-        
+                icon_pixbuf = icon_resolver.get_icon_pixbuf("image-missing", icon_size)
+
         # Ensure icon is scaled to the correct size
-        if icon_pixbuf and (icon_pixbuf.get_width() != icon_size_overlay or icon_pixbuf.get_height() != icon_size_overlay):
+        if icon_pixbuf and (icon_pixbuf.get_width() != icon_size or icon_pixbuf.get_height() != icon_size):
             icon_pixbuf = icon_pixbuf.scale_simple(
-                icon_size_overlay, 
-                icon_size_overlay, 
+                icon_size,
+                icon_size,
                 gi.repository.GdkPixbuf.InterpType.BILINEAR
             )
-                
+        return icon_pixbuf
+
+    def update_image(self, image):
+        # Compute overlay icon size dynamically.
+        icon_pixbuf = self._load_icon_pixbuf(int(min(self.size) * 0.5))
+
         self.set_image(
             Overlay(
                 child=image,
@@ -170,13 +157,38 @@ class HyprlandWindowButton(Button):
             )
         )
 
+    def set_title(self, title: str):
+        if title == self.title:
+            return
+        self.title = title
+        self.set_tooltip_text(title)
+
+    def update_geometry(self, size, transform: int = 0):
+        """Resize the button in place, reloading the icon only if needed."""
+        new_size = size if transform in [0, 2] else (size[1], size[0])
+        if new_size == self.size and transform % 4 == self.transform:
+            return
+        old_icon_size = int(min(self.size) * 0.5)
+        self.transform = transform % 4
+        self.size = new_size
+        self.set_size_request(int(size[0]), int(size[1]))
+        icon_size = int(min(self.size) * 0.5)
+        if icon_size != old_icon_size:
+            self.set_image(Image(pixbuf=self._load_icon_pixbuf(icon_size)))
+
     def on_button_click(self, *_):
-        connection.send_command(f"/dispatch focuswindow address:{self.address}")
+        connection.dispatch(f"focuswindow address:{self.address}")
 
 
 class WorkspaceEventBox(EventBox):
     def __init__(self, workspace_id: int, fixed: Gtk.Fixed | None = None, monitor_width: int = None, monitor_height: int = None, monitor_scale: float = 1.0):
-        self.fixed = fixed
+        self.fixed = fixed if fixed else Gtk.Fixed.new()
+        self.add_label = Label(
+            name="overview-add-label",
+            h_expand=True,
+            v_expand=True,
+            markup=icons.circle_plus,
+        )
         
         # Use provided monitor dimensions or fallback to current screen
         width = monitor_width or CURRENT_WIDTH
@@ -191,16 +203,9 @@ class WorkspaceEventBox(EventBox):
             h_expand=True,
             v_expand=True,
             size=(int(width * container_scale), int(height * container_scale)),
-            child=fixed
-            if fixed
-            else Label(
-                name="overview-add-label",
-                h_expand=True,
-                v_expand=True,
-                markup=icons.circle_plus,
-            ),
-            on_drag_data_received=lambda _w, _c, _x, _y, data, *_: connection.send_command(
-                f"/dispatch movetoworkspacesilent {workspace_id},address:{data.get_data().decode()}"
+            child=self.fixed if fixed else self.add_label,
+            on_drag_data_received=lambda _w, _c, _x, _y, data, *_: connection.dispatch(
+                f"movetoworkspacesilent {workspace_id},address:{data.get_data().decode()}"
             ),
         )
         self.drag_dest_set(
@@ -211,6 +216,23 @@ class WorkspaceEventBox(EventBox):
         if fixed:
             fixed.show_all()
 
+    def set_empty(self, empty: bool):
+        """Swap between the client container and the '+' placeholder."""
+        wanted = self.add_label if empty else self.fixed
+        current = self.get_child()
+        if current is wanted:
+            return
+        if current:
+            self.remove(current)
+        self.add(wanted)
+        wanted.show_all()
+
+
+# Desktop applications and their identifier map come from the shared app
+# catalog; it is also reloaded when a window shows up whose app id we can't
+# resolve, at most once per interval.
+_APPS_REFRESH_INTERVAL = 30.0
+_apps_reload = {"loaded_at": 0.0}
 
 
 class Overview(Box):
@@ -229,31 +251,90 @@ class Overview(Box):
             # Fallback if monitor manager not available
             pass
         
-        # Get monitor dimensions
+        # Initialize as a Box instead of a PopupWindow.
+        super().__init__(name="overview", orientation="v", spacing=8, **kwargs)
+        self.workspace_boxes: dict[int, WorkspaceEventBox] = {}
+        self.clients: dict[str, HyprlandWindowButton] = {}
+        # Keyed client model: address -> (workspace_id, x, y, width, height, transform)
+        self._client_state: dict[str, tuple] = {}
+        self._update_pending = False
+
+        connection.connect("clients-changed", self.do_update)
+        connection.connect("monitors-changed", self.do_update)
+
+        self._build_workspaces()
+        self.update()
+
+    def _load_apps(self, force: bool = False):
+        if force:
+            get_app_catalog().reload()
+            _apps_reload["loaded_at"] = time.monotonic()
+
+    @property
+    def _all_apps(self):
+        return get_app_catalog().apps
+
+    @property
+    def app_identifiers(self):
+        return get_app_catalog().identifiers
+
+    def _get_monitors(self) -> dict:
+        return {
+            monitor["id"]: (monitor["x"], monitor["y"], monitor["transform"])
+            for monitor in connection.get_monitors()
+        }
+
+    def _get_monitor_geometry(self):
+        # Get monitor dimensions and scale for scaling
         monitor_width = CURRENT_WIDTH
         monitor_height = CURRENT_HEIGHT
+        monitor_scale = 1.0
         
         if self.monitor_manager:
-            monitor_info = self.monitor_manager.get_monitor_by_id(monitor_id)
+            monitor_info = self.monitor_manager.get_monitor_by_id(self.monitor_id)
             if monitor_info:
                 monitor_width = monitor_info['width']
                 monitor_height = monitor_info['height']
-        # Initialize as a Box instead of a PopupWindow.
-        super().__init__(name="overview", orientation="v", spacing=8, **kwargs)
-        self.workspace_boxes: dict[int, Box] = {}
-        self.clients: dict[str, HyprlandWindowButton] = {}
-        
-        # Initialize app registry for better icon resolution
-        self._all_apps = get_desktop_applications()
-        self.app_identifiers = self._build_app_identifiers_map()
-        
-        # Remove the window_class_aliases dictionary completely
+                monitor_scale = monitor_info.get('scale', 1.0)
+        return monitor_width, monitor_height, monitor_scale
+
+    def _build_workspaces(self):
+        """Create the static workspace grid once; clients are reconciled into it."""
+        if data.PANEL_THEME == "Panel" and data.BAR_POSITION in ["Left", "Right"]:
+            rows = 5
+            cols = 2
+        else:
+            rows = 2
+            cols = 5
+
+        self.children = [Box(spacing=8) for _ in range(rows)]
+        monitor_width, monitor_height, monitor_scale = self._get_monitor_geometry()
+
+        # Generate workspaces only for this monitor's range
+        for w_id in range(self.workspace_start, self.workspace_end + 1):
+            idx = w_id - self.workspace_start
+            if rows == 2:
+                row = 0 if idx < cols else 1
+            else:
+                row = idx // cols
+            workspace_box = WorkspaceEventBox(
+                w_id,
+                monitor_width=monitor_width,
+                monitor_height=monitor_height,
+                monitor_scale=monitor_scale
+            )
+            self.workspace_boxes[w_id] = workspace_box
+            self.children[row].add(
+                Box(
+                    name="overview-workspace-box",
+                    orientation="vertical",
+                    children=[
+                        Label(name="overview-workspace-label", label=f"Workspace {w_id}"),
+                        workspace_box,
+                    ],
+                )
+            )
 
-        connection.connect("event::openwindow", self.do_update)
-        connection.connect("event::closewindow", self.do_update)
-        connection.connect("event::movewindow", self.do_update)
-        self.update()
-        
     def _normalize_window_class(self, class_name):
         """Normalize window class by removing common suffixes and lowercase."""
         if not class_name:
@@ -286,34 +367,6 @@ class Overview(Box):
         # This avoids incorrectly matching flatpak apps and others
         return False
         
-    def _build_app_identifiers_map(self):
-        """Build a mapping of app identifiers (class names, executables, names) to DesktopApp objects"""
-        identifiers = {}
-        for app in self._all_apps:
-            # Map by name (lowercase)
-            if app.name:
-                identifiers[app.name.lower()] = app
-                
-            # Map by display name
-            if app.display_name:
-                identifiers[app.display_name.lower()] = app
-                
-            # Map by window class if available
-            if app.window_class:
-                identifiers[app.window_class.lower()] = app
-                
-            # Map by executable name if available
-            if app.executable:
-                exe_basename = app.executable.split('/')[-1].lower()
-                identifiers[exe_basename] = app
-                
-            # Map by command line if available (without parameters)
-            if app.command_line:
-                cmd_base = app.command_line.split()[0].split('/')[-1].lower()
-                identifiers[cmd_base] = app
-                
-        return identifiers
-        
     def find_app(self, app_identifier):
         """Return the DesktopApp object by matching any app identifier."""
         if not app_identifier:
@@ -351,92 +404,99 @@ class Overview(Box):
         return None
 
     def update(self, signal_update=False):
-        self._all_apps = get_desktop_applications()
-        self.app_identifiers = self._build_app_identifiers_map()
-        for client in self.clients.values():
-            client.destroy()
-        self.clients.clear()
-        for workspace in self.workspace_boxes.values():
-            workspace.destroy()
-        self.workspace_boxes.clear()
-
-        if data.PANEL_THEME == "Panel" and data.BAR_POSITION in ["Left", "Right"]:
-            rows = 5
-            cols = 2
-        else:
-            rows = 2
-            cols = 5
-
-        self.children = [Box(spacing=8) for _ in range(rows)]
-
-        # Get monitor dimensions and scale for scaling
-        monitor_width = CURRENT_WIDTH
-        monitor_height = CURRENT_HEIGHT
-        monitor_scale = 1.0
-        
-        if self.monitor_manager:
-            monitor_info = self.monitor_manager.get_monitor_by_id(self.monitor_id)
-            if monitor_info:
-                monitor_width = monitor_info['width']
-                monitor_height = monitor_info['height']
-                monitor_scale = monitor_info.get('scale', 1.0)
+        self._update_pending = False
+        _, _, monitor_scale = self._get_monitor_geometry()
         
         # Calculate effective scale for this monitor
         # Higher scale monitors need larger overview elements to appear the same physical size
         effective_scale = BASE_SCALE * monitor_scale
 
-        monitors = {
-            monitor["id"]: (monitor["x"], monitor["y"], monitor["transform"])
-            for monitor in json.loads(connection.send_command("j/monitors").reply.decode())
-        }
-        
-        # Filter clients to only show those in this monitor's workspace range
-        for client in json.loads(connection.send_command("j/clients").reply.decode()):
+        monitors = self._get_monitors()
+
+        # Build the desired state for clients in this monitor's workspace range
+        desired: dict[str, tuple] = {}
+        for client in connection.get_clients():
             workspace_id = client["workspace"]["id"]
-            if workspace_id > 0 and self.workspace_start <= workspace_id <= self.workspace_end:
+            if not (workspace_id > 0 and self.workspace_start <= workspace_id <= self.workspace_end):
+                continue
+            if "at" not in client:
+                # Provisional entry for a just-opened window, geometry arrives with the resync
+                continue
+            mon_x, mon_y, transform = monitors.get(client["monitor"], (0, 0, 0))
+            desired[client["address"]] = (
+                (
+                    workspace_id,
+                    abs(client["at"][0] - mon_x) * effective_scale,
+                    abs(client["at"][1] - mon_y) * effective_scale,
+                    client["size"][0] * effective_scale,
+                    client["size"][1] * effective_scale,
+                    transform,
+                ),
+                client,
+            )
+
+        touched_workspaces = set()
+
+        # Remove clients that are gone
+        for address in list(self.clients.keys()):
+            if address in desired:
+                continue
+            workspace_id = self._client_state.pop(address)[0]
+            self.clients.pop(address).destroy()
+            touched_workspaces.add(workspace_id)
+
+        # Add new clients and move/resize existing ones in place
+        for address, (state, client) in desired.items():
+            workspace_id, x, y, width, height, transform = state
+            btn = self.clients.get(address)
+            if btn is not None and btn.app_id != client["initialClass"]:
+                # Same address re-used by a different app, rebuild it
+                touched_workspaces.add(self._client_state.pop(address)[0])
+                self.clients.pop(address).destroy()
+                btn = None
+
+            if btn is None:
+                if self.find_app(client["initialClass"]) is None and (
+                    time.monotonic() - _apps_reload["loaded_at"] > _APPS_REFRESH_INTERVAL
+                ):
+                    self._load_apps(force=True)
                 btn = HyprlandWindowButton(
                     window=self,
                     title=client["title"],
-                    address=client["address"],
+                    address=address,
                     app_id=client["initialClass"],
-                    size=(client["size"][0] * effective_scale, client["size"][1] * effective_scale),
-                    transform=monitors[client["monitor"]][2],
-                )
-                self.clients[client["address"]] = btn
-                w_id = workspace_id
-                if w_id not in self.workspace_boxes:
-                    self.workspace_boxes[w_id] = Gtk.Fixed.new()
-                self.workspace_boxes[w_id].put(
-                    btn,
-                    abs(client["at"][0] - monitors[client["monitor"]][0]) * effective_scale,
-                    abs(client["at"][1] - monitors[client["monitor"]][1]) * effective_scale,
+                    size=(width, height),
+                    transform=transform,
                 )
-
-        # Generate workspaces only for this monitor's range
-        for w_id in range(self.workspace_start, self.workspace_end + 1):
-            idx = w_id - self.workspace_start
-            if rows == 2:
-                row = 0 if idx < cols else 1
+                self.clients[address] = btn
+                self.workspace_boxes[workspace_id].fixed.put(btn, x, y)
+                btn.show_all()
+                touched_workspaces.add(workspace_id)
             else:
-                row = idx // cols
-            overview_row = self.children[row]
-            overview_row.add(
-                Box(
-                    name="overview-workspace-box",
-                    orientation="vertical",
-                    children=[
-                        Label(name="overview-workspace-label", label=f"Workspace {w_id}"),
-                        WorkspaceEventBox(
-                            w_id,
-                            self.workspace_boxes.get(w_id),
-                            monitor_width=monitor_width,
-                            monitor_height=monitor_height,
-                            monitor_scale=monitor_scale
-                        ),
-                    ],
-                )
-            )
+                old_state = self._client_state[address]
+                btn.set_title(client["title"])
+                if old_state == state:
+                    continue
+                old_workspace = old_state[0]
+                if old_workspace != workspace_id:
+                    self.workspace_boxes[old_workspace].fixed.remove(btn)
+                    self.workspace_boxes[workspace_id].fixed.put(btn, x, y)
+                    touched_workspaces.update((old_workspace, workspace_id))
+                elif old_state[1:3] != (x, y):
+                    self.workspace_boxes[workspace_id].fixed.move(btn, x, y)
+                btn.update_geometry((width, height), transform)
+            self._client_state[address] = state
+
+        for workspace_id in touched_workspaces:
+            workspace_box = self.workspace_boxes[workspace_id]
+            workspace_box.set_empty(not workspace_box.fixed.get_children())
+
+        if touched_workspaces:
+            logger.info(f"[Overview] Updated workspaces {sorted(touched_workspaces)} on monitor {self.monitor_id}")
 
     def do_update(self, *_):
-        logger.info(f"[Overview] Updating for :{_[1].name}")
-        self.update(signal_update=True)
+        # Coalesce bursts of Hyprland events into a single reconcile pass
+        if self._update_pending:
+            return
+        self._update_pending = True
+        GLib.idle_add(self.update, True)
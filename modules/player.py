@@ -15,7 +15,7 @@ from gi.repository import Gdk, Gio, GLib, Gtk
 import config.data as data
 import modules.icons as icons
 from modules.cavalcade import SpectrumRender
-from services.mpris import MprisPlayer, MprisPlayerManager
+from services.mpris import MprisPlayer, get_mpris_manager
 from widgets.circle_image import CircleImage
 
 vertical_mode = False
@@ -417,22 +417,23 @@ class Player(Box):
         )
         self.switcher.set_stack(self.player_stack)
         self.switcher.set_halign(Gtk.Align.CENTER)
-        self.mpris_manager = MprisPlayerManager()
-        players = self.mpris_manager.players
-        if players:
-            for p in players:
-                mp = MprisPlayer(p)
-                pb = PlayerBox(mpris_player=mp)
-                self.player_stack.add_titled(pb, mp.player_name, mp.player_name)
-        else:
-            pb = PlayerBox(mpris_player=None)
-            self.player_stack.add_titled(pb, "nothing", "Nothing Playing")
-        self.mpris_manager.connect("player-appeared", self.on_player_appeared)
-        self.mpris_manager.connect("player-vanished", self.on_player_vanished)
+        self.mpris_manager = None
+        pb = PlayerBox(mpris_player=None)
+        self.player_stack.add_titled(pb, "nothing", "Nothing Playing")
         self.switcher.set_visible(True)
         self.add(self.player_stack)
         self.add(self.switcher)
-        GLib.idle_add(self._replace_switcher_labels)
+        # Playerctl is loaded after the first frame, not while starting up
+        GLib.idle_add(self._connect_mpris)
+
+    def _connect_mpris(self):
+        self.mpris_manager = get_mpris_manager()
+        for player in self.mpris_manager.players or []:
+            self.on_player_appeared(self.mpris_manager, player)
+        self.mpris_manager.connect("player-appeared", self.on_player_appeared)
+        self.mpris_manager.connect("player-vanished", self.on_player_vanished)
+        self._replace_switcher_labels()
+        return False
 
     def on_player_appeared(self, manager, player):
         children = self.player_stack.get_children()
@@ -567,23 +568,28 @@ class PlayerSmall(CenterBox):
 
         self.add(self.mpris_small)
 
-        self.mpris_manager = MprisPlayerManager()
+        self.mpris_manager = None
         self.mpris_player = None
 
         self.current_index = 0
 
+        self._apply_mpris_properties()
+        self.mpris_button.connect("clicked", self._on_play_pause_clicked)
+        # Playerctl is loaded after the first frame, not while starting up
+        GLib.idle_add(self._connect_mpris)
+
+    def _connect_mpris(self):
+        self.mpris_manager = get_mpris_manager()
         players = self.mpris_manager.players
         if players:
             mp = MprisPlayer(players[self.current_index])
             self.mpris_player = mp
             self._apply_mpris_properties()
             self.mpris_player.connect("changed", self._on_mpris_changed)
-        else:
-            self._apply_mpris_properties()
 
         self.mpris_manager.connect("player-appeared", self.on_player_appeared)
         self.mpris_manager.connect("player-vanished", self.on_player_vanished)
-        self.mpris_button.connect("clicked", self._on_play_pause_clicked)
+        return False
 
     def _apply_mpris_properties(self):
         if not self.mpris_player:
@@ -617,7 +623,7 @@ class PlayerSmall(CenterBox):
     def _on_icon_button_press(self, widget, event):
         from gi.repository import Gdk
         if event.type == Gdk.EventType.BUTTON_PRESS:
-            players = self.mpris_manager.players
+            players = self.mpris_manager.players if self.mpris_manager else None
             if not players:
                 return True
 
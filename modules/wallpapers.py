@@ -1,10 +1,6 @@
 import colorsys
-import concurrent.futures
-import hashlib
 import os
 import random  # <--- AÑADIDO
-import shutil
-from concurrent.futures import ThreadPoolExecutor
 
 from fabric.utils.helpers import exec_shell_command_async
 from fabric.widgets.box import Box
@@ -12,23 +8,17 @@ from fabric.widgets.button import Button
 from fabric.widgets.entry import Entry
 from fabric.widgets.label import Label
 from fabric.widgets.scrolledwindow import ScrolledWindow
-from gi.repository import Gdk, GdkPixbuf, Gio, GLib, Gtk, Pango
-from PIL import Image
+from gi.repository import Gdk, Gtk, Pango
 
 import config.config
 import config.data as data
 import modules.icons as icons
+from services.wallpaper_library import get_wallpaper_library
+from utils.matugen_cache import get_matugen_cache
 
 
 class WallpaperSelector(Box):
-    CACHE_DIR = f"{data.CACHE_DIR}/thumbs"  # Changed from wallpapers to thumbs
-
     def __init__(self, **kwargs):
-        # Delete the old cache directory if it exists
-        old_cache_dir = f"{data.CACHE_DIR}/wallpapers"
-        if os.path.exists(old_cache_dir):
-            shutil.rmtree(old_cache_dir)
-
         super().__init__(
             name="wallpapers",
             spacing=4,
@@ -37,20 +27,28 @@ class WallpaperSelector(Box):
             v_expand=False,
             **kwargs,
         )
-        os.makedirs(self.CACHE_DIR, exist_ok=True)
-
-        self.files = []
-        GLib.idle_add(self._load_wallpapers_async().__next__)
-        self.thumbnails = []
-        self.thumbnail_queue = []
-        self.executor = ThreadPoolExecutor(max_workers=4)  # Shared executor
+        # Reuses matugen outputs for wallpapers and schemes seen before
+        self.matugen_cache = get_matugen_cache()
+        # Catalog, thumbnails and file monitors shared with the other monitors
+        self.library = get_wallpaper_library()
+        self.library.connect("changed", self._on_library_changed)
+        self.library.connect("palettes-indexed", self._on_palettes_indexed)
+        # Parsed search, see WallpaperLibrary.parse_query
+        self._filter = self.library.parse_query("")
 
         # Variable to control the selection (similar to AppLauncher)
         self.selected_index = -1
 
         # Initialize UI components
         self.viewport = Gtk.IconView(name="wallpaper-icons")
-        self.viewport.set_model(Gtk.ListStore(GdkPixbuf.Pixbuf, str))
+        # The library's model stays sorted by name; searching only refilters
+        # this monitor's view of it.
+        self.filtered_store = self.library.store.filter_new()
+        self.filtered_store.set_visible_func(self._is_row_visible)
+        # Only reorders rows when the search asks for a color sort
+        self.sorted_store = Gtk.TreeModelSort(model=self.filtered_store)
+        self.sorted_store.set_sort_func(0, self._compare_rows)
+        self.viewport.set_model(self.sorted_store)
         self.viewport.set_pixbuf_column(0)
         # Hide text column so only the image is shown
         self.viewport.set_text_column(-1)
@@ -73,6 +71,10 @@ class WallpaperSelector(Box):
         self.search_entry = Entry(
             name="search-entry-walls",
             placeholder="Search Wallpapers...",
+            tooltip_text=(
+                "Filter with in:<folder>, min:<width>x<height>, hue:<color or degrees> "
+                "and tone:light/dark; sort with sort:hue/light/dark"
+            ),
             h_expand=True,
             h_align="fill",
             notify_text=lambda entry, *_: self.arrange_viewport(entry.get_text()),
@@ -198,63 +200,12 @@ class WallpaperSelector(Box):
 
         # Removed the old main_content_box and its add
 
-        self._start_thumbnail_thread()
         self.connect("map", self.on_map)
-        self.setup_file_monitor()
         self.show_all()
         self.randomize_dice_icon()
         # Ensure the search entry gets focus when starting
         self.search_entry.grab_focus()
 
-    def _load_wallpapers_async(self):
-        """Non-blocking wallpaper processing."""
-
-        # Process old wallpapers: use os.scandir for efficiency and only loop
-        # over image files that actually need renaming (they're not already lowercase
-        # and with hyphens instead of spaces)
-        with os.scandir(data.WALLPAPERS_DIR) as entries:
-            for entry in entries:
-                if entry.is_file() and self._is_image(entry.name):
-                    # Check if the file needs renaming: file should be lowercase and have hyphens instead of spaces
-                    if entry.name != entry.name.lower() or " " in entry.name:
-                        new_name = entry.name.lower().replace(" ", "-")
-                        full_path = os.path.join(data.WALLPAPERS_DIR, entry.name)
-                        new_full_path = os.path.join(data.WALLPAPERS_DIR, new_name)
-                        try:
-                            os.rename(full_path, new_full_path)
-                            print(
-                                f"Renamed old wallpaper '{full_path}' to '{new_full_path}'"
-                            )
-                        except Exception as e:
-                            print(f"Error renaming file {full_path}: {e}")
-                        yield
-
-        # Process files in small batches to keep UI responsive
-        file_list = os.listdir(data.WALLPAPERS_DIR)
-        batch_size = 20
-
-        # Process files in batches
-        for i in range(0, len(file_list), batch_size):
-            batch = file_list[i : i + batch_size]
-            for filename in batch:
-                if self._is_image(filename):
-                    self.files.append(filename)
-
-            # Sort the current batch to maintain order
-            self.files.sort()
-
-            # Yield to let the main loop process events
-            yield True
-
-        # Final sort of the complete list
-        self.files.sort()
-
-        # Start thumbnail loading after files are processed
-        self._start_thumbnail_thread()
-
-        # Return False to stop the idle callback
-        yield False
-
     def randomize_dice_icon(self):
         dice_icons = [
             icons.dice_1,
@@ -270,11 +221,11 @@ class WallpaperSelector(Box):
             label.set_markup(chosen_icon)
 
     def set_random_wallpaper(self, widget, external=False):
-        if not self.files:
+        if not self.library.files:
             print("No wallpapers available to set a random one.")
             return
 
-        file_name = random.choice(self.files)
+        file_name = random.choice(self.library.files)
         full_path = os.path.join(data.WALLPAPERS_DIR, file_name)
         selected_scheme = self.scheme_dropdown.get_active_id()
         current_wall = os.path.expanduser(f"~/.current.wall")
@@ -286,9 +237,7 @@ class WallpaperSelector(Box):
         os.symlink(full_path, current_wall)
 
         if self.matugen_switcher.get_active():
-            exec_shell_command_async(
-                f'matugen image "{full_path}" -t {selected_scheme}'
-            )
+            self.matugen_cache.apply_async(full_path, selected_scheme)
         else:
             exec_shell_command_async(
                 f'awww img "{full_path}" -t outer --transition-duration 1.5 --transition-step 255 --transition-fps 60 -f Nearest'
@@ -303,62 +252,14 @@ class WallpaperSelector(Box):
 
         self.randomize_dice_icon()
 
-    def setup_file_monitor(self):
-        gfile = Gio.File.new_for_path(data.WALLPAPERS_DIR)
-        self.file_monitor = gfile.monitor_directory(Gio.FileMonitorFlags.NONE, None)
-        self.file_monitor.connect("changed", self.on_directory_changed)
-
-    def on_directory_changed(self, monitor, file, other_file, event_type):
-        file_name = file.get_basename()
-        if event_type == Gio.FileMonitorEvent.DELETED:
-            if file_name in self.files:
-                self.files.remove(file_name)
-                cache_path = self._get_cache_path(file_name)
-                if os.path.exists(cache_path):
-                    try:
-                        os.remove(cache_path)
-                    except Exception as e:
-                        print(f"Error deleting cache {cache_path}: {e}")
-                self.thumbnails = [(p, n) for p, n in self.thumbnails if n != file_name]
-                GLib.idle_add(self.arrange_viewport, self.search_entry.get_text())
-        elif event_type == Gio.FileMonitorEvent.CREATED:
-            if self._is_image(file_name):
-                # Convert filename to lowercase and replace spaces with "-"
-                new_name = file_name.lower().replace(" ", "-")
-                full_path = os.path.join(data.WALLPAPERS_DIR, file_name)
-                new_full_path = os.path.join(data.WALLPAPERS_DIR, new_name)
-                if new_name != file_name:
-                    try:
-                        os.rename(full_path, new_full_path)
-                        file_name = new_name
-                        print(f"Renamed file '{full_path}' to '{new_full_path}')")
-                    except Exception as e:
-                        print(f"Error renaming file {full_path}: {e}")
-                if file_name not in self.files:
-                    self.files.append(file_name)
-                    self.files.sort()
-                    self.executor.submit(self._process_file, file_name)
-        elif event_type == Gio.FileMonitorEvent.CHANGED:
-            if self._is_image(file_name) and file_name in self.files:
-                cache_path = self._get_cache_path(file_name)
-                if os.path.exists(cache_path):
-                    try:
-                        os.remove(cache_path)
-                    except Exception as e:
-                        print(f"Error deleting cache for changed file {file_name}: {e}")
-                self.executor.submit(self._process_file, file_name)
-
     def arrange_viewport(self, query: str = ""):
         model = self.viewport.get_model()
-        model.clear()
-        filtered_thumbnails = [
-            (thumb, name)
-            for thumb, name in self.thumbnails
-            if query.casefold() in name.casefold()
-        ]
-        filtered_thumbnails.sort(key=lambda x: x[1].lower())
-        for pixbuf, file_name in filtered_thumbnails:
-            model.append([pixbuf, file_name])
+        previous_sort = self._filter["sort"]
+        self._filter = self.library.parse_query(query)
+        self.library.set_thumbnail_priority(self._filter)
+        self.filtered_store.refilter()
+        if self._filter["sort"] != previous_sort:
+            self._apply_sort()
         # If the search entry is empty, no icon is selected; otherwise, select the first one.
         if query.strip() == "":
             self.viewport.unselect_all()
@@ -377,9 +278,7 @@ class WallpaperSelector(Box):
         os.symlink(full_path, current_wall)
         if self.matugen_switcher.get_active():
             # Matugen is enabled: run the normal command.
-            exec_shell_command_async(
-                f'matugen image "{full_path}" -t {selected_scheme}'
-            )
+            self.matugen_cache.apply_async(full_path, selected_scheme)
         else:
             # Matugen is disabled: run the alternative awww command.
             exec_shell_command_async(
@@ -519,61 +418,37 @@ class WallpaperSelector(Box):
         )  # Ensure the selected icon is visible
         self.selected_index = new_index
 
-    def _start_thumbnail_thread(self):
-        thread = GLib.Thread.new("thumbnail-loader", self._preload_thumbnails, None)
-
-    def _preload_thumbnails(self, _data):
-        futures = [
-            self.executor.submit(self._process_file, file_name)
-            for file_name in self.files
-        ]
-        concurrent.futures.wait(futures)
-        GLib.idle_add(self._process_batch)
+    def _on_library_changed(self, _library):
+        if self.selected_index >= len(self.filtered_store):
+            self.selected_index = -1
 
-    def _process_file(self, file_name):
-        full_path = os.path.join(data.WALLPAPERS_DIR, file_name)
-        cache_path = self._get_cache_path(file_name)
-        if not os.path.exists(cache_path):
-            try:
-                with Image.open(full_path) as img:
-                    width, height = img.size
-                    side = min(width, height)
-                    left = (img.width - side) // 2
-                    top = (height - side) // 2
-                    right = left + side
-                    bottom = top + side
-                    img_cropped = img.crop((left, top, right, bottom))
-                    img_cropped.thumbnail((96, 96), Image.Resampling.LANCZOS)
-                    img_cropped.save(cache_path, "PNG")
-            except Exception as e:
-                print(f"Error processing {file_name}: {e}")
-                return
-        self.thumbnail_queue.append((cache_path, file_name))
-        GLib.idle_add(self._process_batch)
-
-    def _process_batch(self):
-        batch = self.thumbnail_queue[:10]
-        del self.thumbnail_queue[:10]
-        for cache_path, file_name in batch:
-            try:
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file(cache_path)
-                self.thumbnails.append((pixbuf, file_name))
-                self.viewport.get_model().append([pixbuf, file_name])
-            except Exception as e:
-                print(f"Error loading thumbnail {cache_path}: {e}")
-        if self.thumbnail_queue:
-            GLib.idle_add(self._process_batch)
-        return False
+    def _on_palettes_indexed(self, _library, computed):
+        search = self._filter
+        if computed and (search["hue"] is not None or search["tone"] or search["sort"]):
+            self.filtered_store.refilter()
+            self._apply_sort()
+
+    def _apply_sort(self):
+        if self._filter["sort"]:
+            # Going through unsorted forces a resort with the new keys
+            self.sorted_store.set_sort_column_id(
+                Gtk.TREE_SORTABLE_UNSORTED_SORT_COLUMN_ID, Gtk.SortType.ASCENDING
+            )
+            self.sorted_store.set_sort_column_id(0, Gtk.SortType.ASCENDING)
+        else:
+            self.sorted_store.set_sort_column_id(
+                Gtk.TREE_SORTABLE_UNSORTED_SORT_COLUMN_ID, Gtk.SortType.ASCENDING
+            )
 
-    def _get_cache_path(self, file_name: str) -> str:
-        file_hash = hashlib.md5(file_name.encode("utf-8")).hexdigest()
-        return os.path.join(self.CACHE_DIR, f"{file_hash}.png")
+    def _compare_rows(self, model, iter_a, iter_b, _data=None) -> int:
+        sort = self._filter["sort"]
+        key_a = self.library.sort_key(model[iter_a][1] or "", sort)
+        key_b = self.library.sort_key(model[iter_b][1] or "", sort)
+        return (key_a > key_b) - (key_a < key_b)
 
-    @staticmethod
-    def _is_image(file_name: str) -> bool:
-        return file_name.lower().endswith(
-            (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp")
-        )
+    def _is_row_visible(self, model, tree_iter, _data=None) -> bool:
+        file_name, key = model[tree_iter][1], model[tree_iter][2]
+        return self.library.matches(file_name, key or "", self._filter)
 
     def on_search_entry_focus_out(self, widget, event):
         if self.get_mapped():
@@ -38,6 +38,13 @@ class Weather(Button):
         if hasattr(self, "has_weather_data") and self.has_weather_data:
             super().set_visible(True)
         # If no weather data yet, remain hidden until fetch completes
+        elif hasattr(self, "fetching"):
+            self.fetch_weather()
+
+    def _hide(self):
+        """Hide without touching the enabled setting, so later fetches still run."""
+        super().set_visible(False)
+        return False
 
     def _initial_fetch(self):
         """Initial fetch that runs only once"""
@@ -45,8 +52,8 @@ class Weather(Button):
         return False  # Don't repeat this timeout
 
     def fetch_weather(self):
-        # Prevent concurrent fetches
-        if self.fetching:
+        # Prevent concurrent fetches, and don't fetch while hidden in the bar
+        if self.fetching or not self.enabled:
             return True
 
         self.fetching = True
@@ -75,7 +82,7 @@ class Weather(Button):
                 weather_data = result.stdout.strip()
                 if "Unknown" in weather_data:
                     self.has_weather_data = False
-                    GLib.idle_add(self.set_visible, False)
+                    GLib.idle_add(self._hide)
                 else:
                     self.has_weather_data = True
 
@@ -95,12 +102,12 @@ class Weather(Button):
             else:
                 self.has_weather_data = False
                 GLib.idle_add(self.label.set_markup, f"{icons.cloud_off} Unavailable")
-                GLib.idle_add(self.set_visible, False)
+                GLib.idle_add(self._hide)
         except Exception as e:
             self.has_weather_data = False
             print(f"Error fetching weather: {e}")
             GLib.idle_add(self.label.set_markup, f"{icons.cloud_off} Error")
-            GLib.idle_add(self.set_visible, False)
+            GLib.idle_add(self._hide)
         finally:
             # Always reset fetching flag when done
             self.fetching = False
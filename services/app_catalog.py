@@ -0,0 +1,100 @@
+from fabric.core.service import Service, Signal
+from fabric.utils.helpers import get_desktop_applications
+from gi.repository import Gio, GLib
+from loguru import logger
+
+from utils.app_index import AppSearchIndex
+
+# Desktop files are usually written in bursts (package installs), so
+# reloads are coalesced over this delay.
+RELOAD_DELAY_MS = 500
+
+
+class AppCatalog(Service):
+    """
+    Installed desktop applications, shared by every monitor.
+
+    The launcher, notch, dock and overview of each monitor used to parse
+    all desktop files themselves and build the same identifier map. The
+    catalog does it once, keeps the launcher search index alongside, and
+    reloads when Gio.AppInfoMonitor reports a change.
+    """
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        """Singleton to get the AppCatalog service instance."""
+        if AppCatalog.instance is None:
+            AppCatalog.instance = AppCatalog()
+        return AppCatalog.instance
+
+    @Signal
+    def changed(self) -> None:
+        """The set of installed applications was reloaded."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._apps = None
+        self._identifiers = None
+        self._search_index = None
+        self._reload_source_id = None
+        self._monitor = Gio.AppInfoMonitor.get()
+        self._monitor.connect("changed", self._on_app_info_changed)
+
+    @property
+    def apps(self) -> list:
+        if self._apps is None:
+            self._apps = get_desktop_applications()
+        return self._apps
+
+    @property
+    def identifiers(self) -> dict:
+        """Lowercase names, display names, window classes and executables mapped to apps."""
+        if self._identifiers is None:
+            self._identifiers = self._build_identifiers(self.apps)
+        return self._identifiers
+
+    @property
+    def search_index(self) -> AppSearchIndex:
+        if self._search_index is None:
+            self._search_index = AppSearchIndex(self.apps)
+        return self._search_index
+
+    def reload(self):
+        self._apps = get_desktop_applications()
+        self._identifiers = None
+        if self._search_index is not None:
+            self._search_index.update(self._apps)
+        logger.info(f"[AppCatalog] Reloaded {len(self._apps)} applications")
+        self.emit("changed")
+
+    def _on_app_info_changed(self, *_):
+        if self._reload_source_id is None:
+            self._reload_source_id = GLib.timeout_add(RELOAD_DELAY_MS, self._reload_after_change)
+
+    def _reload_after_change(self):
+        self._reload_source_id = None
+        self.reload()
+        return False
+
+    @staticmethod
+    def _build_identifiers(apps) -> dict:
+        identifiers = {}
+        for app in apps:
+            if app.name:
+                identifiers[app.name.lower()] = app
+            if app.display_name:
+                identifiers[app.display_name.lower()] = app
+            if app.window_class:
+                identifiers[app.window_class.lower()] = app
+            if app.executable:
+                identifiers[app.executable.split("/")[-1].lower()] = app
+            if app.command_line:
+                identifiers[app.command_line.split()[0].split("/")[-1].lower()] = app
+        return identifiers
+
+
+def get_app_catalog() -> AppCatalog:
+    """Get the global AppCatalog instance."""
+    return AppCatalog.get_initial()
@@ -0,0 +1,103 @@
+import queue
+import subprocess
+import threading
+
+from fabric.core.service import Service, Signal
+from gi.repository import GLib
+from loguru import logger
+
+
+class ClipboardService(Service):
+    """
+    Copies to the Wayland clipboard off the main loop.
+
+    The launcher, emoji picker and clipboard history all copy through here.
+    Text is written to `wl-copy` from a worker thread. A cliphist entry is
+    copied by connecting `cliphist decode` straight to `wl-copy` through an
+    OS pipe, so large payloads such as screenshots never pass through the
+    shell's memory. Copies run one at a time, in the order they were made,
+    on a single worker thread.
+    """
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        """Singleton to get the ClipboardService instance."""
+        if ClipboardService.instance is None:
+            ClipboardService.instance = ClipboardService()
+        return ClipboardService.instance
+
+    @Signal
+    def copied(self, ok: bool) -> None:
+        """A copy finished, successfully or not."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._queue = queue.Queue()
+        self._worker_thread = None
+
+    def copy_text(self, text: str, on_done=None):
+        """Put text on the clipboard. on_done(ok) is called on the main loop."""
+        self._run(self._copy_text, text, on_done)
+
+    def copy_history_item(self, item_id: str, on_done=None):
+        """Put cliphist entry item_id back on the clipboard. on_done(ok) is called on the main loop."""
+        self._run(self._copy_history_item, item_id, on_done)
+
+    def _run(self, worker, arg, on_done):
+        self._queue.put((worker, arg, on_done))
+        if self._worker_thread is None:
+            self._worker_thread = threading.Thread(target=self._serve, name="clipboard-copy", daemon=True)
+            self._worker_thread.start()
+
+    def _serve(self):
+        while True:
+            worker, arg, on_done = self._queue.get()
+            try:
+                ok = worker(arg)
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.error(f"[Clipboard] Copy failed: {e}")
+                ok = False
+            GLib.idle_add(self._finished, ok, on_done)
+
+    def _finished(self, ok, on_done):
+        self.emit("copied", ok)
+        if on_done is not None:
+            on_done(ok)
+        return False
+
+    @staticmethod
+    def _copy_text(text: str) -> bool:
+        result = subprocess.run(["wl-copy"], input=text.encode("utf-8"))
+        if result.returncode != 0:
+            logger.error(f"[Clipboard] wl-copy exited with {result.returncode}")
+        return result.returncode == 0
+
+    @staticmethod
+    def _copy_history_item(item_id: str) -> bool:
+        decode = subprocess.Popen(["cliphist", "decode", item_id], stdout=subprocess.PIPE)
+        try:
+            copy = subprocess.Popen(["wl-copy"], stdin=decode.stdout)
+        except OSError:
+            decode.kill()
+            decode.wait()
+            raise
+        finally:
+            # Only the two processes hold the pipe now, so wl-copy sees EOF
+            # when decode exits and decode gets SIGPIPE if wl-copy fails
+            decode.stdout.close()
+        copy_code = copy.wait()
+        decode_code = decode.wait()
+        if decode_code != 0 or copy_code != 0:
+            logger.error(
+                f"[Clipboard] Copying entry {item_id} failed "
+                f"(cliphist decode: {decode_code}, wl-copy: {copy_code})"
+            )
+            return False
+        return True
+
+
+def get_clipboard_service() -> ClipboardService:
+    """Get the global ClipboardService instance."""
+    return ClipboardService.get_initial()
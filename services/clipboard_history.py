@@ -0,0 +1,176 @@
+import os
+import re
+import subprocess
+
+from fabric.core.service import Service, Signal
+from gi.repository import Gio, GLib
+from loguru import logger
+
+from utils.clip_index import ClipSearchIndex
+
+CLIPHIST_DB = os.environ.get("CLIPHIST_DB_PATH") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "cliphist", "db"
+)
+
+# A copy writes the database several times; syncs are coalesced over this delay
+SYNC_DELAY_MS = 150
+
+
+def is_image_content(content: str) -> bool:
+    """Determine if a cliphist list line's content is likely an image"""
+    return (
+        content.startswith("data:image/") or
+        content.startswith("\x89PNG") or
+        content.startswith("GIF8") or
+        content.startswith("\xff\xd8\xff") or
+        re.match(r'^\s*<img\s+', content) is not None or
+        "binary" in content.lower() and any(ext in content.lower() for ext in ["jpg", "jpeg", "png", "bmp", "gif"])
+    )
+
+
+class ClipEntry:
+    __slots__ = ("id", "content", "search_key", "is_image")
+
+    def __init__(self, item_id: str, content: str):
+        self.id = item_id
+        self.content = content
+        self.search_key = content.casefold()
+        self.is_image = is_image_content(content)
+
+
+class ClipboardHistory(Service):
+    """
+    Parsed cliphist entries, shared by every monitor's clipboard panel.
+
+    The panel used to run `cliphist list` and parse the whole history every
+    time it opened. The entries are now kept here and the cliphist database
+    is watched: after a change, the next sync lists the ids again and only
+    parses lines whose id is new, keeping the existing entries for the rest.
+    Syncs run while a panel is open or when one opens after a change.
+    """
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        """Singleton to get the ClipboardHistory service instance."""
+        if ClipboardHistory.instance is None:
+            ClipboardHistory.instance = ClipboardHistory()
+        return ClipboardHistory.instance
+
+    @Signal
+    def changed(self) -> None:
+        """Entries were added or removed."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.entries = []  # newest first
+        self._by_id = {}
+        self.search_index = ClipSearchIndex()
+        self._dirty = True
+        self._syncing = False
+        self._sync_source_id = None
+        self._open_views = 0
+        self._monitor = None
+        self._watch()
+
+    def _watch(self):
+        try:
+            self._monitor = Gio.File.new_for_path(CLIPHIST_DB).monitor_file(
+                Gio.FileMonitorFlags.NONE, None
+            )
+        except GLib.Error as e:
+            logger.warning(f"[Clipboard] Cannot watch {CLIPHIST_DB}: {e}")
+            return
+        self._monitor.connect("changed", self._on_db_changed)
+
+    def _on_db_changed(self, _monitor, _file, _other_file, event_type):
+        if event_type == Gio.FileMonitorEvent.ATTRIBUTE_CHANGED:
+            return
+        self._dirty = True
+        if self._open_views and self._sync_source_id is None:
+            self._sync_source_id = GLib.timeout_add(SYNC_DELAY_MS, self._on_sync_timeout)
+
+    def _on_sync_timeout(self):
+        self._sync_source_id = None
+        self.sync()
+        return False
+
+    def view_opened(self):
+        """A panel started showing the history; bring it up to date."""
+        self._open_views += 1
+        if self._dirty:
+            self.sync()
+
+    def view_closed(self):
+        self._open_views = max(0, self._open_views - 1)
+
+    def sync(self):
+        if self._syncing:
+            # Picked up again once the running sync finishes
+            self._dirty = True
+            return
+        self._syncing = True
+        self._dirty = False
+        GLib.Thread.new("cliphist-sync", self._sync_thread, self._by_id)
+
+    def _sync_thread(self, known):
+        """Background thread worker listing cliphist ids and parsing the new ones"""
+        entries = None
+        try:
+            result = subprocess.run(["cliphist", "list"], capture_output=True, check=True)
+            entries = []
+            for line in result.stdout.decode("utf-8", errors="replace").split("\n"):
+                if not line or "<meta http-equiv" in line:
+                    continue
+                item_id, tab, content = line.partition("\t")
+                if not tab:
+                    item_id, content = "0", line
+                entry = known.get(item_id)
+                if entry is None or entry.content != content:
+                    entry = ClipEntry(item_id, content)
+                entries.append(entry)
+        except subprocess.CalledProcessError as e:
+            logger.error(f"[Clipboard] Error loading clipboard history: {e}")
+        except Exception as e:
+            logger.error(f"[Clipboard] Unexpected error loading clipboard history: {e}")
+        GLib.idle_add(self._sync_finished, entries)
+
+    def _sync_finished(self, entries):
+        self._syncing = False
+        if entries is not None:
+            self._set_entries(entries)
+        if self._dirty and self._open_views:
+            self.sync()
+        return False
+
+    def _set_entries(self, entries):
+        changed = len(entries) != len(self.entries) or any(
+            new is not old for new, old in zip(entries, self.entries)
+        )
+        self.entries = entries
+        # Replaced, not mutated: a running sync reads the previous dict
+        self._by_id = {entry.id: entry for entry in entries}
+        if changed:
+            self.search_index.update(entries)
+            self.emit("changed")
+
+    def search(self, query: str) -> list:
+        """Entries matching query, best first; all entries, newest first, for an empty query."""
+        if not query.strip():
+            return self.entries
+        return self.search_index.search(query)
+
+    def remove(self, item_id: str):
+        """Drop an entry right away after `cliphist delete`."""
+        if item_id in self._by_id:
+            self._set_entries([entry for entry in self.entries if entry.id != item_id])
+
+    def clear(self):
+        """Drop every entry right away after `cliphist wipe`."""
+        self._set_entries([])
+
+
+def get_clipboard_history() -> ClipboardHistory:
+    """Get the global ClipboardHistory instance."""
+    return ClipboardHistory.get_initial()
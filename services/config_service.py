@@ -0,0 +1,144 @@
+import json
+import os
+
+from fabric.core.service import Service, Signal
+from fabric.utils.helpers import get_relative_path
+from gi.repository import Gio, GLib
+from loguru import logger
+
+import config.data as data
+
+CONFIG_FILE = os.path.expanduser(f"~/.config/{data.APP_NAME_CAP}/config/config.json")
+DOCK_CONFIG_FILE = get_relative_path("../config/dock.json")
+
+# Saving a file usually produces several monitor events; they are coalesced
+# into one reload after this delay.
+RELOAD_DELAY_MS = 100
+
+_MISSING = object()
+
+
+class ConfigService(Service):
+    """
+    Parsed JSON config files, cached and kept up to date.
+
+    Each file is parsed the first time it is requested and then watched with
+    a Gio.FileMonitor. When it changes on disk it is parsed again, and
+    subscribers are told which top-level keys changed. Readers get the
+    cached dict and must not modify it; write() replaces a file and its
+    cache at once.
+    """
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        """Singleton to get the ConfigService instance."""
+        if ConfigService.instance is None:
+            ConfigService.instance = ConfigService()
+        return ConfigService.instance
+
+    @Signal
+    def changed(self, path: str, keys: object) -> None:
+        """The top-level keys (a set) of the file at path changed."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._files = {}  # path -> parsed dict
+        self._monitors = {}
+        self._reload_source_ids = {}
+
+    @property
+    def config(self) -> dict:
+        """The main config.json."""
+        return self.load(CONFIG_FILE)
+
+    def get(self, key: str, default=None, path: str = CONFIG_FILE):
+        return self.load(path).get(key, default)
+
+    def load(self, path: str = CONFIG_FILE) -> dict:
+        if path not in self._files:
+            self._files[path] = self._read(path) or {}
+            self._watch(path)
+        return self._files[path]
+
+    def write(self, path: str, values: dict) -> bool:
+        """Replace the file at path with values and notify subscribers right away."""
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(values, f, indent=4)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"[Config] Could not write {path}: {e}")
+            return False
+        self.load(path)
+        self._update(path, json.loads(json.dumps(values)))
+        return True
+
+    def subscribe(self, callback, path: str = CONFIG_FILE, keys=None) -> int:
+        """
+        Call callback(changed_keys) when the file at path changes. With keys,
+        only when one of those keys changed. Returns the handler id.
+        """
+        self.load(path)
+        keys = set(keys) if keys is not None else None
+
+        def on_changed(_service, changed_path, changed_keys):
+            if changed_path != path:
+                return
+            if keys is not None and not keys & changed_keys:
+                return
+            callback(changed_keys)
+
+        return self.connect("changed", on_changed)
+
+    def _read(self, path: str):
+        """Parse path. Returns {} if it does not exist and None if it cannot be parsed."""
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"[Config] Could not read {path}: {e}")
+            return None
+
+    def _watch(self, path: str):
+        try:
+            monitor = Gio.File.new_for_path(path).monitor_file(Gio.FileMonitorFlags.WATCH_MOVES, None)
+        except GLib.Error as e:
+            logger.warning(f"[Config] Cannot watch {path}: {e}")
+            return
+        monitor.connect("changed", self._on_file_changed, path)
+        self._monitors[path] = monitor
+
+    def _on_file_changed(self, _monitor, _file, _other_file, event_type, path):
+        if event_type == Gio.FileMonitorEvent.ATTRIBUTE_CHANGED:
+            return
+        if path not in self._reload_source_ids:
+            self._reload_source_ids[path] = GLib.timeout_add(RELOAD_DELAY_MS, self._reload, path)
+
+    def _reload(self, path: str):
+        self._reload_source_ids.pop(path, None)
+        values = self._read(path)
+        # A half-written or broken file keeps the last good values
+        if values is not None:
+            self._update(path, values)
+        return False
+
+    def _update(self, path: str, values: dict):
+        previous = self._files.get(path, {})
+        changed_keys = {
+            key for key in previous.keys() | values.keys()
+            if previous.get(key, _MISSING) != values.get(key, _MISSING)
+        }
+        self._files[path] = values
+        if changed_keys:
+            logger.info(f"[Config] {os.path.basename(path)} changed: {', '.join(sorted(changed_keys))}")
+            self.emit("changed", path, changed_keys)
+
+
+def get_config_service() -> ConfigService:
+    """Get the global ConfigService instance."""
+    return ConfigService.get_initial()
@@ -0,0 +1,354 @@
+import json
+import os
+import socket
+import threading
+import time
+
+from fabric.core.service import Service, Signal
+from gi.repository import GLib
+from loguru import logger
+
+
+def _hyprland_socket_dir() -> str | None:
+    """Locate the socket directory of the running Hyprland instance."""
+    signature = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE")
+    if not signature:
+        return None
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+    # Hyprland >= 0.40 keeps its sockets in XDG_RUNTIME_DIR, older versions in /tmp
+    for base in (f"{runtime_dir}/hypr", "/tmp/hypr"):
+        path = os.path.join(base, signature)
+        if os.path.exists(os.path.join(path, ".socket2.sock")):
+            return path
+    return None
+
+
+def _normalize_address(address: str) -> str:
+    """Events send bare hex addresses, j/clients uses the 0x prefix."""
+    address = address.strip()
+    return address if address.startswith("0x") else f"0x{address}"
+
+
+def _workspace_id(value: str, default: int = -1) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class HyprlandState(Service):
+    """
+    Single in-process view of the Hyprland compositor state.
+
+    Reads the event socket (socket2) natively on a background thread and
+    applies events to an in-memory model of monitors, workspaces, clients and
+    the active window on the GLib main loop. Events that change window
+    geometry (open, move, float toggle, fullscreen) trigger one coalesced
+    resync of the affected model per main loop iteration, shared by every
+    consumer instead of each widget querying Hyprland on its own.
+    """
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        """Singleton to get the HyprlandState service instance."""
+        if HyprlandState.instance is None:
+            HyprlandState.instance = HyprlandState()
+        return HyprlandState.instance
+
+    @Signal
+    def event(self, name: str, data: str) -> None:
+        """Raw Hyprland event, emitted after the model has been updated."""
+
+    @Signal
+    def clients_changed(self) -> None:
+        """Any client was added, removed, moved, resized or retitled."""
+
+    @Signal
+    def client_added(self, address: str) -> None: ...
+
+    @Signal
+    def client_removed(self, address: str) -> None: ...
+
+    @Signal
+    def active_window_changed(self, address: str) -> None: ...
+
+    @Signal
+    def active_workspace_changed(self, workspace_id: int, monitor_name: str) -> None: ...
+
+    @Signal
+    def monitor_focused(self, monitor_name: str, workspace_id: int) -> None: ...
+
+    @Signal
+    def monitors_changed(self) -> None: ...
+
+    @Signal
+    def workspaces_changed(self) -> None: ...
+
+    @Signal
+    def fullscreen_changed(self, fullscreen: bool) -> None: ...
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._socket_dir = _hyprland_socket_dir()
+        self._monitors: list[dict] = []
+        self._workspaces: dict[int, dict] = {}
+        self._clients: dict[str, dict] = {}
+        self._active_window = ""
+        self._active_workspace = -1
+        self._focused_monitor = ""
+        self._pending_resync: set[str] = set()
+        self._listening = False
+        self._thread = None
+
+        if self._socket_dir is None:
+            logger.warning("[HyprlandState] Hyprland socket not found, state will stay empty")
+            return
+
+        self._resync("monitors", "workspaces", "clients", "activewindow")
+        self.start_listening()
+
+    # ------------------------------------------------------------------
+    # Requests (socket1)
+    # ------------------------------------------------------------------
+
+    def send_command(self, command: str) -> str:
+        """Send a raw request to Hyprland's command socket and return the reply."""
+        if self._socket_dir is None:
+            return ""
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(os.path.join(self._socket_dir, ".socket.sock"))
+                sock.sendall(command.encode())
+                chunks = []
+                while chunk := sock.recv(65536):
+                    chunks.append(chunk)
+            return b"".join(chunks).decode(errors="replace")
+        except OSError as e:
+            logger.error(f"[HyprlandState] Request '{command}' failed: {e}")
+            return ""
+
+    def dispatch(self, args: str) -> str:
+        return self.send_command(f"/dispatch {args}")
+
+    def _query_json(self, command: str, default):
+        reply = self.send_command(command)
+        try:
+            return json.loads(reply) if reply else default
+        except json.JSONDecodeError:
+            logger.error(f"[HyprlandState] Invalid reply for '{command}'")
+            return default
+
+    def _resync(self, *models: str):
+        """Refresh whole models from Hyprland and emit change signals."""
+        if "monitors" in models:
+            monitors = self._query_json("j/monitors", [])
+            if monitors != self._monitors:
+                self._monitors = monitors
+                for monitor in monitors:
+                    if monitor.get("focused"):
+                        self._focused_monitor = monitor.get("name", "")
+                        self._active_workspace = monitor.get("activeWorkspace", {}).get("id", -1)
+                self.emit("monitors-changed")
+
+        if "workspaces" in models:
+            workspaces = {
+                workspace["id"]: workspace
+                for workspace in self._query_json("j/workspaces", [])
+            }
+            if workspaces != self._workspaces:
+                self._workspaces = workspaces
+                self.emit("workspaces-changed")
+
+        if "clients" in models:
+            clients = {
+                client["address"]: client
+                for client in self._query_json("j/clients", [])
+            }
+            if clients != self._clients:
+                added = clients.keys() - self._clients.keys()
+                removed = self._clients.keys() - clients.keys()
+                self._clients = clients
+                for address in removed:
+                    self.emit("client-removed", address)
+                for address in added:
+                    self.emit("client-added", address)
+                self.emit("clients-changed")
+
+        if "activewindow" in models:
+            address = self._query_json("j/activewindow", {}).get("address", "")
+            if address != self._active_window:
+                self._active_window = address
+                self.emit("active-window-changed", address)
+
+    def _schedule_resync(self, *models: str):
+        if not self._pending_resync:
+            GLib.idle_add(self._run_pending_resync)
+        self._pending_resync.update(models)
+
+    def _run_pending_resync(self):
+        models, self._pending_resync = self._pending_resync, set()
+        self._resync(*models)
+        return False
+
+    # ------------------------------------------------------------------
+    # Event socket (socket2)
+    # ------------------------------------------------------------------
+
+    def start_listening(self):
+        """Start reading Hyprland events in a background thread."""
+        if self._listening or self._socket_dir is None:
+            return
+        self._listening = True
+        self._thread = threading.Thread(target=self._listen, daemon=True)
+        self._thread.start()
+
+    def stop_listening(self):
+        self._listening = False
+
+    def _listen(self):
+        path = os.path.join(self._socket_dir, ".socket2.sock")
+        while self._listening:
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.connect(path)
+                    buffer = b""
+                    while self._listening:
+                        chunk = sock.recv(65536)
+                        if not chunk:
+                            break
+                        buffer += chunk
+                        *lines, buffer = buffer.split(b"\n")
+                        if lines:
+                            # Hand a whole batch to the main loop at once
+                            GLib.idle_add(self._handle_events, [line.decode(errors="replace") for line in lines])
+            except OSError as e:
+                logger.error(f"[HyprlandState] Event socket error: {e}")
+            if self._listening:
+                time.sleep(1)
+
+    def _handle_events(self, lines: list[str]):
+        for line in lines:
+            name, sep, data = line.partition(">>")
+            if not sep:
+                continue
+            try:
+                self._apply_event(name, data)
+            except Exception as e:
+                logger.error(f"[HyprlandState] Error handling event '{line}': {e}")
+            self.emit("event", name, data)
+        return False
+
+    def _apply_event(self, name: str, data: str):
+        match name:
+            # "workspace" and "focusedmon" carry the workspace name, which is
+            # not a number for named and special workspaces; their v2
+            # counterparts carry the id
+            case "workspacev2":
+                workspace_id = _workspace_id(data.split(",", 1)[0])
+                self._set_active_workspace(workspace_id, self._focused_monitor)
+            case "focusedmonv2":
+                monitor_name, _, workspace = data.partition(",")
+                self._focused_monitor = monitor_name
+                workspace_id = _workspace_id(workspace)
+                self._set_active_workspace(workspace_id, monitor_name)
+                self.emit("monitor-focused", monitor_name, workspace_id)
+            case "activewindowv2":
+                address = _normalize_address(data) if data.strip() else ""
+                if address != self._active_window:
+                    self._active_window = address
+                    self.emit("active-window-changed", address)
+            case "openwindow":
+                address, workspace, window_class, title = (data.split(",", 3) + ["", "", ""])[:4]
+                address = _normalize_address(address)
+                if address not in self._clients:
+                    workspace_id = next(
+                        (ws_id for ws_id, ws in self._workspaces.items() if ws.get("name") == workspace),
+                        _workspace_id(workspace),
+                    )
+                    # Provisional entry until the resync brings in geometry
+                    self._clients[address] = {
+                        "address": address,
+                        "mapped": True,
+                        "workspace": {"id": workspace_id, "name": workspace},
+                        "class": window_class,
+                        "initialClass": window_class,
+                        "title": title,
+                        "initialTitle": title,
+                    }
+                    self.emit("client-added", address)
+                self._schedule_resync("clients", "workspaces")
+            case "closewindow":
+                address = _normalize_address(data)
+                if self._clients.pop(address, None) is not None:
+                    self.emit("client-removed", address)
+                    self.emit("clients-changed")
+                # Remaining tiled windows reflow on close
+                self._schedule_resync("clients", "workspaces")
+            case "windowtitlev2":
+                address, _, title = data.partition(",")
+                client = self._clients.get(_normalize_address(address))
+                if client is not None and client.get("title") != title:
+                    client["title"] = title
+                    self.emit("clients-changed")
+            case "movewindowv2" | "changefloatingmode" | "fullscreen":
+                if name == "fullscreen":
+                    self.emit("fullscreen-changed", data.strip() == "1")
+                self._schedule_resync("clients", "workspaces")
+            case "createworkspacev2" | "destroyworkspacev2" | "moveworkspacev2" | "renameworkspace":
+                self._schedule_resync("workspaces", "monitors")
+            case "monitoradded" | "monitoraddedv2" | "monitorremoved":
+                self._schedule_resync("monitors", "workspaces", "clients")
+
+    def _set_active_workspace(self, workspace_id: int, monitor_name: str):
+        for monitor in self._monitors:
+            if monitor.get("name") == monitor_name:
+                monitor["activeWorkspace"] = {"id": workspace_id, "name": str(workspace_id)}
+            monitor["focused"] = monitor.get("name") == monitor_name
+        if workspace_id != self._active_workspace:
+            self._active_workspace = workspace_id
+            self.emit("active-workspace-changed", workspace_id, monitor_name)
+
+    # ------------------------------------------------------------------
+    # Read accessors
+    # ------------------------------------------------------------------
+
+    def get_clients(self) -> list[dict]:
+        return list(self._clients.values())
+
+    def get_client(self, address: str) -> dict | None:
+        return self._clients.get(address)
+
+    def get_active_window(self) -> dict:
+        return self._clients.get(self._active_window, {})
+
+    def get_active_window_address(self) -> str:
+        return self._active_window
+
+    def get_active_workspace_id(self) -> int:
+        return self._active_workspace
+
+    def get_workspaces(self) -> dict[int, dict]:
+        return self._workspaces
+
+    def get_monitors(self) -> list[dict]:
+        return self._monitors
+
+    def get_monitor_by_name(self, monitor_name: str) -> dict | None:
+        return next((m for m in self._monitors if m.get("name") == monitor_name), None)
+
+    def get_focused_monitor(self) -> dict | None:
+        return self.get_monitor_by_name(self._focused_monitor)
+
+    def get_focused_monitor_index(self) -> int | None:
+        """Index of the focused monitor in Hyprland's monitor list (the shell's monitor id)."""
+        for i, monitor in enumerate(self._monitors):
+            if monitor.get("name") == self._focused_monitor:
+                return i
+        return None
+
+
+def get_hyprland_state() -> HyprlandState:
+    """Get the global HyprlandState instance."""
+    return HyprlandState.get_initial()
@@ -1,6 +1,3 @@
-import json
-import subprocess
-import threading
 from typing import Optional
 
 
@@ -27,8 +24,8 @@ class MonitorFocusService:
     """
     Service to track monitor focus changes through Hyprland events.
     
-    Listens to 'focusedmon' and 'workspace' events and emits signals
-    when monitor focus changes.
+    Follows 'focusedmonv2' and 'workspacev2' events from the shared
+    HyprlandState service and emits signals when monitor focus changes.
     """
     
     _instance = None
@@ -48,7 +45,7 @@ class MonitorFocusService:
         self._current_workspace = 1
         self._current_monitor_name = ""
         self._listening = False
-        self._thread = None
+        self._handler_ids = []
         
         # Signals
         self.monitor_focused = Signal()
@@ -86,65 +83,45 @@ class MonitorFocusService:
             self._monitor_info = {}
     
     def start_listening(self):
-        """Start listening to Hyprland events in a separate thread."""
+        """Subscribe to focus and workspace changes from the shared Hyprland state."""
         if self._listening:
             return
         
+        from services.hyprland_state import get_hyprland_state
+        
         self._listening = True
-        self._thread = threading.Thread(target=self._listen_to_hyprland, daemon=True)
-        self._thread.start()
+        state = get_hyprland_state()
+        self._handler_ids = [
+            state.connect("monitor-focused", self._on_monitor_focused),
+            state.connect("active-workspace-changed", self._on_active_workspace_changed),
+        ]
+        
+        focused = state.get_focused_monitor()
+        if focused:
+            self._current_monitor_name = focused.get("name", "")
+            self._current_workspace = state.get_active_workspace_id()
     
     def stop_listening(self):
         """Stop listening to Hyprland events."""
+        if not self._listening:
+            return
+        
+        from services.hyprland_state import get_hyprland_state
+        
         self._listening = False
-        if self._thread and self._thread.is_alive():
-            self._thread.join(timeout=1.0)
+        state = get_hyprland_state()
+        for handler_id in self._handler_ids:
+            state.disconnect(handler_id)
+        self._handler_ids = []
     
-    def _listen_to_hyprland(self):
-        """Listen to Hyprland events via socat."""
-        try:
-            process = subprocess.Popen(
-                ["socat", "-U", "-", "UNIX-CONNECT:/tmp/hypr/$HYPRLAND_INSTANCE_SIGNATURE/.socket2.sock"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
-            )
-            
-            while self._listening and process.poll() is None:
-                if process.stdout:
-                    line = process.stdout.readline()
-                    if line:
-                        self._handle_hyprland_event(line.strip())
-                    
-        except (subprocess.SubprocessError, FileNotFoundError) as e:
-            print(f"MonitorFocusService: Error listening to Hyprland: {e}")
-        except Exception as e:
-            print(f"MonitorFocusService: Unexpected error: {e}")
+    def _on_monitor_focused(self, _state, monitor_name: str, workspace_id: int):
+        self._handle_focused_monitor(f"{monitor_name},{workspace_id}")
     
-    def _handle_hyprland_event(self, event_line: str):
-        """Parse and handle Hyprland event."""
-        try:
-            if '>>' not in event_line:
-                return
-            
-            parts = event_line.split('>>')
-            if len(parts) < 2:
-                return
-            
-            event_type = parts[0]
-            event_data = parts[1]
-            
-            if event_type == "focusedmon":
-                self._handle_focused_monitor(event_data)
-            elif event_type == "workspace":
-                self._handle_workspace_change(event_data)
-                
-        except Exception as e:
-            print(f"MonitorFocusService: Error handling event '{event_line}': {e}")
+    def _on_active_workspace_changed(self, _state, workspace_id: int, _monitor_name: str):
+        self._handle_workspace_change(str(workspace_id))
     
     def _handle_focused_monitor(self, data: str):
-        """Handle focusedmon event: monitor_name,workspace_name"""
+        """Handle focusedmonv2 event: monitor_name,workspace_id"""
         try:
             parts = data.split(',')
             if len(parts) >= 2:
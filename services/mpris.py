@@ -2,7 +2,6 @@
 import contextlib
 
 # Third-party imports
-import gi
 from gi.repository import GLib  # type: ignore
 from loguru import logger
 
@@ -10,6 +9,8 @@ from loguru import logger
 from fabric.core.service import Property, Service, Signal
 from fabric.utils import bulk_connect
 
+from utils.lazy_import import lazy_gi_import
+
 class PlayerctlImportError(ImportError):
     """An error to raise when playerctl is not installed."""
     def __init__(self, *args):
@@ -18,12 +19,10 @@ class PlayerctlImportError(ImportError):
             *args,
         )
 
-# Try to import Playerctl, raise custom error if not available
-try:
-    gi.require_version("Playerctl", "2.0")
-    from gi.repository import Playerctl
-except ValueError:
-    raise PlayerctlImportError
+# Playerctl is loaded by the first MprisPlayerManager, which raises
+# PlayerctlImportError if it is not available. Annotations that are evaluated
+# when the classes are defined are quoted or typed as object for this reason.
+Playerctl = lazy_gi_import("Playerctl", "2.0")
 
 
 class MprisPlayer(Service):
@@ -37,7 +36,7 @@ class MprisPlayer(Service):
 
     def __init__(
         self,
-        player: Playerctl.Player,
+        player: "Playerctl.Player",
         **kwargs,
     ):
         self._signal_connectors: dict = {}
@@ -239,8 +238,17 @@ class MprisPlayer(Service):
 class MprisPlayerManager(Service):
     """A service to manage mpris players."""
 
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        """Singleton shared by the players of every monitor."""
+        if MprisPlayerManager.instance is None:
+            MprisPlayerManager.instance = MprisPlayerManager()
+        return MprisPlayerManager.instance
+
     @Signal
-    def player_appeared(self, player: Playerctl.Player) -> Playerctl.Player: ...
+    def player_appeared(self, player: object) -> object: ...
 
     @Signal
     def player_vanished(self, player_name: str) -> str: ...
@@ -249,7 +257,10 @@ class MprisPlayerManager(Service):
         self,
         **kwargs,
     ):
-        self._manager = Playerctl.PlayerManager.new()
+        try:
+            self._manager = Playerctl.PlayerManager.new()
+        except ValueError:
+            raise PlayerctlImportError
         bulk_connect(
             self._manager,
             {
@@ -260,13 +271,13 @@ class MprisPlayerManager(Service):
         self.add_players()
         super().__init__(**kwargs)
 
-    def on_name_appeard(self, manager, player_name: Playerctl.PlayerName):
+    def on_name_appeard(self, manager, player_name: "Playerctl.PlayerName"):
         logger.info(f"[MprisPlayer] {player_name.name} appeared")
         new_player = Playerctl.Player.new_from_name(player_name)
         manager.manage_player(new_player)
         self.emit("player-appeared", new_player)  # type: ignore
 
-    def on_name_vanished(self, manager, player_name: Playerctl.PlayerName):
+    def on_name_vanished(self, manager, player_name: "Playerctl.PlayerName"):
         logger.info(f"[MprisPlayer] {player_name.name} vanished")
         self.emit("player-vanished", player_name.name)  # type: ignore
 
@@ -277,3 +288,8 @@ class MprisPlayerManager(Service):
     @Property(object, "readable")
     def players(self):
         return self._manager.get_property("players")  # type: ignore
+
+
+def get_mpris_manager() -> MprisPlayerManager:
+    """Get the global MprisPlayerManager instance."""
+    return MprisPlayerManager.get_initial()
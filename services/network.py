@@ -1,16 +1,15 @@
 from typing import Any, List, Literal
 
-import gi
 from fabric.core.service import Property, Service, Signal
 from fabric.utils import bulk_connect, exec_shell_command_async
 from gi.repository import Gio
 from loguru import logger
 
-try:
-    gi.require_version("NM", "1.0")
-    from gi.repository import NM
-except ValueError:
-    logger.error("Failed to start network manager")
+from utils.lazy_import import lazy_gi_import
+
+# Loaded by the first NetworkClient. Parameter annotations below are quoted
+# so defining these classes does not load the typelib.
+NM = lazy_gi_import("NM", "1.0")
 
 
 class Wifi(Service):
@@ -22,7 +21,7 @@ class Wifi(Service):
     @Signal
     def enabled(self) -> bool: ...
 
-    def __init__(self, client: NM.Client, device: NM.DeviceWifi, **kwargs):
+    def __init__(self, client: "NM.Client", device: "NM.DeviceWifi", **kwargs):
         self._client: NM.Client = client
         self._device: NM.DeviceWifi = device
         self._ap: NM.AccessPoint | None = None
@@ -232,7 +231,7 @@ class Ethernet(Service):
 
         return "network-wired-disconnected-symbolic"
 
-    def __init__(self, client: NM.Client, device: NM.DeviceEthernet, **kwargs) -> None:
+    def __init__(self, client: "NM.Client", device: "NM.DeviceEthernet", **kwargs) -> None:
         super().__init__(**kwargs)
         self._client: NM.Client = client
         self._device: NM.DeviceEthernet = device
@@ -264,13 +263,18 @@ class NetworkClient(Service):
         self.wifi_device: Wifi | None = None
         self.ethernet_device: Ethernet | None = None
         super().__init__(**kwargs)
-        NM.Client.new_async(
+        try:
+            client_class = NM.Client
+        except ValueError:
+            logger.error("Failed to start network manager")
+            return
+        client_class.new_async(
             cancellable=None,
             callback=self._init_network_client,
             **kwargs,
         )
 
-    def _init_network_client(self, client: NM.Client, task: Gio.Task, **kwargs):
+    def _init_network_client(self, client: "NM.Client", task: Gio.Task, **kwargs):
         self._client = client
         wifi_device: NM.DeviceWifi | None = self._get_device(NM.DeviceType.WIFI)  # type: ignore
         ethernet_device: NM.DeviceEthernet | None = self._get_device(
@@ -0,0 +1,203 @@
+"""
+Persistent notification history.
+
+The history is stored as an append-only log of JSON lines in PERSISTENT_DIR:
+
+    {"op": "add", "note": {...}}
+    {"op": "del", "ids": ["...", ...]}
+
+A new notification or a deletion appends one short line instead of
+rewriting the whole history. Replaying the log applies the retention limit,
+so notes pushed out by newer ones need no record of their own. Once the
+log holds many more records than live notes, it is compacted: rewritten
+with one "add" record per live note.
+"""
+
+import json
+import os
+
+from fabric.core.service import Service, Signal
+from loguru import logger
+
+import config.data as data
+
+PERSISTENT_DIR = f"/tmp/{data.APP_NAME}/notifications"
+PERSISTENT_HISTORY_LOG = os.path.join(PERSISTENT_DIR, "notification_history.log")
+# Full JSON list written by previous versions, migrated on first load
+LEGACY_HISTORY_FILE = os.path.join(PERSISTENT_DIR, "notification_history.json")
+
+HISTORY_LIMIT = max(1, int(data.NOTIFICATION_HISTORY_LIMIT or 1))
+
+# Compact once the log has this many records and twice as many as live notes
+COMPACT_MIN_RECORDS = 200
+
+
+class NotificationHistoryStore(Service):
+    """
+    Persistent notification history, shared by every monitor.
+
+    Each monitor's dashboard has a NotificationHistory view. The views used
+    to keep their own copy of the history file, so only the primary monitor
+    saw new notifications and deleting one elsewhere wrote a stale list back
+    to disk. Views now go through the store and follow its signals.
+    """
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        """Singleton to get the NotificationHistoryStore service instance."""
+        if NotificationHistoryStore.instance is None:
+            NotificationHistoryStore.instance = NotificationHistoryStore()
+        return NotificationHistoryStore.instance
+
+    @Signal
+    def note_added(self, note: object) -> None:
+        """A notification was added to the history."""
+
+    @Signal
+    def notes_removed(self, ids: object) -> None:
+        """Notifications with these ids (a set of str) were removed from the history."""
+
+    @Signal
+    def cleared(self) -> None:
+        """The whole history was cleared."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.notes = []  # newest first
+        self._log_records = 0
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Log
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        os.makedirs(PERSISTENT_DIR, exist_ok=True)
+        if os.path.exists(LEGACY_HISTORY_FILE):
+            self._migrate_legacy_history()
+            return
+        try:
+            with open(PERSISTENT_HISTORY_LOG, "r") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.error(f"Error loading persistent history: {e}")
+            return
+
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A record cut short by a crash; the rest of the log is intact
+                continue
+            self._apply(record)
+        self._log_records = len(lines)
+        if lines and not lines[-1].endswith("\n"):
+            # Rewrite the log so the next record does not land on the torn line
+            self._compact()
+        else:
+            self._maybe_compact()
+
+    def _migrate_legacy_history(self):
+        try:
+            with open(LEGACY_HISTORY_FILE, "r") as f:
+                self.notes = json.load(f)[:HISTORY_LIMIT]
+        except Exception as e:
+            logger.error(f"Error loading persistent history: {e}")
+        if self._compact():
+            try:
+                os.remove(LEGACY_HISTORY_FILE)
+            except OSError as e:
+                logger.warning(f"Could not remove old history file: {e}")
+
+    def _apply(self, record: dict):
+        op = record.get("op")
+        if op == "add" and isinstance(record.get("note"), dict):
+            self.notes.insert(0, record["note"])
+            del self.notes[HISTORY_LIMIT:]
+        elif op == "del":
+            ids = {str(note_id) for note_id in record.get("ids", [])}
+            self.notes = [note for note in self.notes if str(note.get("id")) not in ids]
+
+    def _append(self, record: dict):
+        try:
+            with open(PERSISTENT_HISTORY_LOG, "a") as f:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        except OSError as e:
+            logger.error(f"Error saving persistent history: {e}")
+            return
+        self._log_records += 1
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._log_records >= max(COMPACT_MIN_RECORDS, 2 * len(self.notes)):
+            self._compact()
+
+    def _compact(self) -> bool:
+        """Rewrite the log with one record per live note, oldest first."""
+        tmp_path = f"{PERSISTENT_HISTORY_LOG}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                for note in reversed(self.notes):
+                    f.write(json.dumps({"op": "add", "note": note}, separators=(",", ":")) + "\n")
+            os.replace(tmp_path, PERSISTENT_HISTORY_LOG)
+        except OSError as e:
+            logger.error(f"Error compacting persistent history: {e}")
+            return False
+        self._log_records = len(self.notes)
+        return True
+
+    # ------------------------------------------------------------------
+    # Changes
+    # ------------------------------------------------------------------
+
+    def add(self, note: dict):
+        dropped = self.notes[HISTORY_LIMIT - 1:]
+        self.notes.insert(0, note)
+        del self.notes[HISTORY_LIMIT:]
+        self._append({"op": "add", "note": note})
+        self.emit("note-added", note)
+        if dropped:
+            for old_note in dropped:
+                self._delete_cached_image(old_note)
+            self.emit("notes-removed", {str(old_note.get("id")) for old_note in dropped})
+
+    def remove(self, ids):
+        """Remove the notes with the given ids. Returns True if any was found."""
+        ids = {str(note_id) for note_id in ids}
+        remaining = [note for note in self.notes if str(note.get("id")) not in ids]
+        if len(remaining) == len(self.notes):
+            return False
+        self.notes = remaining
+        self._append({"op": "del", "ids": sorted(ids)})
+        self.emit("notes-removed", ids)
+        return True
+
+    def clear(self):
+        self.notes = []
+        self._log_records = 0
+        if os.path.exists(PERSISTENT_HISTORY_LOG):
+            try:
+                os.remove(PERSISTENT_HISTORY_LOG)
+                logger.info("Notification history cleared and persistent file deleted.")
+            except Exception as e:
+                logger.error(f"Error deleting persistent history file: {e}")
+        self.emit("cleared")
+
+    @staticmethod
+    def _delete_cached_image(note: dict):
+        path = note.get("cached_image_path")
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+                logger.info(f"Deleted cached image of notification past the history limit: {path}")
+            except OSError as e:
+                logger.error(f"Error deleting cached image {path}: {e}")
+
+
+def get_notification_history_store() -> NotificationHistoryStore:
+    """Get the global NotificationHistoryStore instance."""
+    return NotificationHistoryStore.get_initial()
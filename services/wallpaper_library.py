@@ -0,0 +1,398 @@
+import bisect
+import os
+import shutil
+
+from fabric.core.service import Service, Signal
+from gi.repository import GdkPixbuf, Gio, GLib, Gtk
+
+import config.data as data
+from utils import wallpaper_palette
+from utils.wallpaper_catalog import WallpaperCatalog, is_image
+from utils.wallpaper_thumbs import ThumbnailPipeline, ThumbnailStore
+
+# A copy into the folder reports many changes; a file is read once they stop
+FILE_SETTLE_DELAY_MS = 500
+# Catalog writes after file changes are coalesced over this delay
+CATALOG_SAVE_DELAY_MS = 1000
+
+
+class WallpaperLibrary(Service):
+    """
+    The wallpaper library and its thumbnails, shared by every monitor.
+
+    Each monitor has its own WallpaperSelector, and each one used to scan
+    WALLPAPERS_DIR, watch it, render missing thumbnails and hold a pixbuf per
+    wallpaper. The library does this once; selectors only keep their own
+    filtered and sorted views of its model.
+    """
+
+    instance = None
+
+    @staticmethod
+    def get_initial():
+        """Singleton to get the WallpaperLibrary service instance."""
+        if WallpaperLibrary.instance is None:
+            WallpaperLibrary.instance = WallpaperLibrary()
+        return WallpaperLibrary.instance
+
+    @Signal
+    def changed(self) -> None:
+        """Wallpapers were added to or removed from the library."""
+
+    @Signal
+    def palettes_indexed(self, computed: int) -> None:
+        """A palette pass finished, computing palettes for `computed` wallpapers."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Delete the old cache directory if it exists
+        old_cache_dir = f"{data.CACHE_DIR}/wallpapers"
+        if os.path.exists(old_cache_dir):
+            shutil.rmtree(old_cache_dir)
+
+        self.thumbs = ThumbnailStore()
+        # Recursive index of WALLPAPERS_DIR, persisted in CACHE_DIR. File
+        # names below are paths relative to WALLPAPERS_DIR.
+        self.catalog = WallpaperCatalog()
+        self.files = self.catalog.paths()
+        # Columns: thumbnail, file name, casefolded search key. Rows stay
+        # sorted by key; selectors filter and sort their own views of it.
+        self.store = Gtk.ListStore(GdkPixbuf.Pixbuf, str, str)
+        # Sorted (key, file name) pairs mirroring the rows of the store
+        self._sorted_names = []
+        self._rows = {}  # file name -> persistent Gtk.ListStore iter
+        self._palette_pass_running = False
+        self.thumbnail_queue = []
+        # Missing thumbnails are rendered in worker processes, one per CPU
+        self.thumbnail_pipeline = ThumbnailPipeline(
+            self.thumbs,
+            on_done=self._on_thumbnail_done,
+            on_drained=self._on_thumbnails_drained,
+        )
+
+        self._file_update_source_ids = {}  # file name -> pending update timeout
+        self._save_source_id = None
+        self.file_monitors = {}
+        self.setup_file_monitor()
+        GLib.Thread.new("wallpaper-catalog", self._load_catalog, None)
+
+    def _load_catalog(self, _data):
+        """Show cached wallpapers right away, then bring the catalog up to date."""
+        shown = {
+            file_name for file_name in self.files
+            if self._queue_cached_thumbnail(file_name)
+        }
+        changed, removed = self.catalog.refresh()
+        self.catalog.save()
+        GLib.idle_add(self._on_catalog_refreshed, removed)
+
+        live_paths = self.catalog.paths()
+        self.thumbs.collect_garbage(
+            os.path.join(data.WALLPAPERS_DIR, file_name) for file_name in live_paths
+        )
+        changed = set(changed)
+        missing = 0
+        for file_name in live_paths:
+            if file_name in changed or file_name not in shown:
+                if not self._process_file(file_name):
+                    missing += 1
+        if not missing:
+            GLib.idle_add(self._on_thumbnails_drained)
+
+    def _rescan_catalog(self, _data):
+        """Pick up a folder tree that appeared while the shell is running."""
+        changed, removed = self.catalog.refresh()
+        self.catalog.save()
+        GLib.idle_add(self._on_catalog_refreshed, removed)
+        for file_name in changed:
+            self._process_file(file_name)
+
+    def _on_catalog_refreshed(self, removed):
+        self.files = self.catalog.paths()
+        for file_name in removed:
+            self._remove_thumbnail(file_name)
+        self.setup_file_monitor()
+        self.emit("changed")
+        return False
+
+    def setup_file_monitor(self):
+        """Watch WALLPAPERS_DIR and every cataloged subfolder."""
+        for folder in ["", *self.catalog.folders()]:
+            if folder in self.file_monitors:
+                continue
+            gfile = Gio.File.new_for_path(os.path.join(data.WALLPAPERS_DIR, folder))
+            monitor = gfile.monitor_directory(Gio.FileMonitorFlags.NONE, None)
+            monitor.connect("changed", self.on_directory_changed)
+            self.file_monitors[folder] = monitor
+
+    def on_directory_changed(self, monitor, file, other_file, event_type):
+        file_name = os.path.relpath(file.get_path(), data.WALLPAPERS_DIR)
+        if event_type == Gio.FileMonitorEvent.DELETED:
+            source_id = self._file_update_source_ids.pop(file_name, None)
+            if source_id is not None:
+                GLib.source_remove(source_id)
+            if self.catalog.has_folder(file_name):
+                for folder in [f for f in self.file_monitors if f == file_name or f.startswith(f"{file_name}/")]:
+                    self.file_monitors.pop(folder).cancel()
+                removed = self.catalog.remove_folder(file_name)
+            elif self.catalog.get(file_name) is not None:
+                self.catalog.remove(file_name)
+                removed = [file_name]
+            else:
+                return
+            for removed_name in removed:
+                self.thumbs.remove(os.path.join(data.WALLPAPERS_DIR, removed_name))
+                self._remove_thumbnail(removed_name)
+            self.files = self.catalog.paths()
+            self.catalog.save()
+            self.thumbs.save()
+            self.emit("changed")
+        elif event_type == Gio.FileMonitorEvent.CREATED:
+            if os.path.isdir(file.get_path()):
+                GLib.Thread.new("wallpaper-catalog", self._rescan_catalog, None)
+            elif is_image(file_name):
+                self._schedule_file_update(file_name)
+        elif event_type == Gio.FileMonitorEvent.CHANGED:
+            if is_image(file_name):
+                self._schedule_file_update(file_name)
+        elif event_type == Gio.FileMonitorEvent.CHANGES_DONE_HINT:
+            source_id = self._file_update_source_ids.get(file_name)
+            if source_id is not None:
+                GLib.source_remove(source_id)
+                self._update_file(file_name)
+
+    def _schedule_file_update(self, file_name):
+        """Read file_name once it has not changed for FILE_SETTLE_DELAY_MS."""
+        source_id = self._file_update_source_ids.get(file_name)
+        if source_id is not None:
+            GLib.source_remove(source_id)
+        self._file_update_source_ids[file_name] = GLib.timeout_add(
+            FILE_SETTLE_DELAY_MS, self._update_file, file_name
+        )
+
+    def _update_file(self, file_name):
+        self._file_update_source_ids.pop(file_name, None)
+        is_new = self.catalog.get(file_name) is None
+        if self.catalog.update(file_name) is None:
+            return False
+        # A changed file gets a new thumbnail key from its mtime; the
+        # existing row gets the new pixbuf once it is rendered
+        self._process_file(file_name)
+        if is_new:
+            self.files = self.catalog.paths()
+            self.emit("changed")
+        if self._save_source_id is None:
+            self._save_source_id = GLib.timeout_add(CATALOG_SAVE_DELAY_MS, self._save_catalog)
+        return False
+
+    def _save_catalog(self):
+        self._save_source_id = None
+        self.catalog.save()
+        return False
+
+    # ------------------------------------------------------------------
+    # Thumbnails
+    # ------------------------------------------------------------------
+
+    def _queue_cached_thumbnail(self, file_name) -> bool:
+        """Queue the cached thumbnail of file_name for display. Returns False if it must be rendered."""
+        entry = self.catalog.get(file_name)
+        if entry is None:
+            return False
+        cache_path = self.thumbs.lookup(
+            os.path.join(data.WALLPAPERS_DIR, file_name), entry.mtime_ns
+        )
+        if cache_path is None:
+            return False
+        self.thumbnail_queue.append((cache_path, file_name))
+        GLib.idle_add(self._process_batch)
+        return True
+
+    def _process_file(self, file_name) -> bool:
+        """Queue the cached thumbnail of file_name, or request it. Returns True if cached."""
+        entry = self.catalog.get(file_name)
+        if entry is None:
+            return True
+        if self._queue_cached_thumbnail(file_name):
+            return True
+        self.thumbnail_pipeline.submit(
+            os.path.join(data.WALLPAPERS_DIR, file_name), entry.mtime_ns
+        )
+        return False
+
+    def _on_thumbnail_done(self, full_path, cache_path):
+        if cache_path is not None:
+            self.thumbnail_queue.append(
+                (cache_path, os.path.relpath(full_path, data.WALLPAPERS_DIR))
+            )
+            self._process_batch()
+        return False
+
+    def _on_thumbnails_drained(self):
+        self.thumbs.save()
+        if not self._palette_pass_running:
+            self._palette_pass_running = True
+            GLib.Thread.new("wallpaper-palettes", self._index_palettes, None)
+        return False
+
+    def _index_palettes(self, _data):
+        """Compute the dominant colors of wallpapers that have none yet, from their thumbnails."""
+        computed = 0
+        for file_name in self.catalog.paths():
+            entry = self.catalog.get(file_name)
+            if entry is None or entry.palette is not None:
+                continue
+            cache_path = self.thumbs.lookup(
+                os.path.join(data.WALLPAPERS_DIR, file_name), entry.mtime_ns
+            )
+            if cache_path is None:
+                continue
+            try:
+                palette = wallpaper_palette.compute_palette(cache_path)
+            except Exception as e:
+                print(f"Error computing palette of {file_name}: {e}")
+                palette = []
+            self.catalog.set_palette(file_name, entry.mtime_ns, palette)
+            computed += 1
+        if computed:
+            self.catalog.save()
+        GLib.idle_add(self._on_palettes_indexed, computed)
+
+    def _on_palettes_indexed(self, computed):
+        self._palette_pass_running = False
+        self.emit("palettes-indexed", computed)
+        return False
+
+    def set_thumbnail_priority(self, search: dict):
+        """Render thumbnails that a search shows first, in grid order."""
+
+        def priority(path):
+            file_name = os.path.relpath(path, data.WALLPAPERS_DIR)
+            return (not self.matches(file_name, file_name.casefold(), search), file_name.casefold())
+
+        self.thumbnail_pipeline.set_priority(priority)
+
+    def _process_batch(self):
+        batch = self.thumbnail_queue[:10]
+        del self.thumbnail_queue[:10]
+        for cache_path, file_name in batch:
+            try:
+                pixbuf = GdkPixbuf.Pixbuf.new_from_file(cache_path)
+                self._add_thumbnail(pixbuf, file_name)
+            except Exception as e:
+                print(f"Error loading thumbnail {cache_path}: {e}")
+        if self.thumbnail_queue:
+            GLib.idle_add(self._process_batch)
+        return False
+
+    def _add_thumbnail(self, pixbuf, file_name: str):
+        """Insert a thumbnail at its sorted position, or update an existing row."""
+        tree_iter = self._rows.get(file_name)
+        if tree_iter is not None:
+            self.store.set_value(tree_iter, 0, pixbuf)
+            return
+        key = file_name.casefold()
+        position = bisect.bisect(self._sorted_names, (key, file_name))
+        self._sorted_names.insert(position, (key, file_name))
+        self._rows[file_name] = self.store.insert(position, [pixbuf, file_name, key])
+
+    def _remove_thumbnail(self, file_name: str):
+        tree_iter = self._rows.pop(file_name, None)
+        if tree_iter is None:
+            return
+        entry = (file_name.casefold(), file_name)
+        position = bisect.bisect_left(self._sorted_names, entry)
+        if position < len(self._sorted_names) and self._sorted_names[position] == entry:
+            del self._sorted_names[position]
+        self.store.remove(tree_iter)
+
+    # ------------------------------------------------------------------
+    # Searching
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def parse_query(query: str) -> dict:
+        """
+        Split a search into text terms and filters:
+        in:<folder> keeps wallpapers below that folder,
+        min:<width>x<height> (or min:<width>) those of at least that resolution,
+        hue:<name or degrees> those with a dominant color of that hue,
+        tone:light / tone:dark those with a bright or dark palette, and
+        sort:hue / sort:light / sort:dark reorders the grid by color.
+        """
+        search = {
+            "terms": [],
+            "folder": "",
+            "min_width": 0,
+            "min_height": 0,
+            "hue": None,
+            "tone": "",
+            "sort": "",
+        }
+        for token in query.casefold().split():
+            name, _, value = token.partition(":")
+            if name == "in" and value:
+                search["folder"] = value.strip("/")
+                continue
+            if name == "min":
+                width, _, height = value.partition("x")
+                if width.isdigit() and (not height or height.isdigit()):
+                    search["min_width"], search["min_height"] = int(width), int(height or 0)
+                    continue
+            elif name == "hue":
+                hue = wallpaper_palette.parse_hue(value)
+                if hue is not None:
+                    search["hue"] = hue
+                    continue
+            elif name == "tone" and value in ("light", "dark"):
+                search["tone"] = value
+                continue
+            elif name == "sort" and value in ("hue", "light", "dark"):
+                search["sort"] = value
+                continue
+            search["terms"].append(token)
+        return search
+
+    def matches(self, file_name: str, key: str, search: dict) -> bool:
+        if any(term not in key for term in search["terms"]):
+            return False
+        folder = search["folder"]
+        if folder:
+            entry_folder = os.path.dirname(key)
+            if entry_folder != folder and not entry_folder.startswith(f"{folder}/"):
+                return False
+        if not (search["min_width"] or search["min_height"] or search["hue"] is not None or search["tone"]):
+            return True
+        entry = self.catalog.get(file_name)
+        if entry is None:
+            return False
+        if entry.width < search["min_width"] or entry.height < search["min_height"]:
+            return False
+        if search["hue"] is not None or search["tone"]:
+            if not entry.palette:
+                return False
+            if search["hue"] is not None and not wallpaper_palette.has_hue(entry.palette, search["hue"]):
+                return False
+            if search["tone"]:
+                brightness = wallpaper_palette.brightness(entry.palette)
+                if (brightness >= 0.5) != (search["tone"] == "light"):
+                    return False
+        return True
+
+    def sort_key(self, file_name: str, sort: str):
+        entry = self.catalog.get(file_name)
+        palette = entry.palette if entry is not None else None
+        if not palette:
+            # Wallpapers without a palette yet go last
+            return (1, 0.0, file_name.casefold())
+        if sort == "hue":
+            hue = wallpaper_palette.dominant_hue(palette)
+            # Grayish wallpapers after all colorful ones
+            return (0, 360.0 if hue is None else hue, file_name.casefold())
+        brightness = wallpaper_palette.brightness(palette)
+        return (0, -brightness if sort == "light" else brightness, file_name.casefold())
+
+
+def get_wallpaper_library() -> WallpaperLibrary:
+    """Get the global WallpaperLibrary instance."""
+    return WallpaperLibrary.get_initial()
@@ -0,0 +1,49 @@
+import pytest
+
+# utils.clip_index reuses the launcher's search helpers, which import fabric
+pytest.importorskip("fabric")
+
+from utils.clip_index import ClipSearchIndex  # noqa: E402
+
+
+class Entry:
+    def __init__(self, item_id, content, is_image=False):
+        self.id = item_id
+        self.content = content
+        self.search_key = content.casefold()
+        self.is_image = is_image
+
+
+def build_index(*contents):
+    entries = [Entry(str(len(contents) - i), content) for i, content in enumerate(contents)]
+    index = ClipSearchIndex()
+    index.update(entries)
+    return index
+
+
+def contents(results):
+    return [entry.content for entry in results]
+
+
+def test_query_inside_a_word_is_found():
+    index = build_index("https://github.com/foo", "hubble telescope", "grep -r hub .")
+    results = contents(index.search("hub"))
+    assert set(results) == {"https://github.com/foo", "hubble telescope", "grep -r hub ."}
+    # Word matches rank before matches inside other words
+    assert results[-1] == "https://github.com/foo"
+
+
+def test_only_inside_a_word():
+    index = build_index("hello world", "foo bar")
+    assert contents(index.search("ell")) == ["hello world"]
+
+
+def test_kind_filter():
+    index = build_index("https://example.com", "example text")
+    assert contents(index.search("is:url example")) == ["https://example.com"]
+
+
+def test_removed_entries_are_not_found():
+    index = build_index("alpha", "beta")
+    index.update([entry for entry in index.search("") if entry.content != "alpha"])
+    assert contents(index.search("alpha")) == []
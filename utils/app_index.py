@@ -0,0 +1,242 @@
+"""
+Prebuilt search index for the application launcher.
+
+The index is built once per set of desktop applications. Typing in the
+launcher then costs a few dictionary lookups over precomputed n-gram
+postings and a scoring pass over the matching apps, instead of rebuilding
+and scanning a haystack string for every app on every keystroke.
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Set
+
+from fabric.utils import DesktopApp
+
+_SPLIT_RE = re.compile(r"[^\w]+")
+
+# Maximum n-gram length kept in the postings; longer query tokens are
+# resolved by intersecting their trigrams and verifying the substring.
+NGRAM_SIZE = 3
+
+# Relative importance of each searchable field.
+FIELD_WEIGHTS = {
+    "display_name": 1.0,
+    "name": 0.9,
+    "executable": 0.7,
+    "command": 0.7,
+    "generic_name": 0.6,
+    "keywords": 0.5,
+}
+
+
+def normalize(text: Optional[str]) -> str:
+    return (text or "").casefold().strip()
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _SPLIT_RE.split(text) if token]
+
+
+def extract_command_name(command_line: Optional[str]) -> str:
+    """Extract base command name from command line, removing paths and arguments"""
+    if not command_line:
+        return ""
+    # Wrapped commands like "/bin/sh -c "\$SHELL -i -c scrcpy"" carry no useful name
+    if command_line.startswith("/bin/sh -c"):
+        return ""
+    parts = command_line.split()
+    return parts[0].split("/")[-1] if parts else ""
+
+
+def _app_keywords(app: DesktopApp) -> List[str]:
+    # DesktopApp does not expose keywords, but its Gio.DesktopAppInfo does
+    app_info = getattr(app, "_app", None)
+    if app_info is not None and hasattr(app_info, "get_keywords"):
+        try:
+            return list(app_info.get_keywords() or [])
+        except Exception:
+            return []
+    return []
+
+
+def app_key(app: DesktopApp) -> str:
+    """Stable identifier for an app (its desktop file id when available)."""
+    app_info = getattr(app, "_app", None)
+    if app_info is not None and hasattr(app_info, "get_id"):
+        app_id = app_info.get_id()
+        if app_id:
+            return app_id
+    return app.name or app.display_name or ""
+
+
+def fuzzy_score(query: str, text: str) -> float:
+    """
+    Score a subsequence match of query in text between 0 and 1.
+
+    Consecutive characters and matches at word starts score higher.
+    Returns 0 when query is not a subsequence of text.
+    """
+    if not query or not text:
+        return 0.0
+    score = 0.0
+    pos = 0
+    prev = -2
+    for char in query:
+        found = text.find(char, pos)
+        if found == -1:
+            return 0.0
+        bonus = 1.0
+        if found == prev + 1:
+            bonus += 1.0
+        if found == 0 or not text[found - 1].isalnum():
+            bonus += 0.5
+        score += bonus
+        prev = found
+        pos = found + 1
+    return score / (2.5 * len(query))
+
+
+class _IndexedApp:
+    __slots__ = ("app", "key", "fields", "tokens", "haystack", "sort_key")
+
+    def __init__(self, app: DesktopApp):
+        self.app = app
+        self.key = app_key(app)
+        self.fields: Dict[str, str] = {
+            "display_name": normalize(app.display_name),
+            "name": normalize(app.name),
+            "generic_name": normalize(app.generic_name),
+            "executable": normalize((app.executable or "").split("/")[-1]),
+            "command": normalize(extract_command_name(app.command_line)),
+            "keywords": normalize(" ".join(_app_keywords(app))),
+        }
+        self.tokens: Dict[str, List[str]] = {
+            field: tokenize(value) for field, value in self.fields.items()
+        }
+        self.haystack = " ".join(value for value in self.fields.values() if value)
+        self.sort_key = self.fields["display_name"]
+
+
+class AppSearchIndex:
+    """N-gram index over launcher-relevant fields of desktop applications."""
+
+    def __init__(self, apps: Optional[List[DesktopApp]] = None):
+        self._entries: List[_IndexedApp] = []
+        self._ngrams: Dict[str, Set[int]] = {}
+        self._signature: tuple = ()
+        if apps is not None:
+            self.update(apps)
+
+    def update(self, apps: List[DesktopApp]) -> bool:
+        """Rebuild the index if the set of apps changed. Returns True if rebuilt."""
+        signature = tuple(sorted(app_key(app) for app in apps))
+        if signature == self._signature and len(apps) == len(self._entries):
+            # Same desktop files, keep the index but point at the fresh objects
+            by_key = {app_key(app): app for app in apps}
+            for entry in self._entries:
+                entry.app = by_key.get(entry.key, entry.app)
+            return False
+
+        self._signature = signature
+        self._entries = sorted(
+            (_IndexedApp(app) for app in apps), key=lambda entry: entry.sort_key
+        )
+        self._ngrams = {}
+        for idx, entry in enumerate(self._entries):
+            haystack = entry.haystack
+            for n in range(1, NGRAM_SIZE + 1):
+                for i in range(len(haystack) - n + 1):
+                    self._ngrams.setdefault(haystack[i:i + n], set()).add(idx)
+        return True
+
+    def all_apps(self) -> List[DesktopApp]:
+        """All apps in alphabetical order of display name."""
+        return [entry.app for entry in self._entries]
+
+    def _substring_candidates(self, token: str) -> Set[int]:
+        if len(token) <= NGRAM_SIZE:
+            return set(self._ngrams.get(token, ()))
+        postings = []
+        for i in range(len(token) - NGRAM_SIZE + 1):
+            posting = self._ngrams.get(token[i:i + NGRAM_SIZE])
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {idx for idx in candidates if token in self._entries[idx].haystack}
+
+    @staticmethod
+    def _token_score(token: str, entry: _IndexedApp) -> float:
+        best = 0.0
+        for field, weight in FIELD_WEIGHTS.items():
+            value = entry.fields[field]
+            if not value:
+                continue
+            if value == token:
+                score = 100.0
+            elif value.startswith(token):
+                score = 80.0
+            elif any(word.startswith(token) for word in entry.tokens[field]):
+                score = 60.0
+            elif token in value:
+                score = 40.0
+            else:
+                score = 20.0 * fuzzy_score(token, value)
+            best = max(best, score * weight)
+        return best
+
+    def search(
+        self,
+        query: str,
+        boost: Optional[Callable[[DesktopApp], float]] = None,
+    ) -> List[DesktopApp]:
+        """
+        Return apps matching every token of query, best match first.
+
+        Tokens are matched as substrings of the indexed fields. If nothing
+        matches, a fuzzy subsequence pass over all apps is used instead.
+        boost, if given, adds a per-app score (e.g. launch frecency).
+        """
+        query = normalize(query)
+        if not query:
+            if boost is None:
+                return self.all_apps()
+            # Most used apps first, the rest alphabetically
+            return [
+                entry.app
+                for _, entry in sorted(
+                    enumerate(self._entries),
+                    key=lambda item: (-boost(item[1].app), item[0]),
+                )
+            ]
+        tokens = tokenize(query) or [query]
+
+        candidates: Optional[Set[int]] = None
+        for token in tokens:
+            matches = self._substring_candidates(token)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                break
+
+        if candidates:
+            pool = candidates
+        else:
+            # Typo or out-of-order characters: fall back to fuzzy matching
+            pool = {
+                idx
+                for idx, entry in enumerate(self._entries)
+                if all(fuzzy_score(token, entry.haystack) > 0 for token in tokens)
+            }
+
+        scored = []
+        for idx in pool:
+            entry = self._entries[idx]
+            score = sum(self._token_score(token, entry) for token in tokens)
+            if entry.fields["display_name"].startswith(query):
+                score += 50.0
+            if boost is not None:
+                score += boost(entry.app)
+            scored.append((-score, entry.sort_key, entry.app))
+        scored.sort(key=lambda item: (item[0], item[1]))
+        return [app for _, _, app in scored]
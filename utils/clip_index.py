@@ -0,0 +1,196 @@
+"""
+Search index for the clipboard history.
+
+Entries are indexed once when they arrive: their words go into an inverted
+index whose vocabulary is kept sorted, so a query word is resolved by a
+binary search for the words it prefixes. Entries containing the words only
+inside other words are still found by a substring pass, ranked after the
+word matches, and queries matching nothing fall back to fuzzy matching.
+Results are ranked by match quality with a bonus for recent entries.
+
+Query words such as "is:image", "is:url", "is:code" or "is:text" restrict
+the results to one kind of entry.
+"""
+
+import bisect
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+from utils.app_index import fuzzy_score, normalize, tokenize
+
+KINDS = ("image", "url", "code", "text")
+KIND_ALIASES = {
+    "image": "image", "images": "image", "img": "image",
+    "url": "url", "urls": "url", "link": "url", "links": "url",
+    "code": "code",
+    "text": "text",
+}
+KIND_PREFIX = "is:"
+
+# Score added to the most recent entry, decreasing linearly to 0 for the oldest
+RECENCY_WEIGHT = 30.0
+# Fuzzy matching only looks at the start of long entries
+FUZZY_MAX_CHARS = 200
+
+_URL_RE = re.compile(r"^(?:https?|ftp|file)://\S+$|^www\.\S+\.\S+$")
+_CODE_RE = re.compile(
+    r"(?:^|\s)(?:def|class|import|from|return|function|const|let|var|fn|pub|#include|if|for|while)\s"
+    r"|[{};]\s*$|=>|->|::|==|!=|\(\)|\$\(|&&|\|\|"
+)
+_CODE_SYMBOLS = set("{}()[];=<>$&|")
+
+
+def classify(content: str, is_image: bool) -> str:
+    """Kind of a clipboard entry: image, url, code or text"""
+    if is_image:
+        return "image"
+    stripped = content.strip()
+    if _URL_RE.match(stripped):
+        return "url"
+    symbols = sum(1 for char in stripped if char in _CODE_SYMBOLS)
+    if _CODE_RE.search(stripped) and symbols >= 2 or symbols >= max(4, len(stripped) // 12):
+        return "code"
+    return "text"
+
+
+class _IndexedClip:
+    __slots__ = ("entry", "kind", "tokens")
+
+    def __init__(self, entry):
+        self.entry = entry
+        self.kind = classify(entry.content, entry.is_image)
+        self.tokens = set(tokenize(entry.search_key))
+
+
+class ClipSearchIndex:
+    """
+    Incremental index over clipboard entries (objects with id, content,
+    search_key and is_image, newest first as listed by cliphist).
+    """
+
+    def __init__(self):
+        self._clips: Dict[str, _IndexedClip] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._vocabulary: List[str] = []  # sorted keys of _postings
+        self._order: List[str] = []  # ids, newest first
+        self._rank: Dict[str, int] = {}
+
+    def update(self, entries: Iterable) -> None:
+        """Index new entries and drop the ones no longer listed."""
+        entries = list(entries)
+        listed = {entry.id: entry for entry in entries}
+        for item_id in [item_id for item_id in self._clips if item_id not in listed]:
+            self._remove(item_id)
+        for item_id, entry in listed.items():
+            clip = self._clips.get(item_id)
+            if clip is None or clip.entry is not entry:
+                if clip is not None:
+                    self._remove(item_id)
+                self._add(entry)
+        self._order = [entry.id for entry in entries]
+        self._rank = {item_id: rank for rank, item_id in enumerate(self._order)}
+
+    def _add(self, entry):
+        clip = _IndexedClip(entry)
+        self._clips[entry.id] = clip
+        for token in clip.tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = set()
+                bisect.insort(self._vocabulary, token)
+            posting.add(entry.id)
+
+    def _remove(self, item_id: str):
+        clip = self._clips.pop(item_id)
+        for token in clip.tokens:
+            posting = self._postings[token]
+            posting.discard(item_id)
+            if not posting:
+                del self._postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+
+    def _prefix_candidates(self, token: str) -> Set[str]:
+        start = bisect.bisect_left(self._vocabulary, token)
+        candidates: Set[str] = set()
+        for word in self._vocabulary[start:]:
+            if not word.startswith(token):
+                break
+            candidates |= self._postings[word]
+        return candidates
+
+    @staticmethod
+    def parse_query(query: str):
+        """Split query into search tokens and the kinds it is restricted to."""
+        tokens = []
+        kinds = set()
+        for word in normalize(query).split():
+            if word.startswith(KIND_PREFIX) and word[len(KIND_PREFIX):] in KIND_ALIASES:
+                kinds.add(KIND_ALIASES[word[len(KIND_PREFIX):]])
+            else:
+                tokens.extend(tokenize(word) or [word])
+        return tokens, kinds
+
+    @staticmethod
+    def _token_score(token: str, clip: _IndexedClip) -> float:
+        if token in clip.tokens:
+            return 100.0
+        if any(word.startswith(token) for word in clip.tokens):
+            return 60.0
+        if token in clip.entry.search_key:
+            return 40.0
+        return 20.0 * fuzzy_score(token, clip.entry.search_key[:FUZZY_MAX_CHARS])
+
+    def search(self, query: str) -> List:
+        """
+        Return entries matching every word of query, best match first.
+
+        Entries where every word prefixes an indexed word come first, then
+        entries that only contain the words inside other words (e.g. "hub"
+        in "github"). If neither matches, words are matched as fuzzy
+        subsequences.
+        """
+        tokens, kinds = self.parse_query(query)
+        if kinds:
+            pool = [item_id for item_id in self._order if self._clips[item_id].kind in kinds]
+        else:
+            pool = self._order
+        if not tokens:
+            return [self._clips[item_id].entry for item_id in pool]
+
+        prefix_hits: Optional[Set[str]] = None
+        for token in tokens:
+            matches = self._prefix_candidates(token)
+            prefix_hits = matches if prefix_hits is None else prefix_hits & matches
+            if not prefix_hits:
+                break
+        prefix_hits = prefix_hits or set()
+        if kinds and prefix_hits:
+            prefix_hits = {item_id for item_id in prefix_hits if self._clips[item_id].kind in kinds}
+
+        substring_hits = {
+            item_id for item_id in pool
+            if item_id not in prefix_hits
+            and all(token in self._clips[item_id].entry.search_key for token in tokens)
+        }
+        if not prefix_hits and not substring_hits:
+            # Typo or out-of-order characters: fall back to fuzzy matching
+            substring_hits = {
+                item_id for item_id in pool
+                if all(
+                    fuzzy_score(token, self._clips[item_id].entry.search_key[:FUZZY_MAX_CHARS]) > 0
+                    for token in tokens
+                )
+            }
+        return self._ranked(prefix_hits, tokens) + self._ranked(substring_hits, tokens)
+
+    def _ranked(self, item_ids: Set[str], tokens: List[str]) -> List:
+        count = max(1, len(self._order))
+        scored = []
+        for item_id in item_ids:
+            clip = self._clips[item_id]
+            rank = self._rank[item_id]
+            score = sum(self._token_score(token, clip) for token in tokens)
+            score += RECENCY_WEIGHT * (1 - rank / count)
+            scored.append((-score, rank, clip.entry))
+        scored.sort(key=lambda item: (item[0], item[1]))
+        return [entry for _, _, entry in scored]
@@ -0,0 +1,286 @@
+"""
+Clipboard history image previews.
+
+Previews are decoded from `cliphist decode` by a small, fixed pool of
+worker threads. Requests wait in a queue served most recent first, so the
+rows the user is looking at now come before rows bound earlier, and
+requests for rows that scrolled away or were filtered out can be dropped
+with retain(). The cache and loader are shared by the clipboard panels of
+every monitor (get_clip_preview_cache() and get_clip_preview_loader()).
+Finished previews are kept as PREVIEW_SIZE px PNGs in PREVIEWS_DIR, keyed
+by cliphist id, and the least recently used ones are evicted once there
+are more than MAX_PREVIEW_FILES.
+"""
+
+import hashlib
+import heapq
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from gi.repository import GdkPixbuf, GLib
+from loguru import logger
+
+import config.data as data
+
+PREVIEWS_DIR = f"{data.CACHE_DIR}/clipboard-previews"
+PREVIEW_SIZE = 72
+MAX_PREVIEW_FILES = 300
+MAX_PREVIEW_WORKERS = 2
+# Bytes read from cliphist at a time; a dropped request stops between chunks
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def preview_key(item_id: str, content: str) -> str:
+    """
+    Cache key for a cliphist entry. cliphist numbers entries again from 1
+    after a wipe, so the id is combined with the entry's description
+    (e.g. "[[ binary data 1 MiB png 1920x1080 ]]").
+    """
+    digest = hashlib.sha1(content.encode("utf-8", errors="replace")).hexdigest()[:12]
+    return f"{item_id}-{digest}"
+
+
+class ClipPreviewCache:
+    """Preview PNGs on disk, evicted least recently used first."""
+
+    def __init__(self, directory: str = PREVIEWS_DIR, max_files: int = MAX_PREVIEW_FILES):
+        self.directory = directory
+        self.max_files = max_files
+        os.makedirs(directory, exist_ok=True)
+        # Previews are written by worker threads
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, None]" = OrderedDict(
+            (name[: -len(".png")], None) for name in self._names_by_mtime()
+        )
+
+    def _names_by_mtime(self) -> List[str]:
+        try:
+            with os.scandir(self.directory) as entries:
+                files = [
+                    (entry.stat().st_mtime_ns, entry.name)
+                    for entry in entries
+                    if entry.name.endswith(".png")
+                ]
+        except OSError as e:
+            logger.warning(f"[ClipPreviews] Could not scan {self.directory}: {e}")
+            return []
+        return [name for _, name in sorted(files)]
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.png")
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Path of the cached preview for key, or None."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        path = self.path(key)
+        try:
+            # The mtime orders the entries again on the next start
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        return path
+
+    def store(self, key: str, pixbuf: GdkPixbuf.Pixbuf):
+        path = self.path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            pixbuf.savev(tmp_path, "png", [], [])
+            os.replace(tmp_path, path)
+        except (GLib.Error, OSError) as e:
+            logger.warning(f"[ClipPreviews] Could not save preview {key}: {e}")
+            return
+        with self._lock:
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_files:
+                evicted.append(self._entries.popitem(last=False)[0])
+        for old_key in evicted:
+            self._unlink(self.path(old_key))
+
+    def discard_item(self, item_id: str):
+        """Forget every preview of a cliphist id."""
+        prefix = f"{item_id}-"
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+        for key in keys:
+            self._unlink(self.path(key))
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+        for key in keys:
+            self._unlink(self.path(key))
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"[ClipPreviews] Could not delete {path}: {e}")
+
+
+class ClipPreviewLoader:
+    """
+    Loads previews on at most MAX_PREVIEW_WORKERS threads.
+
+    Every callback added with add_listener() is called on the GLib main
+    loop as listener(item_id, key, pixbuf) for each request that was not
+    dropped, with pixbuf None on failure. Requests are made on behalf of an
+    owner (a panel); a request is dropped once no owner retains it.
+    """
+
+    def __init__(self, cache: ClipPreviewCache, workers: int = MAX_PREVIEW_WORKERS):
+        self.cache = cache
+        self.max_workers = workers
+        self._listeners: List[Callable[[str, str, Optional[GdkPixbuf.Pixbuf]], None]] = []
+        self._heap: List[Tuple[int, str]] = []
+        self._jobs: Dict[str, str] = {}  # key -> cliphist id, queued or running
+        self._owners: Dict[str, set] = {}  # key -> owners that want it
+        self._seq = 0
+        self._active_workers = 0
+        self._cond = threading.Condition()
+
+    def add_listener(self, callback: Callable[[str, str, Optional[GdkPixbuf.Pixbuf]], None]):
+        self._listeners.append(callback)
+
+    def request(self, item_id: str, key: str, owner):
+        """Queue a preview ahead of everything requested before it."""
+        with self._cond:
+            self._jobs[key] = item_id
+            self._owners.setdefault(key, set()).add(owner)
+            self._seq += 1
+            heapq.heappush(self._heap, (-self._seq, key))
+            if self._active_workers < self.max_workers:
+                self._active_workers += 1
+                threading.Thread(target=self._worker, daemon=True).start()
+
+    def retain(self, keys: Iterable[str], owner):
+        """Drop owner's requests whose key is not in keys, unless another owner still wants them."""
+        keys = set(keys)
+        with self._cond:
+            for key, owners in list(self._owners.items()):
+                if key in keys or owner not in owners:
+                    continue
+                owners.discard(owner)
+                if not owners:
+                    del self._owners[key]
+                    self._jobs.pop(key, None)
+            self._heap = [(seq, key) for seq, key in self._heap if key in self._jobs]
+            heapq.heapify(self._heap)
+
+    def is_wanted(self, key: str) -> bool:
+        with self._cond:
+            return key in self._jobs
+
+    def _next_job(self) -> Optional[Tuple[str, str]]:
+        with self._cond:
+            while self._heap:
+                _, key = heapq.heappop(self._heap)
+                if key in self._jobs:
+                    return self._jobs[key], key
+            # Nothing left: this worker exits
+            self._active_workers -= 1
+        return None
+
+    def _finish(self, key: str) -> bool:
+        """Mark key done. Returns False if it was dropped meanwhile."""
+        with self._cond:
+            self._owners.pop(key, None)
+            return self._jobs.pop(key, None) is not None
+
+    def _worker(self):
+        while (job := self._next_job()) is not None:
+            item_id, key = job
+            try:
+                pixbuf = self._load(item_id, key)
+            except Exception as e:
+                logger.warning(f"[ClipPreviews] Could not load preview for {item_id}: {e}")
+                pixbuf = None
+            if self._finish(key):
+                GLib.idle_add(self._notify, item_id, key, pixbuf)
+
+    def _notify(self, item_id: str, key: str, pixbuf: Optional[GdkPixbuf.Pixbuf]):
+        for listener in self._listeners:
+            listener(item_id, key, pixbuf)
+        return False
+
+    def _load(self, item_id: str, key: str) -> Optional[GdkPixbuf.Pixbuf]:
+        cached_path = self.cache.lookup(key)
+        if cached_path is not None:
+            try:
+                return GdkPixbuf.Pixbuf.new_from_file(cached_path)
+            except GLib.Error:
+                pass
+
+        loader = GdkPixbuf.PixbufLoader()
+        # Scale while decoding so the full-size image is never held in memory
+        loader.connect("size-prepared", self._on_size_prepared)
+        process = subprocess.Popen(
+            ["cliphist", "decode", item_id],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            while chunk := process.stdout.read(READ_CHUNK_SIZE):
+                if not self.is_wanted(key):
+                    process.kill()
+                    return None
+                loader.write(chunk)
+        finally:
+            process.stdout.close()
+            process.wait()
+            try:
+                loader.close()
+            except GLib.Error:
+                # Incomplete data, e.g. after the request was dropped
+                pass
+        if process.returncode != 0:
+            raise RuntimeError(f"cliphist decode exited with {process.returncode}")
+
+        pixbuf = loader.get_pixbuf()
+        if pixbuf is None:
+            return None
+        self.cache.store(key, pixbuf)
+        return pixbuf
+
+    @staticmethod
+    def _on_size_prepared(loader, width, height):
+        if width <= 0 or height <= 0:
+            return
+        scale = PREVIEW_SIZE / max(width, height)
+        if scale < 1:
+            loader.set_size(max(1, int(width * scale)), max(1, int(height * scale)))
+
+
+_preview_cache: Optional[ClipPreviewCache] = None
+_preview_loader: Optional[ClipPreviewLoader] = None
+
+
+def get_clip_preview_cache() -> ClipPreviewCache:
+    """Get the global ClipPreviewCache instance shared by all clipboard panels."""
+    global _preview_cache
+    if _preview_cache is None:
+        _preview_cache = ClipPreviewCache()
+    return _preview_cache
+
+
+def get_clip_preview_loader() -> ClipPreviewLoader:
+    """Get the global ClipPreviewLoader instance shared by all clipboard panels."""
+    global _preview_loader
+    if _preview_loader is None:
+        _preview_loader = ClipPreviewLoader(get_clip_preview_cache())
+    return _preview_loader
@@ -1,4 +1,7 @@
-import requests
+from utils.lazy_import import lazy_import
+
+# Only needed for currency rates
+requests = lazy_import("requests")
 
 
 class Units():
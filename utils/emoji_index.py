@@ -0,0 +1,295 @@
+"""
+Compact, memory-mapped emoji index.
+
+assets/emoji.json is compiled once into a binary file in CACHE_DIR, and
+compiled again whenever the JSON changes. The pickers of every monitor
+read the same mapping, so the emoji data is neither parsed nor held as
+Python objects per picker. All integers are little endian. The file has
+these sections:
+
+    header    magic, version, source mtime and size, counts and offsets
+    strings   UTF-8 emoji, names, group names and tokens, back to back
+    emojis    per emoji, in file order: emoji and name (offset, length),
+              and group number
+    groups    per group: name (offset, length), first emoji, count
+    tokens    per distinct word of the names and groups, sorted by
+              bytes: word (offset, length), first posting, posting count
+    postings  emoji numbers (u16) of each token, ascending
+
+A query word matches the tokens it prefixes, found by binary search over
+the token table; emojis containing the query elsewhere in their name or
+group follow those matches. Run this module to build the index ahead of
+time.
+"""
+
+import bisect
+import mmap
+import os
+import re
+import struct
+import threading
+from typing import List, Optional, Set, Tuple
+
+from loguru import logger
+
+from utils.lazy_import import lazy_import
+
+# Only needed when the index is (re)built
+ijson = lazy_import("ijson")
+
+MAGIC = b"AXEMOJI\0"
+VERSION = 1
+INDEX_NAME = "emoji-index.bin"
+
+# magic, version, source mtime_ns, source size,
+# emoji/group/token/posting counts, section offsets
+_HEADER = struct.Struct("<8sIQQIIIIIIIII")
+_EMOJI = struct.Struct("<IHIHH")  # char offset/length, name offset/length, group
+_GROUP = struct.Struct("<IHII")  # name offset/length, first emoji, count
+_TOKEN = struct.Struct("<IHII")  # token offset/length, first posting, count
+_POSTING = struct.Struct("<H")
+
+_SPLIT_RE = re.compile(r"[^\w]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _SPLIT_RE.split(text.casefold()) if token]
+
+
+def default_source_path() -> str:
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "emoji.json")
+
+
+def default_index_path() -> str:
+    from config.data import CACHE_DIR
+
+    return os.path.join(CACHE_DIR, INDEX_NAME)
+
+
+def build_index(source_path: str, index_path: str):
+    """Compile the emoji JSON at source_path into an index file at index_path."""
+    stat = os.stat(source_path)
+    emojis: List[Tuple[str, str, str]] = []
+    with open(source_path, "rb") as f:
+        for emoji_char, emoji_info in ijson.kvitems(f, ""):
+            emojis.append((emoji_char, emoji_info.get("name", ""), emoji_info.get("group", "")))
+    if len(emojis) > 0xFFFF:
+        raise ValueError(f"Too many emojis for the index format: {len(emojis)}")
+
+    strings = bytearray()
+    string_offsets = {}
+
+    def add_string(text: str) -> Tuple[int, int]:
+        encoded = text.encode("utf-8")
+        if encoded not in string_offsets:
+            string_offsets[encoded] = len(strings)
+            strings.extend(encoded)
+        return string_offsets[encoded], len(encoded)
+
+    groups: List[str] = []
+    group_ranges: List[List[int]] = []
+    postings = {}
+    emoji_table = bytearray()
+    for number, (emoji_char, name, group) in enumerate(emojis):
+        if not groups or groups[-1] != group:
+            groups.append(group)
+            group_ranges.append([number, 0])
+        group_ranges[-1][1] += 1
+        emoji_table += _EMOJI.pack(*add_string(emoji_char), *add_string(name), len(groups) - 1)
+        for token in set(tokenize(f"{name} {group}")):
+            postings.setdefault(token.encode("utf-8"), []).append(number)
+
+    group_table = bytearray()
+    for group, (first, count) in zip(groups, group_ranges):
+        group_table += _GROUP.pack(*add_string(group), first, count)
+
+    token_table = bytearray()
+    posting_table = bytearray()
+    posting_count = 0
+    for token in sorted(postings):
+        numbers = postings[token]
+        token_table += _TOKEN.pack(*add_string(token.decode("utf-8")), posting_count, len(numbers))
+        for number in numbers:
+            posting_table += _POSTING.pack(number)
+        posting_count += len(numbers)
+
+    strings_offset = _HEADER.size
+    emojis_offset = strings_offset + len(strings)
+    groups_offset = emojis_offset + len(emoji_table)
+    tokens_offset = groups_offset + len(group_table)
+    postings_offset = tokens_offset + len(token_table)
+    header = _HEADER.pack(
+        MAGIC, VERSION, stat.st_mtime_ns, stat.st_size,
+        len(emojis), len(groups), len(postings), posting_count,
+        strings_offset, emojis_offset, groups_offset, tokens_offset, postings_offset,
+    )
+
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        for section in (header, strings, emoji_table, group_table, token_table, posting_table):
+            f.write(section)
+    os.replace(tmp_path, index_path)
+    logger.info(f"[Emoji] Built index of {len(emojis)} emojis at {index_path}")
+
+
+class EmojiIndex:
+    """Read-only view of an index file. Emojis are referred to by number."""
+
+    def __init__(self, index_path: str):
+        with open(index_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (
+                magic, version, self.source_mtime_ns, self.source_size,
+                self.count, self.group_count, self._token_count, _,
+                self._strings, self._emojis, self._groups, self._tokens, self._postings,
+            ) = _HEADER.unpack_from(self._map, 0)
+        except struct.error:
+            self._map.close()
+            raise ValueError(f"Truncated emoji index {index_path}")
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"Unsupported emoji index {index_path}")
+
+    def close(self):
+        self._map.close()
+
+    def is_current(self, source_path: str) -> bool:
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            # Without the source, the index is all there is
+            return True
+        return stat.st_mtime_ns == self.source_mtime_ns and stat.st_size == self.source_size
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def char(self, number: int) -> str:
+        char_offset, char_length, _, _, _ = _EMOJI.unpack_from(self._map, self._emojis + number * _EMOJI.size)
+        return self._string(char_offset, char_length)
+
+    def name(self, number: int) -> str:
+        _, _, name_offset, name_length, _ = _EMOJI.unpack_from(self._map, self._emojis + number * _EMOJI.size)
+        return self._string(name_offset, name_length)
+
+    def group_of(self, number: int) -> int:
+        return _EMOJI.unpack_from(self._map, self._emojis + number * _EMOJI.size)[4]
+
+    def group(self, group_number: int) -> Tuple[str, int, int]:
+        """Name, first emoji and emoji count of a group."""
+        name_offset, name_length, first, count = _GROUP.unpack_from(
+            self._map, self._groups + group_number * _GROUP.size
+        )
+        return self._string(name_offset, name_length), first, count
+
+    def _token(self, position: int) -> bytes:
+        token_offset, token_length, _, _ = _TOKEN.unpack_from(self._map, self._tokens + position * _TOKEN.size)
+        start = self._strings + token_offset
+        return self._map[start:start + token_length]
+
+    def _posting(self, position: int) -> List[int]:
+        _, _, first, count = _TOKEN.unpack_from(self._map, self._tokens + position * _TOKEN.size)
+        start = self._postings + first * _POSTING.size
+        return [number for (number,) in _POSTING.iter_unpack(self._map[start:start + count * _POSTING.size])]
+
+    def _prefix_matches(self, token: str) -> Tuple[Set[int], Set[int]]:
+        """Emojis with a word that prefixes token, and those with a word equal to it."""
+        encoded = token.encode("utf-8")
+        tokens = _TokenView(self)
+        position = bisect.bisect_left(tokens, encoded)
+        matches: Set[int] = set()
+        exact: Set[int] = set()
+        while position < self._token_count:
+            word = self._token(position)
+            if not word.startswith(encoded):
+                break
+            numbers = self._posting(position)
+            matches.update(numbers)
+            if word == encoded:
+                exact.update(numbers)
+            position += 1
+        return matches, exact
+
+    def search(self, query: str) -> List[int]:
+        """
+        Emojis whose name or group has a word starting with every word of
+        query, where more words match exactly first, then file order. They
+        are followed by the other emojis whose name and group contain query
+        as a substring, in file order.
+        """
+        query = query.casefold().strip()
+        if not query:
+            return list(range(self.count))
+
+        candidates: Optional[Set[int]] = None
+        exact_counts = {}
+        for token in tokenize(query):
+            matches, exact = self._prefix_matches(token)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                break
+            for number in exact:
+                exact_counts[number] = exact_counts.get(number, 0) + 1
+        candidates = candidates or set()
+        prefix_hits = sorted(candidates, key=lambda number: (-exact_counts.get(number, 0), number))
+
+        group_names = [self.group(group)[0] for group in range(self.group_count)]
+        return prefix_hits + [
+            number for number in range(self.count)
+            if number not in candidates
+            and query in f"{self.name(number)} {group_names[self.group_of(number)]}".casefold()
+        ]
+
+
+class _TokenView:
+    """Sequence over the token table for bisect."""
+
+    def __init__(self, index: EmojiIndex):
+        self._index = index
+
+    def __len__(self) -> int:
+        return self._index._token_count
+
+    def __getitem__(self, position: int) -> bytes:
+        return self._index._token(position)
+
+
+_index: Optional[EmojiIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_emoji_index() -> Optional[EmojiIndex]:
+    """The shared emoji index, built first if missing or out of date. None if unavailable."""
+    global _index
+    with _index_lock:
+        if _index is not None:
+            return _index
+        source_path = default_source_path()
+        index_path = default_index_path()
+        try:
+            index = EmojiIndex(index_path)
+            if not index.is_current(source_path):
+                # Unmap the stale file before it is rebuilt
+                index.close()
+                index = None
+        except (OSError, ValueError):
+            index = None
+        if index is None:
+            if not os.path.exists(source_path):
+                logger.error(f"[Emoji] Emoji JSON file not found at: {source_path}")
+                return None
+            try:
+                build_index(source_path, index_path)
+                index = EmojiIndex(index_path)
+            except Exception as e:
+                logger.error(f"[Emoji] Could not build emoji index: {e}")
+                return None
+        _index = index
+        return _index
+
+
+if __name__ == "__main__":
+    build_index(default_source_path(), default_index_path())
@@ -0,0 +1,126 @@
+"""
+Launch frecency (frequency + recency) store for the app launcher.
+
+Each launch adds 1 to an exponentially decaying score per desktop file
+id. Launches are appended as single lines to a log in CACHE_DIR, so
+recording is O(1); the log is rewritten as a compact snapshot once it
+grows past COMPACT_THRESHOLD lines. The file is only read the first time
+a score is needed.
+"""
+
+import math
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+import config.data as data
+
+FRECENCY_FILE = os.path.join(data.CACHE_DIR, "launcher_frecency.log")
+
+# Score halves after this many seconds without launches (one week).
+HALF_LIFE = 7 * 24 * 3600
+_DECAY = math.log(2) / HALF_LIFE
+
+# Rewrite the log as a snapshot after this many appended launches.
+COMPACT_THRESHOLD = 500
+
+# Entries whose decayed score falls below this are dropped on compaction.
+MIN_SCORE = 0.01
+
+
+class FrecencyStore:
+    def __init__(self, path: str = FRECENCY_FILE):
+        self.path = path
+        # app id -> (score at last update, timestamp of last update)
+        self._scores: Optional[Dict[str, Tuple[float, float]]] = None
+        self._log_lines = 0
+
+    def _ensure_loaded(self):
+        if self._scores is not None:
+            return
+        self._scores = {}
+        self._log_lines = 0
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    self._log_lines += 1
+                    # Snapshot entry: S <id> <score> <timestamp>
+                    if parts[0] == "S" and len(parts) == 4:
+                        self._scores[parts[1]] = (float(parts[2]), float(parts[3]))
+                    # Launch entry: L <id> <timestamp>
+                    elif parts[0] == "L" and len(parts) == 3:
+                        self._apply_launch(parts[1], float(parts[2]))
+        except (OSError, ValueError) as e:
+            logger.warning(f"[Frecency] Could not read {self.path}: {e}")
+
+    def _apply_launch(self, app_id: str, timestamp: float):
+        score, last = self._scores.get(app_id, (0.0, timestamp))
+        score = score * math.exp(-_DECAY * max(0.0, timestamp - last)) + 1.0
+        self._scores[app_id] = (score, timestamp)
+
+    def record(self, app_id: str):
+        """Record a launch of app_id."""
+        if not app_id:
+            return
+        self._ensure_loaded()
+        now = time.time()
+        self._apply_launch(app_id, now)
+        try:
+            with open(self.path, "a") as f:
+                f.write(f"L\t{app_id}\t{now:.0f}\n")
+            self._log_lines += 1
+        except OSError as e:
+            logger.warning(f"[Frecency] Could not write {self.path}: {e}")
+            return
+        if self._log_lines > COMPACT_THRESHOLD:
+            self.compact()
+
+    def score(self, app_id: str, now: Optional[float] = None) -> float:
+        """Current decayed score of app_id (0 if never launched)."""
+        self._ensure_loaded()
+        entry = self._scores.get(app_id)
+        if entry is None:
+            return 0.0
+        score, last = entry
+        now = time.time() if now is None else now
+        return score * math.exp(-_DECAY * max(0.0, now - last))
+
+    def has_entries(self) -> bool:
+        self._ensure_loaded()
+        return bool(self._scores)
+
+    def compact(self):
+        """Rewrite the log as one snapshot line per app, dropping stale apps."""
+        self._ensure_loaded()
+        now = time.time()
+        snapshot = {}
+        for app_id in self._scores:
+            score = self.score(app_id, now)
+            if score >= MIN_SCORE:
+                snapshot[app_id] = (score, now)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                for app_id, (score, timestamp) in snapshot.items():
+                    f.write(f"S\t{app_id}\t{score:.6f}\t{timestamp:.0f}\n")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"[Frecency] Could not compact {self.path}: {e}")
+            return
+        self._scores = snapshot
+        self._log_lines = len(snapshot)
+
+
+_frecency_store_instance = None
+
+def get_frecency_store() -> FrecencyStore:
+    """Get the global FrecencyStore instance shared by all launchers."""
+    global _frecency_store_instance
+    if _frecency_store_instance is None:
+        _frecency_store_instance = FrecencyStore()
+    return _frecency_store_instance
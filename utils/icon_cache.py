@@ -0,0 +1,104 @@
+"""
+Process-wide cache of decoded and scaled icon pixbufs.
+
+Every widget that shows application icons (dock, launcher, overview, notch)
+goes through the same cache, so each icon is loaded from disk and scaled
+once per (name, size, scale). Memory is bounded by an LRU over the pixel
+data size, and the whole cache is dropped when the icon theme changes.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+import gi
+
+gi.require_version("Gtk", "3.0")
+from fabric.utils import DesktopApp
+from gi.repository import GdkPixbuf, Gtk
+from loguru import logger
+
+from utils.app_index import app_key
+
+# Upper bound for the pixel data kept in memory.
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+
+# Cached lookups that found no icon, so they are not retried from disk.
+_MISSING = object()
+
+
+def _pixbuf_bytes(pixbuf: Optional[GdkPixbuf.Pixbuf]) -> int:
+    if pixbuf is None:
+        return 64
+    return pixbuf.get_rowstride() * pixbuf.get_height()
+
+
+class IconCache:
+    def __init__(self, max_bytes: int = MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        Gtk.IconTheme.get_default().connect("changed", self._on_theme_changed)
+
+    def lookup(
+        self,
+        key: Hashable,
+        loader: Callable[[], Optional[GdkPixbuf.Pixbuf]],
+    ) -> Optional[GdkPixbuf.Pixbuf]:
+        """Return the pixbuf cached for key, calling loader to fill it on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return None if entry is _MISSING else entry
+
+        self.misses += 1
+        try:
+            pixbuf = loader()
+        except Exception as e:
+            logger.warning(f"[IconCache] Failed to load icon {key}: {e}")
+            pixbuf = None
+        self._store(key, pixbuf)
+        return pixbuf
+
+    def _store(self, key: Hashable, pixbuf: Optional[GdkPixbuf.Pixbuf]):
+        self._entries[key] = _MISSING if pixbuf is None else pixbuf
+        self._bytes += _pixbuf_bytes(pixbuf)
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= _pixbuf_bytes(None if evicted is _MISSING else evicted)
+
+    def theme_icon(self, icon_name: str, size: int, scale: int = 1) -> Optional[GdkPixbuf.Pixbuf]:
+        """Icon from the current theme, forced to size at the given scale."""
+        return self.lookup(
+            ("theme", icon_name, size, scale),
+            lambda: Gtk.IconTheme.get_default().load_icon_for_scale(
+                icon_name, size, scale, Gtk.IconLookupFlags.FORCE_SIZE
+            ),
+        )
+
+    def app_icon(self, app: DesktopApp, size: int, scale: int = 1) -> Optional[GdkPixbuf.Pixbuf]:
+        """Icon of a desktop application, keyed by its desktop file id."""
+        return self.lookup(
+            ("app", app_key(app), size, scale),
+            lambda: app.get_icon_pixbuf(size=size * scale),
+        )
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _on_theme_changed(self, *_):
+        logger.info("[IconCache] Icon theme changed, dropping cached icons")
+        self.clear()
+
+
+_icon_cache_instance = None
+
+def get_icon_cache() -> IconCache:
+    """Get the global IconCache instance shared by all widgets."""
+    global _icon_cache_instance
+    if _icon_cache_instance is None:
+        _icon_cache_instance = IconCache()
+    return _icon_cache_instance
@@ -1,37 +1,141 @@
+import atexit
 import json
 import os
 import re
+import threading
 
 import gi
 
 gi.require_version("Gtk", "3.0")
-from gi.repository import GLib, Gtk
+from gi.repository import Gio, GLib, Gtk
 from loguru import logger
 
 import config.data as data
+from utils.icon_cache import get_icon_cache
 
 ICON_CACHE_FILE = data.CACHE_DIR + "/icons.json"
 if not os.path.exists(data.CACHE_DIR):
     os.makedirs(data.CACHE_DIR)
 
+# Delay before resolved icon names are written back to ICON_CACHE_FILE, so
+# a burst of new windows at login results in a single write.
+FLUSH_DELAY_MS = 2000
 
-class IconResolver:
-    def __init__(self, default_applicaiton_icon: str = "application-x-executable-symbolic"):
-        if os.path.exists(ICON_CACHE_FILE):
-            with open(ICON_CACHE_FILE) as f:
+
+class _IconNameCache:
+    """App id -> icon name map shared by all resolvers, written back lazily."""
+
+    def __init__(self, path: str = ICON_CACHE_FILE):
+        self.path = path
+        self._icons = {}
+        self._flush_source = 0
+        self._write_lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
                 try:
-                    self._icon_dict = json.load(f)
+                    self._icons = json.load(f)
                 except json.JSONDecodeError:
                     logger.info("[ICONS] Cache file does not exist or is corrupted")
-                    self._icon_dict = {}
-        else:
-            self._icon_dict = {}
+        atexit.register(self.flush_now)
+
+    def get(self, app_id: str) -> str | None:
+        return self._icons.get(app_id)
+
+    def set(self, app_id: str, icon: str):
+        self._icons[app_id] = icon
+        if not self._flush_source:
+            self._flush_source = GLib.timeout_add(FLUSH_DELAY_MS, self._flush)
+
+    def _flush(self):
+        self._flush_source = 0
+        payload = json.dumps(self._icons)
+        threading.Thread(target=self._write, args=(payload,), daemon=True).start()
+        return False
+
+    def flush_now(self):
+        """Write pending changes synchronously (used at exit)."""
+        if self._flush_source:
+            GLib.source_remove(self._flush_source)
+            self._flush_source = 0
+            self._write(json.dumps(self._icons))
+
+    def _write(self, payload: str):
+        tmp_path = f"{self.path}.tmp"
+        with self._write_lock:
+            try:
+                with open(tmp_path, "w") as f:
+                    f.write(payload)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.error(f"[ICONS] Could not write {self.path}: {e}")
+
+
+class _DesktopFileIndex:
+    """
+    File names of the applications directories, listed once and relisted
+    only after a directory monitor reports a change.
+    """
+
+    def __init__(self):
+        self._dirs = [os.path.join(d, "applications") for d in GLib.get_system_data_dirs()]
+        self._files: list[tuple[str, list[str]]] | None = None
+        self._monitors = []
+        for app_dir in self._dirs:
+            if not os.path.isdir(app_dir):
+                continue
+            monitor = Gio.File.new_for_path(app_dir).monitor_directory(Gio.FileMonitorFlags.NONE, None)
+            monitor.connect("changed", self._on_changed)
+            self._monitors.append(monitor)
+
+    def _on_changed(self, *_):
+        self._files = None
+
+    def _listing(self) -> list[tuple[str, list[str]]]:
+        if self._files is None:
+            self._files = []
+            for app_dir in self._dirs:
+                try:
+                    files = os.listdir(app_dir)
+                except OSError:
+                    continue
+                self._files.append((app_dir, [(name, name.lower()) for name in files]))
+        return self._files
+
+    def find(self, app_id: str) -> str | None:
+        compact_id = "".join(app_id.lower().split())
+        words = [word.lower() for word in filter(None, re.split(r"-|\.|_|\s", app_id))]
+        for app_dir, files in self._listing():
+            matching = next((name for name, lower in files if compact_id in lower), None)
+            if matching:
+                return os.path.join(app_dir, matching)
+            for word in words:
+                matching = next((name for name, lower in files if word in lower), None)
+                if matching:
+                    return os.path.join(app_dir, matching)
+        return None
+
+
+_icon_names = None
+_desktop_files = None
+
+
+def _shared_state() -> tuple[_IconNameCache, _DesktopFileIndex]:
+    global _icon_names, _desktop_files
+    if _icon_names is None:
+        _icon_names = _IconNameCache()
+        _desktop_files = _DesktopFileIndex()
+    return _icon_names, _desktop_files
 
+
+class IconResolver:
+    def __init__(self, default_applicaiton_icon: str = "application-x-executable-symbolic"):
+        self._icon_names, self._desktop_files = _shared_state()
         self.default_applicaiton_icon = default_applicaiton_icon
 
     def get_icon_name(self, app_id: str):
-        if app_id in self._icon_dict:
-            return self._icon_dict[app_id]
+        icon = self._icon_names.get(app_id)
+        if icon is not None:
+            return icon
         new_icon = self._compositor_find_icon(app_id)
         logger.info(
             f"[ICONS] found new icon: '{new_icon}' for app id: '{app_id}', storing..."
@@ -40,30 +144,23 @@ class IconResolver:
         return new_icon
 
     def get_icon_pixbuf(self, app_id: str, size: int = 16):
-        icon_theme = Gtk.IconTheme.get_default()
+        icon_cache = get_icon_cache()
         icon_name = self.get_icon_name(app_id)
-        try:
-            # Try to load the resolved icon.
-            return icon_theme.load_icon(icon_name, size, Gtk.IconLookupFlags.FORCE_SIZE)
-        except GLib.Error as primary_error:
-            logger.warning(
-                f"Warning: Icon '{icon_name}' not found in theme. Error: {primary_error}"
+        # Try to load the resolved icon.
+        pixbuf = icon_cache.theme_icon(icon_name, size)
+        if pixbuf is not None:
+            return pixbuf
+        logger.warning(f"Warning: Icon '{icon_name}' not found in theme.")
+        # Fallback to the default application icon.
+        pixbuf = icon_cache.theme_icon(self.default_applicaiton_icon, size)
+        if pixbuf is None:
+            logger.error(
+                f"Error: Fallback icon '{self.default_applicaiton_icon}' also not found."
             )
-            try:
-                # Fallback to the default application icon.
-                return icon_theme.load_icon(
-                    self.default_applicaiton_icon, size, Gtk.IconLookupFlags.FORCE_SIZE
-                )
-            except GLib.Error as fallback_error:
-                logger.error(
-                    f"Error: Fallback icon '{self.default_applicaiton_icon}' also not found. Error: {fallback_error}"
-                )
-                return None
+        return pixbuf
 
     def _store_new_icon(self, app_id: str, icon: str):
-        self._icon_dict[app_id] = icon
-        with open(ICON_CACHE_FILE, "w") as f:
-            json.dump(self._icon_dict, f)
+        self._icon_names.set(app_id, icon)
 
     def _get_icon_from_desktop_file(self, desktop_file_path: str):
         # Retrieve the icon specified in the [Desktop Entry] section.
@@ -74,19 +171,7 @@ class IconResolver:
             return self.default_applicaiton_icon
 
     def _get_desktop_file(self, app_id: str) -> str | None:
-        data_dirs = GLib.get_system_data_dirs()
-        for data_dir in data_dirs:
-            data_dir = os.path.join(data_dir, "applications")
-            if os.path.exists(data_dir):
-                files = os.listdir(data_dir)
-                matching = [s for s in files if "".join(app_id.lower().split()) in s.lower()]
-                if matching:
-                    return os.path.join(data_dir, matching[0])
-                for word in list(filter(None, re.split(r"-|\.|_|\s", app_id))):
-                    matching = [s for s in files if word.lower() in s.lower()]
-                    if matching:
-                        return os.path.join(data_dir, matching[0])
-        return None
+        return self._desktop_files.find(app_id)
 
     def _compositor_find_icon(self, app_id: str):
         icon_theme = Gtk.IconTheme.get_default()
@@ -0,0 +1,60 @@
+"""
+Deferred imports for optional subsystems.
+
+Modules such as psutil, requests, ijson, PIL or the NM and Playerctl
+typelibs are only needed once the widget using them is shown or its
+feature is used. Binding them with lazy_import() or lazy_gi_import() at
+the top of a module keeps the usual `module.attribute` call sites, while
+the real import happens on the first attribute access.
+
+Annotations evaluated at definition time (function parameters, fabric
+Signals) count as an attribute access; quote them or use `object` where
+the module must stay unloaded.
+"""
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule:
+    def __init__(self, name: str, gi_namespace: Optional[str] = None, gi_version: Optional[str] = None):
+        self._name = name
+        self._gi_namespace = gi_namespace
+        self._gi_version = gi_version
+        self._module: Optional[ModuleType] = None
+        # Worker threads may touch a lazy module at the same time as the main loop
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    if self._gi_namespace:
+                        import gi
+
+                        gi.require_version(self._gi_namespace, self._gi_version)
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """A module that is imported on first attribute access."""
+    return LazyModule(name)
+
+
+def lazy_gi_import(namespace: str, version: str) -> LazyModule:
+    """A gi.repository typelib that is required and loaded on first attribute access."""
+    return LazyModule(f"gi.repository.{namespace}", namespace, version)
@@ -0,0 +1,255 @@
+"""
+Cache of matugen results per wallpaper and color scheme.
+
+matugen decodes the full wallpaper and renders every template on each run.
+The rendered template outputs only depend on the image content, the scheme
+and the template set (matugen config plus template files), so they are
+stored under a key built from those three. Applying a cached scheme writes
+the stored outputs back, runs the templates' post hooks and sets the
+wallpaper with the command from the matugen config, without running
+matugen at all.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import toml
+from loguru import logger
+
+import config.data as data
+
+MATUGEN_CONFIG = os.path.expanduser("~/.config/matugen/config.toml")
+SCHEME_CACHE_DIR = os.path.join(data.CACHE_DIR, "matugen")
+IMAGE_HASHES_FILE = os.path.join(SCHEME_CACHE_DIR, "image_hashes.json")
+
+# Number of cached (wallpaper, scheme) results kept on disk.
+MAX_ENTRIES = 64
+# Number of remembered image content hashes, least recently used dropped first.
+MAX_IMAGE_HASHES = MAX_ENTRIES
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MatugenCache:
+    def __init__(self, directory: str = SCHEME_CACHE_DIR, config_path: str = MATUGEN_CONFIG):
+        self.directory = directory
+        self.config_path = config_path
+        os.makedirs(directory, exist_ok=True)
+        # Only one matugen run or cache write at a time
+        self._lock = threading.Lock()
+        # "path:size:mtime_ns" -> content hash, so unchanged images are not re-read
+        self._image_hashes: "OrderedDict[str, str]" = OrderedDict()
+        try:
+            with open(IMAGE_HASHES_FILE, "r") as f:
+                self._image_hashes = OrderedDict(json.load(f))
+        except (OSError, json.JSONDecodeError, TypeError, ValueError):
+            self._image_hashes = OrderedDict()
+        while len(self._image_hashes) > MAX_IMAGE_HASHES:
+            self._image_hashes.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def _image_hash(self, image_path: str) -> str:
+        st = os.stat(image_path)
+        real_path = os.path.realpath(image_path)
+        stat_key = f"{real_path}:{st.st_size}:{st.st_mtime_ns}"
+        content_hash = self._image_hashes.get(stat_key)
+        if content_hash is not None:
+            self._image_hashes.move_to_end(stat_key)
+            return content_hash
+        content_hash = _hash_file(image_path)
+        # Earlier versions of the same file will not be asked for again
+        for old_key in [key for key in self._image_hashes if key.rsplit(":", 2)[0] == real_path]:
+            del self._image_hashes[old_key]
+        self._image_hashes[stat_key] = content_hash
+        while len(self._image_hashes) > MAX_IMAGE_HASHES:
+            self._image_hashes.popitem(last=False)
+        self._write_json(IMAGE_HASHES_FILE, self._image_hashes)
+        return content_hash
+
+    def _load_config(self) -> dict:
+        try:
+            return toml.load(self.config_path)
+        except (OSError, toml.TomlDecodeError) as e:
+            logger.warning(f"[Matugen] Could not read {self.config_path}: {e}")
+            return {}
+
+    def _templates(self, config: dict) -> List[dict]:
+        templates = []
+        for template in (config.get("templates") or {}).values():
+            if not isinstance(template, dict) or not template.get("output_path"):
+                continue
+            templates.append({
+                "input_path": os.path.expanduser(template.get("input_path", "")),
+                "output_path": os.path.expanduser(template["output_path"]),
+                "post_hook": template.get("post_hook"),
+            })
+        return templates
+
+    def _template_set_hash(self, templates: List[dict]) -> str:
+        digest = hashlib.sha1()
+        try:
+            with open(self.config_path, "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            pass
+        for template in templates:
+            digest.update(template["input_path"].encode())
+            try:
+                with open(template["input_path"], "rb") as f:
+                    digest.update(f.read())
+            except OSError:
+                pass
+        return digest.hexdigest()
+
+    def _entry_dir(self, image_path: str, scheme: str, templates: List[dict]) -> str:
+        key = hashlib.sha1(
+            f"{self._image_hash(image_path)}\0{scheme}\0{self._template_set_hash(templates)}".encode()
+        ).hexdigest()
+        return os.path.join(self.directory, key)
+
+    # ------------------------------------------------------------------
+    # Applying
+    # ------------------------------------------------------------------
+
+    def apply_async(self, image_path: str, scheme: str):
+        """Apply the scheme for image_path off the main loop."""
+        threading.Thread(target=self.apply, args=(image_path, scheme), daemon=True).start()
+
+    def apply(self, image_path: str, scheme: str) -> bool:
+        """Apply a cached result, or run matugen and cache its outputs. Returns True on a hit."""
+        with self._lock:
+            config = self._load_config()
+            templates = self._templates(config)
+            try:
+                entry_dir = self._entry_dir(image_path, scheme, templates)
+            except OSError as e:
+                logger.error(f"[Matugen] Could not read {image_path}: {e}")
+                return False
+
+            if templates and self._apply_cached(entry_dir, image_path, config, templates):
+                logger.info(f"[Matugen] Applied cached {scheme} colors for {image_path}")
+                return True
+
+            result = subprocess.run(["matugen", "image", image_path, "-t", scheme])
+            if result.returncode != 0:
+                logger.error(f"[Matugen] matugen exited with {result.returncode}")
+                return False
+            if templates:
+                self._store(entry_dir, templates)
+            return False
+
+    def _apply_cached(self, entry_dir: str, image_path: str, config: dict, templates: List[dict]) -> bool:
+        manifest = self._read_manifest(entry_dir)
+        if manifest is None:
+            return False
+        outputs = manifest.get("outputs", {})
+        if any(template["output_path"] not in outputs for template in templates):
+            return False
+
+        for template in templates:
+            cached_file = os.path.join(entry_dir, outputs[template["output_path"]])
+            output_path = template["output_path"]
+            try:
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                tmp_path = f"{output_path}.tmp"
+                shutil.copyfile(cached_file, tmp_path)
+                os.replace(tmp_path, output_path)
+            except OSError as e:
+                logger.warning(f"[Matugen] Cached output unusable, rerunning matugen: {e}")
+                return False
+
+        # Mark as recently used for eviction
+        os.utime(entry_dir)
+        self._set_wallpaper(config, image_path)
+        for template in templates:
+            if template["post_hook"]:
+                subprocess.Popen(template["post_hook"], shell=True)
+        return True
+
+    @staticmethod
+    def _set_wallpaper(config: dict, image_path: str):
+        wallpaper = (config.get("config") or {}).get("wallpaper") or {}
+        if not wallpaper.get("set", True) or not wallpaper.get("command"):
+            return
+        command = [wallpaper["command"], *wallpaper.get("arguments", []), image_path]
+        try:
+            subprocess.Popen(command)
+        except OSError as e:
+            logger.error(f"[Matugen] Could not run wallpaper command: {e}")
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _read_manifest(self, entry_dir: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(entry_dir, "manifest.json"), "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _store(self, entry_dir: str, templates: List[dict]):
+        tmp_dir = f"{entry_dir}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        try:
+            os.makedirs(tmp_dir)
+            outputs = {}
+            for i, template in enumerate(templates):
+                name = f"output-{i}"
+                shutil.copyfile(template["output_path"], os.path.join(tmp_dir, name))
+                outputs[template["output_path"]] = name
+            self._write_json(os.path.join(tmp_dir, "manifest.json"), {"outputs": outputs})
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        except OSError as e:
+            logger.warning(f"[Matugen] Could not cache outputs: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_dir() and not entry.name.endswith(".tmp"):
+                    entries.append((entry.stat().st_mtime, entry.path))
+        entries.sort()
+        for _, path in entries[:-MAX_ENTRIES]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def _write_json(path: str, payload):
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"[Matugen] Could not write {path}: {e}")
+
+
+_matugen_cache_instance = None
+
+def get_matugen_cache() -> MatugenCache:
+    """Get the global MatugenCache instance."""
+    global _matugen_cache_instance
+    if _matugen_cache_instance is None:
+        _matugen_cache_instance = MatugenCache()
+    return _matugen_cache_instance
@@ -1,5 +1,3 @@
-import json
-import subprocess
 from typing import Dict, List, Optional, Tuple
 
 import gi
@@ -104,13 +102,8 @@ class MonitorManager:
         
         try:
             # Try Hyprland first for primary info (more accurate)
-            result = subprocess.run(
-                ["hyprctl", "monitors", "-j"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            hypr_monitors = json.loads(result.stdout)
+            from services.hyprland_state import get_hyprland_state
+            hypr_monitors = get_hyprland_state().get_monitors()
             
             for i, monitor in enumerate(hypr_monitors):
                 monitor_name = monitor.get('name', f'monitor-{i}')
@@ -134,7 +127,10 @@ class MonitorManager:
                     self._notch_states[i] = False
                     self._current_notch_module[i] = None
                     
-        except (subprocess.CalledProcessError, json.JSONDecodeError, FileNotFoundError):
+        except ImportError:
+            pass
+        
+        if not self._monitors:
             # Fallback to GTK only if Hyprland fails
             self._fallback_to_gtk()
         
@@ -1,31 +1,17 @@
-import subprocess
-import json
+from gi.repository import GLib
 
 import config.data as data
+from services.hyprland_state import get_hyprland_state
 
 def get_current_workspace():
     """
-    Get the current workspace ID using hyprctl.
+    Get the current workspace ID from the shared Hyprland state.
     """
-    try:
-        result = subprocess.run(
-            ["hyprctl", "activeworkspace"],
-            capture_output=True,
-            text=True
-        )
-        # Assume the output similar to: "ID <number>"
-        # Extracting the number from the output
-        parts = result.stdout.split()
-        for i, part in enumerate(parts):
-            if part == "ID" and i + 1 < len(parts):
-                return int(parts[i+1])
-    except Exception as e:
-        print(f"Error getting current workspace: {e}")
-    return -1
+    return get_hyprland_state().get_active_workspace_id()
 
 def get_screen_dimensions():
     """
-    Get screen dimensions from hyprctl.
+    Get screen dimensions from the shared Hyprland state.
     
     Returns:
         tuple: (width, height) of the monitor containing the current workspace
@@ -35,12 +21,7 @@ def get_screen_dimensions():
         workspace_id = get_current_workspace()
         
         # Get monitor information
-        result = subprocess.run(
-            ["hyprctl", "-j", "monitors"],
-            capture_output=True,
-            text=True
-        )
-        monitors = json.loads(result.stdout)
+        monitors = get_hyprland_state().get_monitors()
         
         # Find the monitor containing our workspace
         for monitor in monitors:
@@ -94,53 +75,174 @@ def check_occlusion(occlusion_region, workspace=None):
         print(f"Invalid occlusion region format: {occlusion_region}")
         return False
 
-    try:
-        result = subprocess.run(
-            ["hyprctl", "-j", "clients"],
-            capture_output=True,
-            text=True
-        )
-        clients = json.loads(result.stdout)
-    except Exception as e:
-        print(f"Error retrieving client windows: {e}")
+    occ_x, occ_y, occ_width, occ_height = occlusion_region
+    return get_occlusion_engine().region_occluded(
+        workspace, (occ_x, occ_y, occ_x + occ_width, occ_y + occ_height)
+    )
+
+
+def _rects_intersect(a, b):
+    return not (a[2] <= b[0] or a[0] >= b[2] or a[3] <= b[1] or a[1] >= b[3])
+
+
+class OcclusionEngine:
+    """
+    Event-driven occlusion tracking for edge regions of each monitor.
+
+    Keeps a spatial index of client rectangles per workspace, rebuilt only
+    when the shared Hyprland state reports client changes. Watched regions
+    are re-evaluated when clients, the active workspace, monitors or
+    fullscreen state change, and callbacks fire only on transitions.
+    """
+
+    def __init__(self):
+        self._state = get_hyprland_state()
+        # workspace_id -> ([(x1, y1, x2, y2)], bounding box, has_fullscreen)
+        self._index: dict[int, tuple[list, tuple, bool]] = {}
+        self._watchers: dict[int, dict] = {}
+        self._next_watch_id = 1
+        self._recompute_pending = False
+
+        self._state.connect("clients-changed", self._on_clients_changed)
+        self._state.connect("active-workspace-changed", self._schedule_recompute)
+        self._state.connect("monitors-changed", self._schedule_recompute)
+        self._state.connect("fullscreen-changed", self._schedule_recompute)
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        index: dict[int, list] = {}
+        fullscreen: set[int] = set()
+        for client in self._state.get_clients():
+            if not client.get("mapped", False):
+                continue
+            position = client.get("at")
+            size = client.get("size")
+            if not position or not size:
+                continue
+            workspace_id = client.get("workspace", {}).get("id")
+            x, y = position
+            width, height = size
+            index.setdefault(workspace_id, []).append((x, y, x + width, y + height))
+            if client.get("fullscreen"):
+                fullscreen.add(workspace_id)
+
+        self._index = {}
+        for workspace_id, rects in index.items():
+            bounds = (
+                min(r[0] for r in rects),
+                min(r[1] for r in rects),
+                max(r[2] for r in rects),
+                max(r[3] for r in rects),
+            )
+            self._index[workspace_id] = (rects, bounds, workspace_id in fullscreen)
+
+    def _on_clients_changed(self, *_):
+        self._rebuild_index()
+        self._schedule_recompute()
+
+    def _schedule_recompute(self, *_):
+        if self._recompute_pending:
+            return
+        self._recompute_pending = True
+        GLib.idle_add(self._recompute)
+
+    def _recompute(self):
+        self._recompute_pending = False
+        for watch in list(self._watchers.values()):
+            occluded = self._evaluate(watch)
+            if occluded != watch["occluded"]:
+                watch["occluded"] = occluded
+                try:
+                    watch["callback"](occluded)
+                except Exception as e:
+                    print(f"Error in occlusion callback: {e}")
         return False
 
-    occ_x, occ_y, occ_width, occ_height = occlusion_region
-    occ_x2 = occ_x + occ_width
-    occ_y2 = occ_y + occ_height
-
-    # Get screen dimensions for fullscreen check
-    screen_width, screen_height = get_screen_dimensions()
-
-    for client in clients:
-        # Check if client is mapped
-        if not client.get("mapped", False):
-            continue
-
-        # Ensure client has proper workspace information and matches the workspace
-        client_workspace = client.get("workspace", {})
-        if client_workspace.get("id") != workspace:
-            continue
-
-        # Ensure client has position and size info
-        position = client.get("at")
-        size = client.get("size")
-        if not position or not size:
-            continue
-
-        x, y = position
-        width, height = size
-        win_x1, win_y1 = x, y
-        win_x2, win_y2 = x + width, y + height
-
-        # Check for fullscreen windows (size matches screen and positioned at 0,0)
-        if (width, height) == (screen_width, screen_height) and (x, y) == (0, 0):
-            # For fullscreen windows, check if occlusion region is the top area
-            if occ_y == 0 and occ_height > 0:  # Top region
-                return True  # Consider fullscreen as occluding the top
-
-        # Check for intersection between the window and occlusion region
-        if not (win_x2 <= occ_x or win_x1 >= occ_x2 or win_y2 <= occ_y or win_y1 >= occ_y2):
-            return True  # Occlusion region is occupied
-
-    return False  # No window overlaps the occlusion region
+    def region_occluded(self, workspace_id, region, fullscreen_occludes=True) -> bool:
+        """Check a (x1, y1, x2, y2) region against the indexed clients of a workspace."""
+        entry = self._index.get(workspace_id)
+        if entry is None:
+            return False
+        rects, bounds, has_fullscreen = entry
+        if has_fullscreen and fullscreen_occludes:
+            return True
+        if not _rects_intersect(bounds, region):
+            return False
+        return any(_rects_intersect(rect, region) for rect in rects)
+
+    def _monitor_for(self, monitor_id):
+        monitors = self._state.get_monitors()
+        if monitor_id is not None and 0 <= monitor_id < len(monitors):
+            return monitors[monitor_id]
+        return self._state.get_focused_monitor() or (monitors[0] if monitors else None)
+
+    def _evaluate(self, watch) -> bool:
+        monitor = self._monitor_for(watch["monitor_id"])
+        if monitor is None:
+            return False
+
+        # Client coordinates are in logical pixels, monitor size is physical
+        scale = monitor.get("scale", 1.0) or 1.0
+        width = monitor.get("width", data.CURRENT_WIDTH) / scale
+        height = monitor.get("height", data.CURRENT_HEIGHT) / scale
+        if monitor.get("transform", 0) % 2 == 1:
+            width, height = height, width
+        mon_x, mon_y = monitor.get("x", 0), monitor.get("y", 0)
+
+        side, size = watch["side"], watch["size"]
+        if side == "bottom":
+            region = (mon_x, mon_y + height - size, mon_x + width, mon_y + height)
+        elif side == "left":
+            region = (mon_x, mon_y, mon_x + size, mon_y + height)
+        elif side == "right":
+            region = (mon_x + width - size, mon_y, mon_x + width, mon_y + height)
+        else:
+            region = (mon_x, mon_y, mon_x + width, mon_y + size)
+
+        workspace_id = monitor.get("activeWorkspace", {}).get("id")
+        return self.region_occluded(workspace_id, region)
+
+    def watch(self, monitor_id, side: str, size: int, callback) -> int:
+        """
+        Track whether an edge region of a monitor is covered by a window.
+
+        Parameters:
+            monitor_id: Shell monitor id, or None to follow the focused monitor.
+            side: "top", "bottom", "left" or "right".
+            size: Thickness of the region in pixels.
+            callback: Called with a bool on every occluded/not occluded transition,
+                and once right away with the initial state.
+
+        Returns:
+            int: Handle for unwatch() and is_occluded().
+        """
+        watch_id = self._next_watch_id
+        self._next_watch_id += 1
+        watch = {
+            "monitor_id": monitor_id,
+            "side": side.lower(),
+            "size": size,
+            "callback": callback,
+            "occluded": False,
+        }
+        self._watchers[watch_id] = watch
+        watch["occluded"] = self._evaluate(watch)
+        callback(watch["occluded"])
+        return watch_id
+
+    def unwatch(self, watch_id: int):
+        self._watchers.pop(watch_id, None)
+
+    def is_occluded(self, watch_id: int) -> bool:
+        watch = self._watchers.get(watch_id)
+        return watch["occluded"] if watch else False
+
+
+_occlusion_engine_instance = None
+
+def get_occlusion_engine() -> OcclusionEngine:
+    """Get the global OcclusionEngine instance."""
+    global _occlusion_engine_instance
+    if _occlusion_engine_instance is None:
+        _occlusion_engine_instance = OcclusionEngine()
+    return _occlusion_engine_instance
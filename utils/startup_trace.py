@@ -0,0 +1,322 @@
+"""
+Startup tracing for the shell.
+
+Run with AX_SHELL_TRACE_STARTUP=1 (or pass --trace-startup) to record where
+startup time goes: wall time of every module import, of every component
+constructor, and until each window draws its first frame. The report is
+written as JSON to CACHE_DIR/startup-trace.json once every traced window
+has drawn (or after REPORT_TIMEOUT_MS). The previous report is kept next to
+it and the new one lists the differences against it, so regressions show up
+from one login to the next. AX_SHELL_STARTUP_BUDGET_MS sets a budget for the
+time until the last first frame; the report says when it is exceeded.
+
+This module must not import gi or fabric at import time: it is imported
+first in main.py so the imports it times include theirs.
+"""
+
+import builtins
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+TRACE_ENV = "AX_SHELL_TRACE_STARTUP"
+BUDGET_ENV = "AX_SHELL_STARTUP_BUDGET_MS"
+TRACE_FLAG = "--trace-startup"
+
+REPORT_NAME = "startup-trace.json"
+PREVIOUS_REPORT_NAME = "startup-trace.prev.json"
+# Windows that stay hidden never draw; the report is written anyway after this
+REPORT_TIMEOUT_MS = 15000
+# Imports listed in the report, by cumulative time
+REPORT_IMPORTS = 60
+# Changes smaller than this are noise, not regressions
+REGRESSION_MIN_MS = 5.0
+REGRESSION_MIN_RATIO = 0.2
+
+
+def _process_age_ms() -> Optional[float]:
+    """Milliseconds since the process was started, read from /proc."""
+    try:
+        with open("/proc/self/stat", "r") as f:
+            # The command name may contain spaces; fields resume after ")"
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return (uptime - start_ticks / os.sysconf("SC_CLK_TCK")) * 1000
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+class StartupTracer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        # Interpreter startup before this module was imported
+        self.preamble_ms = _process_age_ms()
+        self.imports: List[dict] = []
+        self.components: List[dict] = []
+        self.marks: List[dict] = []
+        self.frames: Dict[str, Optional[float]] = {}
+        # Per thread, as components start worker threads during startup
+        self._local = threading.local()
+        self._original_import = None
+        self._report_written = False
+
+    def elapsed_ms(self) -> float:
+        return _ms(time.perf_counter() - self.start)
+
+    # ------------------------------------------------------------------
+    # Imports
+    # ------------------------------------------------------------------
+
+    def install_import_hook(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def remove_import_hook(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original_import = self._original_import
+        module_name = name
+        if level and globals:
+            package = globals.get("__package__") or ""
+            base = package.rsplit(".", level - 1)[0] if level > 1 else package
+            module_name = f"{base}.{name}" if name else base
+        if not module_name or module_name in sys.modules:
+            return original_import(name, globals, locals, fromlist, level)
+
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        frame = [module_name, time.perf_counter(), 0.0]  # name, start, time in children
+        stack.append(frame)
+        try:
+            return original_import(name, globals, locals, fromlist, level)
+        finally:
+            stack.pop()
+            duration = time.perf_counter() - frame[1]
+            if stack:
+                stack[-1][2] += duration
+            self.imports.append({
+                "module": module_name,
+                "cumulative_ms": _ms(duration),
+                "self_ms": _ms(duration - frame[2]),
+                "parent": stack[-1][0] if stack else None,
+            })
+
+    # ------------------------------------------------------------------
+    # Components and frames
+    # ------------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def span(self, name: str, **details):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.components.append({
+                "name": name,
+                **details,
+                "start_ms": _ms(started - self.start),
+                "duration_ms": _ms(time.perf_counter() - started),
+            })
+
+    def mark(self, name: str):
+        self.marks.append({"name": name, "at_ms": self.elapsed_ms()})
+
+    def watch_first_frame(self, window, name: str):
+        if window is None:
+            return
+        self.frames[name] = None
+        handler_id = None
+
+        def on_draw(*_):
+            window.disconnect(handler_id)
+            self.frames[name] = self.elapsed_ms()
+            if all(at is not None for at in self.frames.values()):
+                from gi.repository import GLib
+
+                GLib.idle_add(self.write_report)
+            return False
+
+        handler_id = window.connect("draw", on_draw)
+
+    def start_main_loop(self):
+        """Call right before running the main loop."""
+        from gi.repository import GLib
+
+        self.remove_import_hook()
+        self.mark("main-loop-start")
+        GLib.idle_add(self._on_main_loop_idle)
+        GLib.timeout_add(REPORT_TIMEOUT_MS, self.write_report)
+
+    def _on_main_loop_idle(self):
+        self.mark("main-loop-idle")
+        return False
+
+    # ------------------------------------------------------------------
+    # Report
+    # ------------------------------------------------------------------
+
+    def write_report(self):
+        if self._report_written:
+            return False
+        self._report_written = True
+
+        from loguru import logger
+
+        from config.data import CACHE_DIR
+
+        drawn = [at for at in self.frames.values() if at is not None]
+        usable_ms = max(drawn) if drawn else None
+        report = {
+            "timestamp": time.time(),
+            "python": sys.version.split()[0],
+            "preamble_ms": round(self.preamble_ms, 2) if self.preamble_ms is not None else None,
+            "imports_ms": round(sum(
+                entry["cumulative_ms"] for entry in self.imports if entry["parent"] is None
+            ), 2),
+            "usable_ms": usable_ms,
+            "marks": self.marks,
+            "components": self.components,
+            "first_frames": self.frames,
+            "imports": sorted(
+                self.imports, key=lambda entry: entry["cumulative_ms"], reverse=True
+            )[:REPORT_IMPORTS],
+        }
+
+        budget = os.environ.get(BUDGET_ENV)
+        if budget:
+            try:
+                report["budget_ms"] = float(budget)
+                report["over_budget"] = usable_ms is None or usable_ms > report["budget_ms"]
+            except ValueError:
+                logger.warning(f"[StartupTrace] Ignoring invalid {BUDGET_ENV}={budget!r}")
+
+        report_path = os.path.join(CACHE_DIR, REPORT_NAME)
+        previous_path = os.path.join(CACHE_DIR, PREVIOUS_REPORT_NAME)
+        previous = None
+        try:
+            with open(report_path, "r") as f:
+                previous = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            pass
+        if previous is not None:
+            report["regressions"] = self._regressions(previous, report)
+
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            if previous is not None:
+                os.replace(report_path, previous_path)
+            tmp_path = f"{report_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(report, f, indent=1)
+            os.replace(tmp_path, report_path)
+        except OSError as e:
+            logger.error(f"[StartupTrace] Could not write report: {e}")
+            return False
+
+        logger.info(
+            f"[StartupTrace] Usable after {usable_ms} ms, imports took "
+            f"{report['imports_ms']} ms. Report: {report_path}"
+        )
+        for entry in report["imports"][:10]:
+            logger.info(
+                f"[StartupTrace]   {entry['module']}: {entry['cumulative_ms']} ms "
+                f"({entry['self_ms']} ms self)"
+            )
+        if report.get("over_budget"):
+            logger.warning(
+                f"[StartupTrace] Startup took {usable_ms} ms, over the "
+                f"{report['budget_ms']} ms budget"
+            )
+        for regression in report.get("regressions", []):
+            logger.warning(
+                f"[StartupTrace] {regression['kind']} {regression['name']} went from "
+                f"{regression['previous_ms']} ms to {regression['current_ms']} ms"
+            )
+        return False
+
+    @staticmethod
+    def _regressions(previous: dict, current: dict) -> List[dict]:
+        def timings(report: dict) -> Dict[tuple, float]:
+            values = {("total", "usable"): report.get("usable_ms")}
+            for entry in report.get("imports", []):
+                values[("import", entry["module"])] = entry["cumulative_ms"]
+            for entry in report.get("components", []):
+                key = entry["name"]
+                if "monitor" in entry:
+                    key = f"{key}@{entry['monitor']}"
+                values[("component", key)] = entry["duration_ms"]
+            for name, at in (report.get("first_frames") or {}).items():
+                values[("first-frame", name)] = at
+            return values
+
+        before = timings(previous)
+        regressions = []
+        for (kind, name), current_ms in timings(current).items():
+            previous_ms = before.get((kind, name))
+            if current_ms is None or previous_ms is None:
+                continue
+            growth = current_ms - previous_ms
+            if growth >= REGRESSION_MIN_MS and growth >= previous_ms * REGRESSION_MIN_RATIO:
+                regressions.append({
+                    "kind": kind,
+                    "name": name,
+                    "previous_ms": previous_ms,
+                    "current_ms": current_ms,
+                })
+        regressions.sort(key=lambda r: r["current_ms"] - r["previous_ms"], reverse=True)
+        return regressions
+
+
+_tracer: Optional[StartupTracer] = None
+
+
+def install() -> bool:
+    """Start tracing if requested by the environment or command line."""
+    global _tracer
+    if _tracer is not None:
+        return True
+    if os.environ.get(TRACE_ENV) not in ("1", "true", "yes") and TRACE_FLAG not in sys.argv:
+        return False
+    _tracer = StartupTracer()
+    _tracer.install_import_hook()
+    return True
+
+
+def is_enabled() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, **details):
+    """Time a block, e.g. a component constructor. No-op unless tracing."""
+    if _tracer is None:
+        return contextlib.nullcontext()
+    return _tracer.span(name, **details)
+
+
+def mark(name: str):
+    if _tracer is not None:
+        _tracer.mark(name)
+
+
+def watch_first_frame(window, name: str):
+    if _tracer is not None:
+        _tracer.watch_first_frame(window, name)
+
+
+def start_main_loop():
+    if _tracer is not None:
+        _tracer.start_main_loop()
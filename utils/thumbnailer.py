@@ -0,0 +1,46 @@
+"""
+Wallpaper thumbnail worker.
+
+Run as a separate process by ThumbnailPipeline: reads one JSON job per line
+on stdin ({"src", "dst", "size"}) and answers each with one JSON line on
+stdout ({"ok": bool, "error": str}). It only depends on PIL so that worker
+processes start quickly and never touch GTK.
+"""
+
+import json
+import sys
+
+from PIL import Image
+
+
+def render_thumbnail(src: str, dst: str, size: int):
+    """Write a size x size center crop of src to dst as PNG."""
+    with Image.open(src) as img:
+        if img.format == "JPEG":
+            # Let libjpeg decode at the smallest 1/2, 1/4 or 1/8 scale that
+            # still covers the thumbnail, instead of the full resolution
+            img.draft("RGB", (size, size))
+        width, height = img.size
+        side = min(width, height)
+        left = (width - side) // 2
+        top = (height - side) // 2
+        img_cropped = img.crop((left, top, left + side, top + side))
+        # reducing_gap shrinks with a fast box reduce before resampling
+        img_cropped.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        img_cropped.save(dst, "PNG")
+
+
+def main():
+    for line in sys.stdin:
+        try:
+            job = json.loads(line)
+            render_thumbnail(job["src"], job["dst"], int(job["size"]))
+            reply = {"ok": True}
+        except Exception as e:
+            reply = {"ok": False, "error": str(e)}
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Persistent catalog of the wallpaper library.
+
+The catalog covers WALLPAPERS_DIR recursively and is stored as a compact
+JSON file in CACHE_DIR. For every wallpaper it keeps the path relative to
+the library root, mtime, size, pixel dimensions, aspect ratio and, once
+computed from its thumbnail, its dominant color palette. It also
+records the mtime of every folder. A refresh stats the known folders and
+files; only folders whose mtime changed are listed again, and only new or
+modified images are opened (header only) to read their dimensions. On a
+large or network-mounted library, opening the selector therefore costs a
+few thousand stat calls instead of a full rescan.
+"""
+
+import bisect
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+import config.data as data
+
+CATALOG_FILE = os.path.join(data.CACHE_DIR, "wallpapers.json")
+CATALOG_VERSION = 1
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp")
+
+
+def is_image(file_name: str) -> bool:
+    return file_name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def read_image_size(path: str) -> tuple[int, int]:
+    """Pixel size of an image, reading only its header."""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as img:
+            return img.size
+    except Exception as e:
+        logger.warning(f"[Wallpapers] Could not read size of {path}: {e}")
+        return 0, 0
+
+
+class WallpaperEntry:
+    __slots__ = ("path", "mtime_ns", "size", "width", "height", "palette")
+
+    def __init__(
+        self,
+        path: str,
+        mtime_ns: int,
+        size: int,
+        width: int,
+        height: int,
+        palette: Optional[list] = None,
+    ):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.width = width
+        self.height = height
+        # [[0xRRGGBB, weight], ...] from utils.wallpaper_palette, or None
+        self.palette = palette
+
+    @property
+    def folder(self) -> str:
+        return os.path.dirname(self.path)
+
+    @property
+    def aspect(self) -> float:
+        return self.width / self.height if self.height else 0.0
+
+    def to_row(self) -> list:
+        row = [self.path, self.mtime_ns, self.size, self.width, self.height]
+        if self.palette is not None:
+            row.append(self.palette)
+        return row
+
+    @classmethod
+    def from_row(cls, row: list) -> "WallpaperEntry":
+        return cls(*row[:6])
+
+
+class WallpaperCatalog:
+    def __init__(self, root: str = data.WALLPAPERS_DIR, path: str = CATALOG_FILE):
+        self.root = root
+        self.path = path
+        self._entries: Dict[str, WallpaperEntry] = {}
+        self._folders: Dict[str, int] = {}  # relative folder -> mtime_ns
+        self._sorted: List[tuple[str, str]] = []  # (casefolded path, path)
+        self._lock = threading.Lock()
+        # The first load and rescans after new folders appear run on
+        # separate threads; one refresh at a time
+        self._refresh_lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"[Wallpapers] Could not read catalog, rebuilding: {e}")
+            return
+        if stored.get("version") != CATALOG_VERSION or stored.get("root") != self.root:
+            return
+        self._folders = stored.get("folders", {})
+        for row in stored.get("files", []):
+            entry = WallpaperEntry.from_row(row)
+            self._entries[entry.path] = entry
+        self._sorted = sorted((path.casefold(), path) for path in self._entries)
+
+    def save(self):
+        """Write the catalog if it changed (atomically)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({
+                "version": CATALOG_VERSION,
+                "root": self.root,
+                "folders": self._folders,
+                "files": [self._entries[path].to_row() for _, path in self._sorted],
+            }, separators=(",", ":"))
+            self._dirty = False
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"[Wallpapers] Could not write catalog: {e}")
+
+    # ------------------------------------------------------------------
+    # Scanning
+    # ------------------------------------------------------------------
+
+    def refresh(self) -> Tuple[List[str], List[str]]:
+        """
+        Bring the catalog up to date with the library. Safe to call off the
+        main loop. Returns the (added or modified, removed) wallpaper paths.
+        """
+        if not os.path.isdir(self.root):
+            logger.warning(f"[Wallpapers] Wallpaper directory {self.root} does not exist")
+            return [], []
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self) -> Tuple[List[str], List[str]]:
+        with self._lock:
+            before = {path: (e.mtime_ns, e.size) for path, e in self._entries.items()}
+            # The main loop may add or forget folders while this runs
+            known_folders = dict(self._folders)
+        files_by_folder: Dict[str, List[str]] = {}
+        for path in before:
+            files_by_folder.setdefault(os.path.dirname(path), []).append(path)
+        subfolders_by_folder: Dict[str, List[str]] = {}
+        for folder in known_folders:
+            if folder:
+                subfolders_by_folder.setdefault(os.path.dirname(folder), []).append(folder)
+
+        pending = [""]
+        seen_folders = set()
+        while pending:
+            folder = pending.pop()
+            seen_folders.add(folder)
+            try:
+                mtime_ns = os.stat(os.path.join(self.root, folder)).st_mtime_ns
+            except OSError:
+                continue
+            if known_folders.get(folder) == mtime_ns:
+                # Unchanged listing: only known subfolders and files need a stat
+                pending.extend(subfolders_by_folder.get(folder, []))
+                for path in files_by_folder.get(folder, []):
+                    self._refresh_file(path)
+                continue
+            pending.extend(self._scan_folder(folder))
+            with self._lock:
+                self._folders[folder] = mtime_ns
+                self._dirty = True
+
+        with self._lock:
+            gone_folders = [f for f in self._folders if f not in seen_folders]
+        for folder in gone_folders:
+            self.remove_folder(folder)
+
+        with self._lock:
+            changed = [
+                path for path, e in self._entries.items()
+                if before.get(path) != (e.mtime_ns, e.size)
+            ]
+            removed = [path for path in before if path not in self._entries]
+        return changed, removed
+
+    def _scan_folder(self, folder: str) -> List[str]:
+        """List folder, updating its files. Returns its subfolders."""
+        subfolders = []
+        found = set()
+        try:
+            with os.scandir(os.path.join(self.root, folder)) as it:
+                for dir_entry in it:
+                    rel_path = os.path.join(folder, dir_entry.name) if folder else dir_entry.name
+                    if dir_entry.is_dir():
+                        subfolders.append(rel_path)
+                    elif dir_entry.is_file() and is_image(dir_entry.name):
+                        found.add(rel_path)
+                        self._refresh_file(rel_path)
+        except OSError as e:
+            logger.warning(f"[Wallpapers] Could not list {folder or self.root}: {e}")
+            return []
+        with self._lock:
+            stale = [p for p in self._entries if os.path.dirname(p) == folder and p not in found]
+        for path in stale:
+            self.remove(path)
+        return subfolders
+
+    def _refresh_file(self, path: str) -> Optional[WallpaperEntry]:
+        try:
+            st = os.stat(os.path.join(self.root, path))
+        except OSError:
+            self.remove(path)
+            return None
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+            return entry
+        width, height = read_image_size(os.path.join(self.root, path))
+        entry = WallpaperEntry(path, st.st_mtime_ns, st.st_size, width, height)
+        with self._lock:
+            if path not in self._entries:
+                bisect.insort(self._sorted, (path.casefold(), path))
+            self._entries[path] = entry
+            self._dirty = True
+        return entry
+
+    def update(self, path: str) -> Optional[WallpaperEntry]:
+        """Add or refresh a single wallpaper (relative path)."""
+        if not is_image(path):
+            return None
+        return self._refresh_file(path)
+
+    def remove(self, path: str):
+        with self._lock:
+            if self._entries.pop(path, None) is None:
+                return
+            position = bisect.bisect_left(self._sorted, (path.casefold(), path))
+            if position < len(self._sorted) and self._sorted[position][1] == path:
+                del self._sorted[position]
+            self._dirty = True
+
+    def remove_folder(self, folder: str) -> List[str]:
+        """Forget a folder, its subfolders and their wallpapers. Returns the removed paths."""
+        prefix = f"{folder}/"
+        with self._lock:
+            removed = [p for p in self._entries if p.startswith(prefix)]
+        for path in removed:
+            self.remove(path)
+        with self._lock:
+            for sub in [f for f in self._folders if f == folder or f.startswith(prefix)]:
+                del self._folders[sub]
+            self._dirty = True
+        return removed
+
+    def set_palette(self, path: str, mtime_ns: int, palette: list):
+        """Store the palette of path, unless the file changed since it was computed."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry.mtime_ns != mtime_ns:
+                return
+            entry.palette = palette
+            self._dirty = True
+
+    def has_folder(self, folder: str) -> bool:
+        with self._lock:
+            return folder in self._folders
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get(self, path: str) -> Optional[WallpaperEntry]:
+        with self._lock:
+            return self._entries.get(path)
+
+    def paths(self) -> List[str]:
+        """Relative paths of all wallpapers, sorted case-insensitively."""
+        with self._lock:
+            return [path for _, path in self._sorted]
+
+    def folders(self) -> List[str]:
+        with self._lock:
+            return sorted(f for f in self._folders if f)
+
+    def filter(
+        self,
+        folder: Optional[str] = None,
+        min_width: int = 0,
+        min_height: int = 0,
+    ) -> Iterable[WallpaperEntry]:
+        """Wallpapers inside folder (recursively) of at least the given resolution."""
+        with self._lock:
+            entries = [self._entries[path] for _, path in self._sorted]
+        for entry in entries:
+            if folder and not (entry.folder == folder or entry.folder.startswith(f"{folder}/")):
+                continue
+            if entry.width < min_width or entry.height < min_height:
+                continue
+            yield entry
@@ -0,0 +1,122 @@
+"""
+Dominant colors of wallpapers.
+
+Palettes are computed from the cached thumbnails, never from the full
+images: a 96px thumbnail is about ten thousand pixels, which NumPy buckets
+and averages in about a millisecond. A palette is a short list of
+[0xRRGGBB, weight] pairs, heaviest first, with weights summing to at most 1.
+"""
+
+import colorsys
+from typing import List, Optional
+
+from utils.lazy_import import lazy_import
+
+# Only needed by the palette pass, which runs after thumbnails are rendered
+np = lazy_import("numpy")
+
+PALETTE_SIZE = 5
+
+# Bits kept per channel when bucketing: 3 bits gives 512 buckets, coarse
+# enough that shades of one color land in the same bucket
+_QUANT_BITS = 3
+
+# Colors below these are too gray, dark or light to have a meaningful hue
+_MIN_SATURATION = 0.25
+_MIN_LIGHTNESS = 0.12
+_MAX_LIGHTNESS = 0.9
+# Share of the image a color must cover to count for hue filtering
+_MIN_WEIGHT = 0.08
+HUE_TOLERANCE = 25
+
+HUE_NAMES = {
+    "red": 0,
+    "orange": 30,
+    "yellow": 55,
+    "green": 120,
+    "cyan": 180,
+    "blue": 220,
+    "purple": 275,
+    "pink": 320,
+}
+
+
+def compute_palette(thumb_path: str, colors: int = PALETTE_SIZE) -> List[list]:
+    """Quantize a thumbnail and return its most common colors."""
+    from PIL import Image
+
+    with Image.open(thumb_path) as img:
+        pixels = np.asarray(img.convert("RGB"), dtype=np.uint8).reshape(-1, 3)
+    if not len(pixels):
+        return []
+    shift = 8 - _QUANT_BITS
+    q = (pixels >> shift).astype(np.int32)
+    buckets = (q[:, 0] << (2 * _QUANT_BITS)) | (q[:, 1] << _QUANT_BITS) | q[:, 2]
+    n_buckets = 1 << (3 * _QUANT_BITS)
+    counts = np.bincount(buckets, minlength=n_buckets)
+    # Mean color of each bucket, all channels at once
+    sums = np.stack(
+        [np.bincount(buckets, weights=pixels[:, c], minlength=n_buckets) for c in range(3)],
+        axis=1,
+    )
+    top = np.argsort(counts)[::-1][:colors]
+    top = top[counts[top] > 0]
+    means = np.rint(sums[top] / counts[top, None]).astype(np.int32)
+    rgb = (means[:, 0] << 16) | (means[:, 1] << 8) | means[:, 2]
+    weights = counts[top] / len(pixels)
+    return [[int(color), round(float(weight), 3)] for color, weight in zip(rgb, weights)]
+
+
+def _hls(color: int) -> tuple[float, float, float]:
+    r, g, b = (color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF
+    return colorsys.rgb_to_hls(r / 255.0, g / 255.0, b / 255.0)
+
+
+def _is_chromatic(lightness: float, saturation: float) -> bool:
+    return (
+        saturation >= _MIN_SATURATION
+        and _MIN_LIGHTNESS <= lightness <= _MAX_LIGHTNESS
+    )
+
+
+def hue_distance(a: float, b: float) -> float:
+    d = abs(a - b) % 360
+    return min(d, 360 - d)
+
+
+def dominant_hue(palette: List[list]) -> Optional[float]:
+    """Hue in degrees of the heaviest colorful entry, or None for grayish images."""
+    for color, _weight in palette:
+        h, l, s = _hls(color)
+        if _is_chromatic(l, s):
+            return h * 360
+    return None
+
+
+def brightness(palette: List[list]) -> float:
+    """Weighted mean lightness (0-1) of the palette."""
+    total = sum(weight for _, weight in palette)
+    if not total:
+        return 0.0
+    return sum(_hls(color)[1] * weight for color, weight in palette) / total
+
+
+def has_hue(palette: List[list], hue: float, tolerance: float = HUE_TOLERANCE) -> bool:
+    """Whether a significant, colorful part of the palette is close to hue."""
+    for color, weight in palette:
+        if weight < _MIN_WEIGHT:
+            continue
+        h, l, s = _hls(color)
+        if _is_chromatic(l, s) and hue_distance(h * 360, hue) <= tolerance:
+            return True
+    return False
+
+
+def parse_hue(value: str) -> Optional[float]:
+    """Hue from a color name or a number of degrees."""
+    if value in HUE_NAMES:
+        return float(HUE_NAMES[value])
+    try:
+        return float(value) % 360
+    except ValueError:
+        return None
@@ -0,0 +1,264 @@
+"""
+Wallpaper thumbnail store and generation pipeline.
+
+Thumbnails are keyed by (wallpaper path, thumbnail size, mtime), so
+replacing a wallpaper with a file of the same name produces a new
+thumbnail, and changing the thumbnail size never reuses stale ones. A
+small JSON index maps each wallpaper path to its current thumbnail; files
+in THUMBS_DIR that the index no longer references are garbage collected.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import subprocess
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from gi.repository import GLib
+from loguru import logger
+
+import config.data as data
+
+THUMBS_DIR = f"{data.CACHE_DIR}/thumbs"
+INDEX_FILE = os.path.join(THUMBS_DIR, "index.json")
+
+
+class ThumbnailStore:
+    def __init__(self, thumb_size: int = data.WALLPAPER_THUMBNAIL_SIZE, directory: str = THUMBS_DIR):
+        self.thumb_size = thumb_size
+        self.directory = directory
+        self.index_path = os.path.join(directory, os.path.basename(INDEX_FILE))
+        os.makedirs(directory, exist_ok=True)
+        # Thumbnails are generated on worker threads
+        self._lock = threading.Lock()
+        self._dirty = False
+        # wallpaper path -> {"mtime": mtime_ns, "size": thumb size, "thumb": file name}
+        self._index: Dict[str, dict] = self._load_index()
+
+    def _load_index(self) -> Dict[str, dict]:
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"[Thumbnails] Could not read index, rebuilding: {e}")
+            return {}
+
+    def _thumb_name(self, path: str, mtime_ns: int) -> str:
+        key = f"{path}\0{self.thumb_size}\0{mtime_ns}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png"
+
+    def thumb_path(self, path: str, mtime_ns: int) -> str:
+        """Where the thumbnail for this version of path lives."""
+        return os.path.join(self.directory, self._thumb_name(path, mtime_ns))
+
+    def lookup(self, path: str, mtime_ns: int) -> Optional[str]:
+        """Cached thumbnail for this version of path, or None if it must be (re)generated."""
+        with self._lock:
+            entry = self._index.get(path)
+        if (
+            entry is None
+            or entry.get("mtime") != mtime_ns
+            or entry.get("size") != self.thumb_size
+        ):
+            return None
+        thumb_path = os.path.join(self.directory, entry["thumb"])
+        return thumb_path if os.path.exists(thumb_path) else None
+
+    def record(self, path: str, mtime_ns: int, thumb_path: str):
+        """Register a freshly generated thumbnail, dropping the one it replaces."""
+        with self._lock:
+            previous = self._index.get(path)
+            self._index[path] = {
+                "mtime": mtime_ns,
+                "size": self.thumb_size,
+                "thumb": os.path.basename(thumb_path),
+            }
+            self._dirty = True
+        if previous and previous.get("thumb") != os.path.basename(thumb_path):
+            self._unlink(os.path.join(self.directory, previous["thumb"]))
+
+    def remove(self, path: str):
+        """Forget path and delete its thumbnail."""
+        with self._lock:
+            entry = self._index.pop(path, None)
+            self._dirty = self._dirty or entry is not None
+        if entry:
+            self._unlink(os.path.join(self.directory, entry["thumb"]))
+
+    def collect_garbage(self, live_paths: Iterable[str]):
+        """Drop index entries for wallpapers that are gone and unreferenced thumbnail files."""
+        live_paths = set(live_paths)
+        with self._lock:
+            for path in [p for p in self._index if p not in live_paths]:
+                del self._index[path]
+                self._dirty = True
+            referenced = {entry["thumb"] for entry in self._index.values()}
+        index_name = os.path.basename(self.index_path)
+        removed = 0
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name == index_name or entry.name.endswith(".tmp"):
+                        continue
+                    if entry.name not in referenced:
+                        self._unlink(entry.path)
+                        removed += 1
+        except OSError as e:
+            logger.warning(f"[Thumbnails] Could not scan {self.directory}: {e}")
+        if removed:
+            logger.info(f"[Thumbnails] Removed {removed} orphaned thumbnails")
+
+    def save(self):
+        """Write the index if it changed (atomically)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps(self._index)
+            self._dirty = False
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.error(f"[Thumbnails] Could not write index: {e}")
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"[Thumbnails] Could not delete {path}: {e}")
+
+
+THUMBNAILER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thumbnailer.py")
+
+
+class ThumbnailPipeline:
+    """
+    Generates missing thumbnails in worker processes, most important first.
+
+    Each worker thread drives one utils/thumbnailer.py process, so decoding
+    runs on all cores without holding the GIL of the shell process. Jobs
+    wait in a heap ordered by a priority key that the caller can change at
+    any time (e.g. to put wallpapers matching the current search first).
+    on_done(path, thumb_path) is called on the GLib main loop for every
+    finished job, with thumb_path None on failure, and on_drained() once
+    the queue is empty.
+    """
+
+    def __init__(
+        self,
+        store: ThumbnailStore,
+        on_done: Callable[[str, Optional[str]], None],
+        on_drained: Optional[Callable[[], None]] = None,
+        workers: Optional[int] = None,
+    ):
+        self.store = store
+        self.on_done = on_done
+        self.on_drained = on_drained
+        self.max_workers = workers or os.cpu_count() or 2
+        self._priority: Callable[[str], Any] = lambda path: path
+        self._heap: List[Tuple[Any, int, str]] = []
+        self._jobs: Dict[str, int] = {}  # path -> mtime_ns
+        self._seq = 0
+        self._active_workers = 0
+        self._busy = 0
+        self._cond = threading.Condition()
+
+    def submit(self, path: str, mtime_ns: int):
+        with self._cond:
+            known = path in self._jobs
+            self._jobs[path] = mtime_ns
+            if not known:
+                self._seq += 1
+                heapq.heappush(self._heap, (self._priority(path), self._seq, path))
+            if self._active_workers < min(self.max_workers, len(self._jobs)):
+                self._active_workers += 1
+                threading.Thread(target=self._worker, daemon=True).start()
+
+    def set_priority(self, key: Callable[[str], Any]):
+        """Reorder queued jobs by key (lowest first)."""
+        with self._cond:
+            self._priority = key
+            self._heap = [(key(path), seq, path) for _, seq, path in self._heap]
+            heapq.heapify(self._heap)
+
+    def _next_job(self) -> Optional[Tuple[str, int]]:
+        with self._cond:
+            while self._heap:
+                _, _, path = heapq.heappop(self._heap)
+                if path in self._jobs:
+                    self._busy += 1
+                    return path, self._jobs.pop(path)
+            # Nothing left: this worker exits
+            self._active_workers -= 1
+            drained = self._active_workers == 0 and self._busy == 0
+        if drained and self.on_drained is not None:
+            GLib.idle_add(self.on_drained)
+        return None
+
+    def _worker(self):
+        process = None
+        try:
+            while (job := self._next_job()) is not None:
+                path, mtime_ns = job
+                thumb_path = self.store.thumb_path(path, mtime_ns)
+                request = json.dumps({
+                    "src": path, "dst": thumb_path, "size": self.store.thumb_size
+                }) + "\n"
+                # A thumbnailer that died (a crash, or killed for memory on
+                # a huge image) is replaced and the job tried once more
+                for _attempt in range(2):
+                    try:
+                        if process is None:
+                            process = subprocess.Popen(
+                                [sys.executable, THUMBNAILER_SCRIPT],
+                                stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE,
+                                text=True,
+                            )
+                        process.stdin.write(request)
+                        process.stdin.flush()
+                        line = process.stdout.readline()
+                        if line:
+                            reply = json.loads(line)
+                            break
+                        reply = {"ok": False, "error": "worker exited"}
+                    except (OSError, ValueError) as e:
+                        reply = {"ok": False, "error": str(e)}
+                    if process is not None:
+                        self._stop(process, kill=True)
+                        process = None
+
+                if reply.get("ok"):
+                    self.store.record(path, mtime_ns, thumb_path)
+                    GLib.idle_add(self.on_done, path, thumb_path)
+                else:
+                    logger.warning(f"[Thumbnails] Could not create thumbnail for {path}: {reply.get('error')}")
+                    GLib.idle_add(self.on_done, path, None)
+                with self._cond:
+                    self._busy -= 1
+        finally:
+            if process is not None:
+                self._stop(process)
+
+    @staticmethod
+    def _stop(process: subprocess.Popen, kill: bool = False):
+        if kill:
+            process.kill()
+        try:
+            process.stdin.close()
+        except OSError:
+            # Broken pipe to a thumbnailer that already exited
+            pass
+        process.stdout.close()
+        process.wait()
@@ -0,0 +1,258 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fabric.widgets.box import Box
+from fabric.widgets.eventbox import EventBox
+from fabric.widgets.scrolledwindow import ScrolledWindow
+from gi.repository import Gdk, GLib, Gtk
+
+RowFactory = Callable[[], Gtk.Widget]
+RowBinder = Callable[[Gtk.Widget, Any, int], None]
+
+
+class VirtualList(Box):
+    """
+    Vertical list that shows a window of a (possibly long) item sequence
+    using a small pool of recycled row widgets.
+
+    Rows are created by a factory registered for a row kind and filled in by
+    a bind function. Scrolling changes which slice of the items is bound to
+    the pool instead of moving widgets, so the number of live widgets depends
+    on how many rows fit on screen, not on the number of items.
+    """
+
+    def __init__(
+        self,
+        viewport_name: str = "viewport",
+        spacing: int = 4,
+        row_height: int = 52,
+        placeholder: Optional[Gtk.Widget] = None,
+        **kwargs,
+    ):
+        super().__init__(orientation="h", **kwargs)
+        self._kinds: Dict[str, Tuple[RowFactory, RowBinder]] = {}
+        self._pools: Dict[str, List[Gtk.Widget]] = {}
+        self._kind: Optional[str] = None
+        self._items: Sequence[Any] = []
+        self._offset = 0
+        self._selected = -1
+        self._spacing = spacing
+        # Estimated until rows have been allocated once
+        self._row_height = row_height
+        self._capacity = 1
+        self._scroll_delta = 0.0
+        self._refresh_pending = False
+        self._placeholder = placeholder
+
+        self.viewport = Box(
+            name=viewport_name,
+            spacing=spacing,
+            orientation="v",
+            h_expand=True,
+            v_expand=True,
+        )
+        if placeholder is not None:
+            placeholder.set_no_show_all(True)
+            self.viewport.add(placeholder)
+
+        self.event_box = EventBox(
+            child=self.viewport,
+            h_expand=True,
+            v_expand=True,
+        )
+        self.event_box.add_events(Gdk.EventMask.SCROLL_MASK | Gdk.EventMask.SMOOTH_SCROLL_MASK)
+        self.event_box.connect("scroll-event", self._on_scroll)
+
+        # Clips the rows and keeps their height from propagating to the
+        # parent, so the window size never depends on the pool size
+        self.clip = ScrolledWindow(
+            child=self.event_box,
+            h_expand=True,
+            v_expand=True,
+            propagate_width=False,
+            propagate_height=False,
+        )
+        self.clip.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.EXTERNAL)
+
+        self.adjustment = Gtk.Adjustment(
+            value=0, lower=0, upper=0, step_increment=1, page_increment=1, page_size=1
+        )
+        self.adjustment.connect("value-changed", self._on_adjustment_changed)
+        self.scrollbar = Gtk.Scrollbar(
+            orientation=Gtk.Orientation.VERTICAL, adjustment=self.adjustment
+        )
+        self.scrollbar.set_no_show_all(True)
+
+        self.add(self.clip)
+        self.add(self.scrollbar)
+        self.clip.connect("size-allocate", self._on_size_allocate)
+        # Row heights are only known once the rows themselves are allocated
+        self.viewport.connect("size-allocate", self._on_size_allocate)
+
+    # ------------------------------------------------------------------
+    # Model
+    # ------------------------------------------------------------------
+
+    def register_kind(self, kind: str, factory: RowFactory, bind: RowBinder):
+        """Register how rows of a kind are created and bound to an item."""
+        self._kinds[kind] = (factory, bind)
+        self._pools.setdefault(kind, [])
+
+    def set_items(self, items: Sequence[Any], kind: str):
+        """Show items using rows of kind, scrolled to the top with no selection."""
+        self._items = items
+        self._kind = kind
+        self._offset = 0
+        self._selected = -1
+        self._update_adjustment()
+        self.refresh()
+
+    @property
+    def items(self) -> Sequence[Any]:
+        return self._items
+
+    @property
+    def kind(self) -> Optional[str]:
+        return self._kind
+
+    def get_item(self, index: int) -> Any:
+        if 0 <= index < len(self._items):
+            return self._items[index]
+        return None
+
+    def clear(self):
+        self.set_items([], self._kind)
+
+    # ------------------------------------------------------------------
+    # Selection and scrolling
+    # ------------------------------------------------------------------
+
+    @property
+    def selected_index(self) -> int:
+        return self._selected
+
+    def select(self, index: int):
+        """Highlight the item at index (-1 clears) and scroll it into view."""
+        self._selected = index if 0 <= index < len(self._items) else -1
+        if self._selected != -1:
+            self.scroll_to(self._selected)
+        self.refresh()
+
+    def scroll_to(self, index: int):
+        """Move the visible window the least amount needed to show index."""
+        if index < self._offset:
+            self.set_offset(index)
+        elif index >= self._offset + self._capacity:
+            self.set_offset(index - self._capacity + 1)
+
+    def set_offset(self, offset: int):
+        offset = max(0, min(offset, len(self._items) - self._capacity))
+        if offset != self._offset:
+            self._offset = offset
+            self.adjustment.set_value(offset)
+            self.refresh()
+
+    def get_row(self, index: int) -> Optional[Gtk.Widget]:
+        """Row widget currently bound to index, or None if it is not visible."""
+        if self._kind is None or not self._offset <= index < self._offset + self._capacity:
+            return None
+        pool = self._pools[self._kind]
+        position = index - self._offset
+        return pool[position] if position < len(pool) else None
+
+    def visible_rows(self) -> List[Gtk.Widget]:
+        """Row widgets currently bound to items."""
+        if self._kind is None:
+            return []
+        count = max(0, min(self._capacity, len(self._items) - self._offset))
+        return self._pools[self._kind][:count]
+
+    # ------------------------------------------------------------------
+    # Binding
+    # ------------------------------------------------------------------
+
+    def refresh(self):
+        """Rebind the visible window of items to the row pool."""
+        for kind, pool in self._pools.items():
+            if kind != self._kind:
+                for row in pool:
+                    row.hide()
+
+        if self._placeholder is not None:
+            self._placeholder.set_visible(not self._items)
+
+        if self._kind is None:
+            return
+
+        factory, bind = self._kinds[self._kind]
+        pool = self._pools[self._kind]
+        while len(pool) < min(self._capacity, len(self._items)):
+            row = factory()
+            row.show_all()
+            # Visibility is managed here, not by show_all() on an ancestor
+            row.set_no_show_all(True)
+            self.viewport.add(row)
+            pool.append(row)
+
+        for position, row in enumerate(pool):
+            index = self._offset + position
+            if position >= self._capacity or index >= len(self._items):
+                row.hide()
+                continue
+            bind(row, self._items[index], index)
+            context = row.get_style_context()
+            if index == self._selected:
+                context.add_class("selected")
+            else:
+                context.remove_class("selected")
+            row.show()
+
+    def _update_adjustment(self):
+        self.adjustment.configure(
+            self._offset, 0, len(self._items), 1, self._capacity, self._capacity
+        )
+        self.scrollbar.set_visible(len(self._items) > self._capacity)
+
+    def _on_adjustment_changed(self, adjustment):
+        offset = int(round(adjustment.get_value()))
+        if offset != self._offset:
+            self._offset = offset
+            self.refresh()
+
+    def _on_scroll(self, widget, event):
+        if event.direction == Gdk.ScrollDirection.SMOOTH:
+            self._scroll_delta += event.delta_y
+        elif event.direction == Gdk.ScrollDirection.UP:
+            self._scroll_delta -= 1
+        elif event.direction == Gdk.ScrollDirection.DOWN:
+            self._scroll_delta += 1
+        steps = int(self._scroll_delta)
+        if steps:
+            self._scroll_delta -= steps
+            self.set_offset(self._offset + steps)
+        return True
+
+    def _on_size_allocate(self, *_):
+        if self._kind is not None:
+            heights = [
+                row.get_allocated_height()
+                for row in self._pools[self._kind]
+                if row.get_visible() and row.get_allocated_height() > 1
+            ]
+            if heights:
+                self._row_height = max(heights)
+        height = self.clip.get_allocated_height()
+        capacity = max(1, (height + self._spacing) // (self._row_height + self._spacing))
+        if capacity != self._capacity and not self._refresh_pending:
+            # Widgets must not be added or shown during allocation
+            self._refresh_pending = True
+            GLib.idle_add(self._apply_capacity, capacity)
+
+    def _apply_capacity(self, capacity: int):
+        self._refresh_pending = False
+        self._capacity = capacity
+        self._offset = max(0, min(self._offset, len(self._items) - capacity))
+        self._update_adjustment()
+        if self._selected != -1:
+            self.scroll_to(self._selected)
+        self.refresh()
+        return False